@@ -0,0 +1,65 @@
+"""
+Compare one-off requests against the pooled keep-alive session used by `Connection`.
+
+Runs against a local HTTP stand-in for AI Core, so only the connection setup cost is measured:
+
+    $ python benchmarks/connection_pool.py --calls 500
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+import requests
+
+from compredict.connection import Connection
+
+
+class TaskStatusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = json.dumps({"job_id": "benchmark", "status": "In Progress"}).encode("utf-8")
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(call, calls):
+    start = perf_counter()
+    for _ in range(calls):
+        call()
+    return (perf_counter() - start) / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TaskStatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{}".format(server.server_address[1])
+    endpoint = "/algorithms/tasks/benchmark"
+
+    connection = Connection(url=url, token="benchmark")
+    one_off = measure(lambda: requests.get(url + endpoint, headers=connection.headers), args.calls)
+    pooled = measure(lambda: connection.GET(endpoint), args.calls)
+
+    print("one-off requests: {:.3f} ms/call".format(one_off))
+    print("pooled session:   {:.3f} ms/call".format(pooled))
+    print("saved per call:   {:.3f} ms".format(one_off - pooled))
+
+    connection.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare serialization of features through a named temporary file on disk with the in-memory spooled buffer.
+
+Each iteration encodes the features into parquet, reads the payload back as the upload does and releases it:
+
+    $ python benchmarks/serialization.py --rows 100000 --iterations 20
+"""
+import argparse
+from os import remove
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+
+import numpy as np
+from pandas import DataFrame
+
+from compredict.utils.serialization import DEFAULT_SPILL_THRESHOLD, spooled_buffer, write_features
+
+
+def temporary_file_path(features):
+    file = NamedTemporaryFile('wb+', delete=False)
+    features.to_parquet(file.name)
+    with open(file.name, 'rb') as upload:
+        upload.read()
+    file.close()
+    remove(file.name)
+
+
+def spooled_buffer_path(features, spill_threshold):
+    buffer = spooled_buffer(spill_threshold)
+    write_features(features, buffer)
+    buffer.read()
+    buffer.close()
+
+
+def measure(call, iterations):
+    start = perf_counter()
+    for _ in range(iterations):
+        call()
+    return (perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--spill-threshold", type=int, default=DEFAULT_SPILL_THRESHOLD)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    features = DataFrame(rng.random((args.rows, 8)), columns=[f"feature_{i}" for i in range(8)])
+
+    on_disk = measure(lambda: temporary_file_path(features), args.iterations)
+    in_memory = measure(lambda: spooled_buffer_path(features, args.spill_threshold), args.iterations)
+
+    print("named temporary file: {:.3f} ms/payload".format(on_disk))
+    print("spooled buffer:       {:.3f} ms/payload".format(in_memory))
+
+
+if __name__ == "__main__":
+    main()
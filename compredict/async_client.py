@@ -0,0 +1,318 @@
+import asyncio
+from functools import partial
+from json import dumps as json_dump
+from typing import Optional, Union, List, Type
+
+from pandas import DataFrame
+
+from compredict.async_connection import AsyncConnection
+from compredict.client import BaseApi, api
+from compredict.exceptions import ClientError
+from compredict.resources import resources
+from compredict.utils.authentications import TokenValidator
+from compredict.utils.parquet_profile import ParquetProfile
+from compredict.utils.retry import RetryPolicy
+from compredict.utils.serialization import DEFAULT_SPILL_THRESHOLD
+
+
+class AsyncApi(BaseApi):
+
+    def __init__(self,
+                 token: Optional[str] = None,
+                 token_refresh: Optional[str] = None,
+                 callback_url: Optional[str] = None,
+                 url: Optional[str] = None,
+                 limit: int = 100,
+                 limit_per_host: int = 0,
+                 spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+                 retry: Optional[RetryPolicy] = None,
+                 token_validator: Optional[TokenValidator] = None):
+        """
+        COMPREDICT's AI Core asynchronous Client. It offers the same methods as `api` as coroutines, so many
+        requests can be in flight on one event loop. Use `AsyncApi.create` to log in with username and password.
+
+        :param token: API Key used for authorization.
+        :param token_refresh: Token used, when 'token' value is expired, to generate new token.
+        :param callback_url: URL for sending the results of long processes.
+        :param url: URL to desired version of AI Core used.
+        :param limit: Maximum number of simultaneous connections.
+        :param limit_per_host: Maximum number of simultaneous connections per host, 0 for no limit.
+        :param spill_threshold: Size in bytes above which serialized features and parameters are spilled from memory
+            to a temporary file before upload.
+        :param retry: Policy for retrying failed requests with backoff, by default requests are not retried.
+        :param token_validator: `TokenValidator` checking tokens locally in `verify_token`, AI Core is called only when
+            the validity can't be decided locally.
+        """
+        self.url = api.BASE_URL.format(api.API_VERSION) if url is None else url
+        self.spill_threshold = spill_threshold
+        self.connection = AsyncConnection(url=self.url, limit=limit, limit_per_host=limit_per_host, retry=retry)
+        self.token = token
+        self.refresh_token = token_refresh
+        self.callback_url = callback_url
+        self.token_validator = token_validator
+        if token is not None:
+            self.connection.set_token(token)
+
+    @classmethod
+    async def create(cls,
+                     username: Optional[str] = None,
+                     password: Optional[str] = None,
+                     token: Optional[str] = None,
+                     validate: Optional[bool] = False,
+                     **kwargs) -> "AsyncApi":
+        """
+        Create the client and authenticate it, the same way as `api.get_instance`.
+
+        :param username: User's username in AI Core.
+        :param password: User's password to AI Core.
+        :param token: API Key used for authorization.
+        :param validate: indicates, if token should be validated (defaults to False)
+        :param kwargs: other arguments of `AsyncApi`
+        :return: authenticated AsyncApi
+        """
+        client = cls(token=token, **kwargs)
+        if token is not None and validate:
+            await client.verify_token(token)
+        elif token is None and (username is not None and password is not None):
+            await client.generate_token(username, password)
+        elif token is None:
+            raise ValueError("No token, or username and password, provided.")
+        return client
+
+    async def close(self):
+        """
+        Close the connections of the client.
+        """
+        await self.connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @staticmethod
+    def _get_resource_class(resource: str) -> Type[resources.BaseResource]:
+        return getattr(resources, 'Async' + resource, None) or getattr(resources, resource)
+
+    async def generate_token(self, username: str, password: str):
+        """
+        Generate access token and refresh token from username and password, see `api.generate_token`.
+
+        :param username: user's username in AI Core
+        :param password: user's password to AI Core
+        """
+        response = await self.connection.POST_JSON('/token/', dict(username=username, password=password))
+        token = self.connection.handle_response(response, True)
+        self.token = token['access']
+        self.refresh_token = token['refresh']
+        self.connection.set_token(self.token)
+
+    async def generate_token_from_refresh_token(self, refresh_token: str = None):
+        """
+        Generate new access token from the refresh token, see `api.generate_token_from_refresh_token`.
+
+        :param refresh_token: refresh token generated by user with username and password
+        """
+        if refresh_token is None and self.refresh_token is None:
+            raise ClientError("Please provide refresh token.")
+        token = refresh_token if refresh_token is not None else self.refresh_token
+        response = await self.connection.POST_JSON('/token/refresh/', {'refresh': token})
+        token = self.connection.handle_response(response, True)
+        self.token = token['access']
+        self.connection.set_token(self.token)
+
+    async def verify_token(self, token: str = None) -> bool:
+        """
+        Check if token is valid.
+
+        :param token: token which user would like to verify
+        :return: bool indicating if token is valid
+        """
+        if token is None and self.token is None:
+            raise ClientError("Please provide token to verify.")
+        token_to_verify = token if token is not None else self.token
+        if self._validate_token_locally(token_to_verify):
+            return True
+        response = await self.connection.POST_JSON('/token/verify/', {'token': token_to_verify})
+        try:
+            self.connection.handle_response(response, True)
+        except ClientError:
+            self._remember_token_verification(token_to_verify, False)
+            raise
+        self._remember_token_verification(token_to_verify, True)
+        return True
+
+    @staticmethod
+    async def _run_in_executor(function, *args, **kwargs):
+        """
+        Run the function in the default executor of the event loop, so encoding features doesn't block the other
+        coroutines.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, partial(function, *args, **kwargs))
+
+    async def get_algorithms(self) -> Union[List[resources.AsyncAlgorithm], bool]:
+        """
+        Returns the collection of algorithms
+
+        :return: list of algorithms
+        """
+        response = await self.connection.GET('/algorithms')
+        return self._map_collection('Algorithm', response)
+
+    async def get_algorithm(self, algorithm_id: str) -> Union[resources.AsyncAlgorithm, bool]:
+        """
+        Get the information of the given algorithm id
+
+        :param algorithm_id: String identifier of the algorithm
+        :return: Algorithm resource
+        """
+        response = await self.connection.GET('/algorithms/{}'.format(algorithm_id))
+        return self._map_resource('Algorithm', response)
+
+    async def run_algorithm(self,
+                            algorithm_id: str,
+                            features: Union[str, DataFrame, dict],
+                            version: Optional[str] = None,
+                            evaluate: bool = True,
+                            callback_url: Optional[Union[str, List[str]]] = None,
+                            callback_param: Optional[Union[dict, List[dict]]] = None,
+                            parameters: Optional[Union[str, dict]] = None,
+                            compression: Optional[Union[str, ParquetProfile]] = None,
+                            monitor: bool = True,
+                            deduplicate: bool = False) -> Union[resources.AsyncTask, resources.Result, bool]:
+        """
+        Run the given algorithm id with the passed data, see `api.run_algorithm` for the arguments.
+
+        :return: Prediction if results are returned instantly or Task otherwise.
+        """
+        deduplication, original = None, features
+        if deduplicate:
+            features, deduplication = await self._run_in_executor(self._deduplicate, features)
+
+        profile = self._get_parquet_profile(compression)
+        if profile is not None:
+            compression = None
+        features_file, is_features_file_to_remove = None, False
+        parameters_file, is_parameters_file_to_remove = None, False
+        try:
+            features_file, is_features_file_to_remove = await self._run_in_executor(
+                self._process_data, features, "features", compression=compression, profile=profile)
+            if parameters:
+                parameters_file, is_parameters_file_to_remove = await self._run_in_executor(
+                    self._process_data, parameters, "parameters", compression=compression)
+
+            callback_url = self._set_callback_urls(
+                callback_url) if callback_url is not None else self.callback_url
+
+            params = dict(evaluate=self._process_evaluate(evaluate), monitor=monitor,
+                          callback_url=callback_url, callback_param=json_dump(callback_param),
+                          compression=compression, version=version)
+
+            files = {"features": ("features.parquet", features_file, "application/parquet"),
+                     "parameters": ("parameters.json", parameters_file, "application/json")}
+
+            response = await self.connection.POST(f'/algorithms/{algorithm_id}/predict',
+                                                  data=params, files=files)
+            resource = 'Task' if response is not False and 'job_id' in response else 'Result'
+        finally:
+            self._remove_file(features_file, is_features_file_to_remove)
+            self._remove_file(parameters_file, is_parameters_file_to_remove)
+        return self._restore_rows(self._map_resource(resource, response), deduplication, original)
+
+    async def train_algorithm(self,
+                              algorithm_id: str,
+                              features: Union[str, DataFrame, dict],
+                              version: Optional[str] = None,
+                              export_new_version: Optional[bool] = None,
+                              parameters: Optional[Union[str, dict]] = None,
+                              compression: Optional[Union[str, ParquetProfile]] = None,
+                              monitor: bool = True) -> Union[resources.AsyncTask, bool]:
+        """
+        Train fit algorithm with the passed data, see `api.train_algorithm` for the arguments.
+
+        :return: Task (since all processing fit algorithms always end up in queue).
+        """
+        profile = self._get_parquet_profile(compression)
+        if profile is not None:
+            compression = None
+        features_file, is_features_file_to_remove = None, False
+        parameters_file, is_parameters_file_to_remove = None, False
+        try:
+            features_file, is_features_file_to_remove = await self._run_in_executor(
+                self._process_data, features, "features", compression=compression, profile=profile)
+            if parameters is not None:
+                parameters_file, is_parameters_file_to_remove = await self._run_in_executor(
+                    self._process_data, parameters, "parameters", compression=compression)
+
+            files = {"features": ("features.parquet", features_file, "application/parquet"),
+                     "parameters": ("parameters.json", parameters_file, "application/json")}
+
+            params = dict(export_new_version=export_new_version, compression=compression, version=version,
+                          monitor=monitor)
+
+            response = await self.connection.POST('/algorithms/{}/fit'.format(algorithm_id),
+                                                  data=params, files=files)
+        finally:
+            self._remove_file(features_file, is_features_file_to_remove)
+            self._remove_file(parameters_file, is_parameters_file_to_remove)
+        return self._map_resource("Task", response)
+
+    async def cancel_task(self, task_id: str) -> Union[resources.AsyncTask, bool]:
+        """
+        Cancel running Task.
+
+        :param task_id: String identifier of the job.
+        :return: Cancelled task instance.
+        """
+        response = await self.connection.DELETE('/algorithms/tasks/{}'.format(task_id))
+        return self._map_resource('Task', response)
+
+    async def get_task_results(self, task_id: str) -> Union[resources.AsyncTask, bool]:
+        """
+        Check COMPREDICT'S AI Core for the results of the computation.
+
+        :param task_id: String identifier of the job.
+        :return: The new results of the Task
+        """
+        response = await self.connection.GET('/algorithms/tasks/{}'.format(task_id))
+        return self._map_resource('Task', response)
+
+    async def get_algorithm_versions(self, algorithm_id: str) -> Union[List[resources.AsyncVersion], bool]:
+        """
+        Get all versions of an algorithm.
+
+        :param algorithm_id: The id of the main algorithm
+        :return: List of versions
+        """
+        response = await self.connection.GET('/algorithms/{}/versions'.format(algorithm_id))
+        if isinstance(response, list):
+            [response[i].update(dict(algorithm_id=algorithm_id)) for i in range(len(response))]
+        return self._map_collection('Version', response)
+
+    async def get_algorithm_version(self, algorithm_id: str, version: str) -> Union[resources.AsyncVersion, bool]:
+        """
+        Get a specific version of an algorithm.
+
+        :param algorithm_id: The id of the main algorithm
+        :param version: Specify the version of the algorithm
+        :return: Version
+        """
+        response = await self.connection.GET('/algorithms/{}/versions/{}'.format(algorithm_id, version))
+        if isinstance(response, dict):
+            response.update(dict(algorithm_id=algorithm_id))
+        return self._map_resource('Version', response)
+
+    async def get_template(self, algorithm_id: str, file_type: str = 'input', version: Optional[str] = None):
+        """
+        Return the template that explains the data to be sent for the algorithms, see `api.get_template`.
+        """
+        get_args = self._build_get_args(type=file_type, version=version)
+        return await self.connection.GET('/algorithms/{}/template{}'.format(algorithm_id, get_args))
+
+    async def get_graph(self, algorithm_id: str, file_type: str, version: Optional[str] = None):
+        """
+        Return the graph that explains the input data to be sent for the algorithms, see `api.get_graph`.
+        """
+        get_args = self._build_get_args(type=file_type, version=version)
+        return await self.connection.GET('/algorithms/{}/graph{}'.format(algorithm_id, get_args))
@@ -0,0 +1,219 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Optional, Union
+from weakref import WeakKeyDictionary
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from compredict.connection import Connection
+from compredict.exceptions import Error
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError("The asynchronous client requires `aiohttp`, install it with "
+                      "`pip install COMPREDICT-AI-SDK[async]`.")
+
+# last response and error of each connection in the current asyncio task, mappings are replaced and never modified, as
+# tasks started from the current one share them
+_last_requests: ContextVar[Optional[WeakKeyDictionary]] = ContextVar('compredict_last_requests', default=None)
+_last_errors: ContextVar[Optional[WeakKeyDictionary]] = ContextVar('compredict_last_errors', default=None)
+
+
+def _get_value(variable: ContextVar, connection: "AsyncConnection", default: Any) -> Any:
+    values = variable.get()
+    return values.get(connection, default) if values is not None else default
+
+
+def _set_value(variable: ContextVar, connection: "AsyncConnection", value: Any):
+    values = WeakKeyDictionary(variable.get() or {})
+    values[connection] = value
+    variable.set(values)
+
+
+class AsyncConnection(Connection):
+
+    def __init__(self, url, token=None, limit=100, limit_per_host=0, retry=None):
+        """
+        Class responsible for asynchronous HTTP requests and communication.
+
+        All requests are sent through one `aiohttp` session with keep-alive connection pooling. The session is created
+        lazily inside the running event loop. `last_request` and `last_error` are kept per asyncio task, as the
+        coroutines of an event loop share one thread.
+
+        :param url: The base url string
+        :param token: The API authorization token.
+        :param limit: Maximum number of simultaneous connections.
+        :param limit_per_host: Maximum number of simultaneous connections per host, 0 for no limit.
+        :param retry: `RetryPolicy` of failed requests, no request is retried if None.
+        """
+        self.url = url
+        self.fail_on_error = False
+        self.ssl = True
+        self.headers = dict(Accept='application/json')
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.retry = retry
+        self.session = None
+        if token is not None:
+            self.headers['Authorization'] = 'Bearer ' + token
+
+    @property
+    def last_request(self) -> Optional[Response]:
+        """
+        The last response received by the current asyncio task.
+        """
+        return _get_value(_last_requests, self, None)
+
+    @last_request.setter
+    def last_request(self, response: Optional[Response]):
+        _set_value(_last_requests, self, response)
+
+    @property
+    def last_error(self) -> Union[Error, bool]:
+        """
+        The last error received by the current asyncio task, False if none.
+        """
+        return _get_value(_last_errors, self, False)
+
+    @last_error.setter
+    def last_error(self, error: Union[Error, bool]):
+        _set_value(_last_errors, self, error)
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def close(self):
+        """
+        Close the pooled connections.
+
+        :return: None
+        """
+        if self.session is not None:
+            await self.session.close()
+
+    async def POST(self, endpoint, data, files=None):
+        """
+        Responsible for sending POST request and uploading files if specified.
+
+        :param endpoint: the endpoint of the URL.
+        :param data: The form data to be sent.
+        :param files: The files to be sent.
+        :return: JSON if request is correct otherwise false.
+        """
+        address = self.url + endpoint
+        content_type = None if files is not None else 'application/json'
+        return await self._send('POST', address, content_type, data=data, files=files)
+
+    async def POST_JSON(self, endpoint, json):
+        """
+        Send POST request with JSON body, used for the token endpoints.
+
+        :param endpoint: the endpoint of the URL.
+        :param json: The JSON serializable body.
+        :return: response converted into `requests.Response`
+        """
+        async with self._get_session().post(self.url + endpoint, json=json, ssl=self.ssl) as response:
+            return await self._to_response(response)
+
+    async def GET(self, endpoint):
+        """
+        Responsible for sending GET requests.
+
+        :param endpoint: the targeted endpoint.
+        :return: JSON if request is correct otherwise false.
+        """
+        return await self._send('GET', self.url + endpoint, 'application/json')
+
+    async def DELETE(self, endpoint):
+        """
+        Responsible for canceling the job.
+
+        :param endpoint: targeted delete endpoint
+        :return: JSON with task instance otherwise
+        """
+        return await self._send('DELETE', self.url + endpoint, 'application/json')
+
+    async def _send(self, method, address, content_type: Optional[str] = None, data=None,
+                    files=None) -> Union[dict, bool]:
+        """
+        Send the request, retrying it as allowed by the retry policy, see `Connection._send`.
+        """
+        attempt, slept = 0, 0.0
+        contents = await self._read_files(files) if files is not None else None
+        while True:
+            attempt += 1
+            can_retry = self.retry is not None and self.retry.can_retry(method, attempt)
+            body = self._build_form(data, contents) if contents is not None else data
+            try:
+                async with self._get_session().request(method, address, data=body,
+                                                       headers=self._request_headers(content_type),
+                                                       ssl=self.ssl) as http_response:
+                    response = await self._to_response(http_response)
+            except aiohttp.ClientConnectionError:
+                if not (can_retry and self.retry.retry_connection_errors):
+                    raise
+                response = None
+            if response is not None and not (can_retry and self.retry.is_retryable_response(response)):
+                break
+            backoff = self.retry.get_backoff(attempt, response)
+            await asyncio.sleep(backoff)
+            slept += backoff
+        response.retries = attempt - 1
+        response.retry_sleep = slept
+        self.last_request = response
+        return self.handle_response(self.last_request, self.fail_on_error)
+
+    @staticmethod
+    async def _read_files(files: dict) -> dict:
+        """
+        Read the content of the files once, in the default executor, so reading spilled or memory-mapped files does
+        not block the event loop.
+
+        :param files: The files to be sent, as dictionary of (filename, file, content type).
+        :return: dictionary of (filename, content, content type), content is None for missing files
+        """
+        loop = asyncio.get_running_loop()
+        contents = dict()
+        for name, (filename, file, content_type) in files.items():
+            content = await loop.run_in_executor(None, file.read) if file is not None else None
+            contents[name] = (filename, content, content_type)
+        return contents
+
+    @staticmethod
+    def _build_form(data, contents) -> "aiohttp.FormData":
+        """
+        Build multipart body the same way `requests` does: fields and files with None values are skipped.
+
+        :param data: The form data to be sent.
+        :param contents: The files to be sent, as dictionary of (filename, content, content type).
+        :return: multipart form
+        """
+        form = aiohttp.FormData()
+        for key, value in (data or {}).items():
+            if value is not None:
+                form.add_field(key, str(value))
+        for name, (filename, content, content_type) in contents.items():
+            if content is not None:
+                form.add_field(name, content, filename=filename, content_type=content_type)
+        return form
+
+    @staticmethod
+    async def _to_response(response: "aiohttp.ClientResponse") -> Response:
+        """
+        Read the aiohttp response into `requests.Response`, so the response handling is shared with `Connection`.
+
+        :param response: aiohttp response
+        :return: requests Response
+        """
+        converted = Response()
+        converted.status_code = response.status
+        converted._content = await response.read()
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.url = str(response.url)
+        converted.encoding = response.charset
+        return converted
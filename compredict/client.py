@@ -1,58 +1,56 @@
 import os
-from json import dumps as json_dump, dump
+import threading
+from mmap import mmap
+from io import BytesIO
+from json import dumps as json_dump, load as json_load
 from os import remove
 from os.path import exists
-from tempfile import NamedTemporaryFile
-from typing import Optional, Union, List, Type
+from concurrent.futures import Future
+from functools import partial
+from typing import IO, Optional, Union, List, Tuple, Type
 
 from pandas import DataFrame
-from pandas.io.common import get_handle
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
 
 from compredict.connection import Connection
-from compredict.exceptions import ClientError, Error
+from compredict.exceptions import ClientError, Error, ServerError
 from compredict.resources import resources
 from compredict.singleton import Singleton
-from compredict.utils.authentications import generate_token, generate_token_from_refresh_token, verify_token
-
-
-@Singleton
-class api:
-
-    def __init__(self,
-                 username: Optional[str] = None,
-                 password: Optional[str] = None,
-                 token: Optional[str] = None,
-                 token_refresh: Optional[str] = None,
-                 callback_url: Optional[str] = None,
-                 url: Optional[str] = None,
-                 validate: Optional[bool] = False):
-        """
-        COMPREDICT's AI Core Client that will provide an interface for communication. This class is singleton.
-
-        :param username: User's username in AI Core.
-        :param password: User's password to AI Core.
-        :param token: API Key used for authorization.
-        :param token_refresh: Token used, when 'token' value is expired, to generate new token.
-        :param callback_url: URL for sending the results of long processes.
-        :param url: URL to desired version of AI Core used.
-        :param validate: indicates, if token should be validated (defaults to False)
-        """
-        self.url = api.BASE_URL.format(api.API_VERSION) if url is None else url
-        self.connection = Connection(url=self.url)
-        self.refresh_token = token_refresh
-
-        if token is not None and validate:
-            self.verify_token(token)
-            self.token = token
-        elif token is not None and not validate:
-            self.token = token
-        elif token is None and (username is not None and password is not None):
-            self.generate_token(username, password)
-        else:
-            raise ValueError("No token, or username and password, provided.")
-
-        self.callback_url = callback_url
-        self.connection.set_token(self.token)
+from compredict.utils.authentications import generate_token, generate_token_from_refresh_token, verify_token, \
+    is_token_expiring, TokenValidator
+from compredict.utils.deduplication import Deduplication, deduplicate_rows
+from compredict.utils.retry import RetryPolicy
+from compredict.utils.metadata_cache import MetadataCache
+from compredict.utils.optimization import FeatureOptimizer, Optimization
+from compredict.utils.parquet_profile import AUTO, ParquetProfile
+from compredict.utils.predictions import merge_chunks
+from compredict.utils.serialization import DEFAULT_SPILL_THRESHOLD, spooled_buffer, write_features, write_parameters, \
+    split_rows, serialize_features, map_file, validate_parquet_file
+from compredict.utils.serialization_cache import SerializationCache
+from compredict.utils.streaming import DEFAULT_ROW_GROUP_SIZE, SizedMultipart, StreamingMultipart, iter_parquet
+from compredict.utils.submission import SubmissionPool
+from compredict.utils.template_cache import TemplateCache
+from compredict.utils.token_cache import TokenCache
+from compredict.utils.validation import SchemaValidator
+
+# errors of a chunk, after which it is submitted again by `run_algorithm_chunked`
+RETRYABLE_CHUNK_ERRORS = (ServerError, RequestsConnectionError, RequestsTimeout)
+
+
+class BaseApi:
+    """
+    Shared behaviour of the synchronous and asynchronous AI Core clients: error handling switches, resource mapping
+    and preparation of the request data. Subclasses provide `connection` and the methods sending the requests.
+    """
+
+    spill_threshold = DEFAULT_SPILL_THRESHOLD
+    token_validator = None
+    serialization_cache = None
+    metadata_cache = None
+    _templates_metadata = None
+    template_cache = None
+    parquet_profile = None
+    _auto_parquet_profile = None
 
     def fail_on_error(self, option: bool = True):
         """
@@ -76,50 +74,6 @@ class api:
     def last_error(self) -> Error:
         return self.connection.last_error
 
-    def generate_token(self, username: str, password: str):
-        """
-        Generate access token and refresh token from username and password.
-        Refresh token can be used later to generate new access token.
-
-        By calling this method, instance of the client is automatically updated with
-        new access_token and token_refresh.
-
-        :param username: user's username in AI Core
-        :param password: user's password to AI Core
-        """
-        response = generate_token(self.url, username, password)
-        token = self.connection.handle_response(response, True)
-        self.token = token['access']
-        self.refresh_token = token['refresh']
-
-    def generate_token_from_refresh_token(self, refresh_token: str = None):
-        """
-        Takes a refresh type JSON web token and returns an access type JSON web token if the refresh token is valid.
-
-        By calling this method, instance of the client is automatically updated with new access token.
-        :param refresh_token: refresh token generated by user with username and password
-        """
-        if refresh_token is None and self.refresh_token is None:
-            raise ClientError("Please provide refresh token.")
-        token = refresh_token if refresh_token is not None else self.refresh_token
-        response = generate_token_from_refresh_token(self.url, token)
-        token = self.connection.handle_response(response, True)
-        self.token = token['access']
-
-    def verify_token(self, token: str = None) -> bool:
-        """
-        Check if token is valid.
-
-        :param token: token which user would like to verify
-        :return: bool indicating if token is valid
-        """
-        if token is None and self.token is None:
-            raise ClientError("Please provide token to verify.")
-        token_to_verify = token if token is not None else self.token
-        response = verify_token(self.url, token_to_verify)
-        self.connection.handle_response(response, True)
-        return True
-
     def _set_callback_urls(self, callback_url: Union[List[str], str]) -> str:
         """
         Accept list of urls and format them into one string with dividing '|' in between.
@@ -134,13 +88,41 @@ class api:
 
         return multiple_callback
 
+    def _validate_token_locally(self, token: str) -> bool:
+        """
+        Validate the token with `token_validator`, without calling AI Core.
+
+        :param token: token to validate
+        :return: True if the token is valid, False if it must be verified by AI Core.
+        """
+        if self.token_validator is None:
+            return False
+        valid = self.token_validator.validate(token)
+        if valid is False:
+            raise ClientError("Token is invalid or expired.")
+        return valid is True
+
+    def _remember_token_verification(self, token: str, valid: bool):
+        if self.token_validator is not None:
+            self.token_validator.remember(token, valid)
+
     @staticmethod
-    def __map_resource(
+    def _get_resource_class(resource: str) -> Type[resources.BaseResource]:
+        """
+        Return the class of the resource with the given name.
+
+        :param resource: String name to the resource
+        :return: resource class
+        """
+        return getattr(resources, resource)
+
+    def _map_resource(
+            self,
             resource: str,
             a_object: Union[dict, bool]
     ) -> Union[Type[resources.BaseResource], bool]:
         """
-        Map the result to the correct resource
+        Map the result to the correct resource, bound to this client.
 
         :param resource: String name to the resource
         :param a_object: The values returned from the request.
@@ -149,19 +131,19 @@ class api:
         if a_object is False:
             return a_object
         try:
-            model_class = getattr(resources, resource)
-            instance = model_class(**a_object)
+            model_class = self._get_resource_class(resource)
+            instance = model_class(client=self, **a_object)
         except (AttributeError, ModuleNotFoundError):
             raise ImportError("Resource {} was not found".format(resource))
         return instance
 
-    @staticmethod
-    def __map_collection(
+    def _map_collection(
+            self,
             resource: str,
             objects: Union[dict, bool]
     ) -> Union[List[Type[resources.BaseResource]], bool]:
         """
-        Create a list of resources if the results returns a list
+        Create a list of resources, bound to this client, if the results returns a list
 
         :param resource: String name to the resource
         :param objects: The list of values returned from the request.
@@ -173,108 +155,465 @@ class api:
         try:
             instances = list()
             for obj in objects:
-                model_class = getattr(resources, resource)
-                instances.append(model_class(**obj))
+                model_class = self._get_resource_class(resource)
+                instances.append(model_class(client=self, **obj))
         except (AttributeError, ModuleNotFoundError):
             raise ImportError("Resource {} was not found".format(resource))
         return instances
 
-    def get_algorithms(self) -> Union[List[resources.Algorithm], bool]:
-        """
-        Returns the collection of algorithms
-
-        :return: list of algorithms
-        """
-        response = self.connection.GET('/algorithms')
-        return self.__map_collection('Algorithm', response)
-
-    def get_algorithm(self, algorithm_id: str) -> Union[resources.Algorithm, bool]:
-        """
-        Get the information of the given algorithm id
-
-        :param algorithm_id: String identifier of the algorithm
-        :return: Algorithm resource
-        """
-        response = self.connection.GET('/algorithms/{}'.format(algorithm_id))
-        return self.__map_resource('Algorithm', response)
-
     @staticmethod
-    def __raise_error_if_file_type_incorrect(path_to_file: str, type_of_file: str):
+    def _raise_error_if_file_type_incorrect(path_to_file: str, type_of_file: str):
         """
-        Features file can be only provided as .parquet, whereas parameters file can be only provided as .json.
+        Features file can be only provided as parquet file, recognized by its content, whereas parameters file can be
+        only provided as .json.
         This method will raise ValueError if features/parameter file specified, breaks this rule.
         """
         _, extension = os.path.splitext(path_to_file)
-        if type_of_file == "features" and extension != ".parquet":
-            raise ValueError(f"Features file format: {extension} is not accepted. Parquet file is required.")
+        if type_of_file == "features":
+            validate_parquet_file(path_to_file)
         elif type_of_file == "parameters" and extension != ".json":
             raise ValueError(f"Parameters file format: {extension} is not accepted. Json file is required.")
 
-    def __process_data(self, data, type_of_data, compression=None):
+    def _process_data(self, data, type_of_data, compression=None, profile=None):
         """
         Process the given data and convert it to file.
 
-        In case of data provided as path to file, make sure that file is of correct type.
+        In case of data provided as path to file, make sure that file is of correct type, and open it read-only.
+        Features files are memory-mapped.
 
-        In case of parameters provided as dict: create json file from dict.
+        In case of parameters provided as dict: serialize dict into json.
         In case of features provided as dict: create DataFrame from dict and then write
-        DataFrame into parquet file.
-        In case of features provided as DataFrame: write DataFrame into parquet file.
+        DataFrame into parquet.
+        In case of features provided as DataFrame: write DataFrame into parquet.
+        In case of features provided as arrow Table or RecordBatch, NumPy structured array or object exposing the
+        dataframe interchange protocol: write them into parquet through arrow, without converting them to pandas.
+        In case of data provided as bytes: send them as they are, e.g. parquet serialized by `serialize_features`.
+
+        Generated data is kept in memory and only spilled to a temporary file on disk when it is bigger than
+        `spill_threshold` bytes. Features are taken from `serialization_cache` when it is set, and written with the
+        parquet `profile` when it is given.
 
         :param data: The data to be sent for computation and prediction.
-        :type data: dict | str | pandas
+        :type data: dict | str | bytes | pandas | pyarrow | numpy
         :param type_of_data: Data can be of type: 'features' or of type: 'parameters'.
         Features will be always converted into parquet file, whereas parameters into json file.
+        :param compression: compression of the generated file.
+        :param profile: `ParquetProfile` of the features, resolved for them in 'auto' mode.
         :return: opened file, bool indicating if file should be removed afterwards.
-        File is signed to be removed if TemporaryFile was generated from provided data.
+        File is signed to be removed if it was generated from provided data.
         """
         if isinstance(data, str):
-            self.__raise_error_if_file_type_incorrect(data, type_of_data)
-            return open(data, "rb+"), False
+            self._raise_error_if_file_type_incorrect(data, type_of_data)
+            return (map_file(data) if type_of_data == 'features' else open(data, "rb")), False
+        if isinstance(data, bytes):
+            return BytesIO(data), True
 
-        file = NamedTemporaryFile('wb+', delete=False)
-        if type_of_data == "parameters":
-            self.__write_json_file(file, data, compression=compression)
+        if type_of_data == 'features' and profile is not None:
+            profile = profile.resolve(data)
+        if type_of_data == 'features' and self.serialization_cache is not None:
+            return BytesIO(self.serialization_cache.get_or_serialize(data, compression, profile)), True
 
-        if isinstance(data, dict):
+        file = spooled_buffer(self.spill_threshold)
+        try:
             if type_of_data == 'parameters':
-                self.__write_json_file(file, data, compression=compression)
+                write_parameters(data, file, compression=compression)
             else:
-                data = DataFrame(data)
-
-        if type_of_data == 'features':
-            data.to_parquet(file.name, compression=compression)
+                write_features(data, file, compression=compression, profile=profile)
+        except Exception:
+            file.close()
+            raise
         return file, True
 
-    @staticmethod
-    def __write_json_file(t_file, data, compression=None):
+    def _encode_features(self, features, compression=None) -> Union[str, bytes]:
         """
-        Function to write JSON into a file and point again to the top of the file for reading.
+        Serialize DataFrame, dictionary or columnar features into parquet bytes once, so they can be sent in several
+        requests.
+        Paths and bytes are returned as they are.
 
-        :param t_file: temporary file to contain the data
-        :type t_file: tempfile.NamedTemporaryFile
-        :param data: The data to be stored.
-        :type data: dict
-        :param compression: JSON compression type, same compression methods as in `to_json` in pandas.
-        :type compression: string.
-        :return: saved file.
+        :param features: features as accepted by `run_algorithm`.
+        :param compression: parquet compression, or `ParquetProfile` as accepted by `run_algorithm`.
+        :return: path to features file or parquet file content
         """
-        file_handle = get_handle(t_file.name, "w", compression=compression)
-        file = file_handle[0] if isinstance(file_handle, tuple) else file_handle.handle
+        if isinstance(features, (str, bytes)):
+            return features
+        profile = self._get_parquet_profile(compression)
+        if profile is not None:
+            profile, compression = profile.resolve(features), None
+        if self.serialization_cache is not None:
+            return self.serialization_cache.get_or_serialize(features, compression, profile)
+        return serialize_features(features, compression, profile)
 
-        with file as f:
-            dump(data, f)
-        t_file.seek(0)
+    @staticmethod
+    def _deduplicate(features, stream: bool = False) -> Tuple[DataFrame, Deduplication]:
+        """
+        Remove the repeated rows of DataFrame or dictionary features, see `deduplicate_rows`.
+        """
+        if stream or not isinstance(features, (DataFrame, dict)):
+            raise ValueError("Deduplication requires features as DataFrame or dictionary, without streaming.")
+        return deduplicate_rows(features)
 
     @staticmethod
-    def __remove_file(file, is_to_remove):
+    def _restore_rows(resource, deduplication: Optional[Deduplication], features=None):
         """
-        Remove temporary created file.
+        Scatter the predictions of the returned Result or Task back to the rows removed by deduplication, and keep
+        the index of DataFrame features to label the rows of `to_pandas`.
+        """
+        if resource is False:
+            return resource
+        if deduplication is not None:
+            deduplication.apply(resource)
+        if isinstance(features, DataFrame):
+            resource.features_index = features.index
+        return resource
+
+    @staticmethod
+    def _remove_file(file, is_to_remove):
+        """
+        Close the file and remove it, if it is a generated file stored on disk.
         """
         if file is not None:
             file.close()
-            if is_to_remove and exists(file.name):
-                remove(file.name)
+            name = getattr(file, 'name', None)
+            if is_to_remove and isinstance(name, str) and exists(name):
+                remove(name)
+
+    def _get_parquet_profile(self, compression) -> Optional[ParquetProfile]:
+        """
+        Return the parquet profile to write the features with: `compression` itself if it is a `ParquetProfile`, the
+        'auto' profile of the client for 'auto', `parquet_profile` if no compression is given, None otherwise.
+        """
+        if isinstance(compression, ParquetProfile):
+            return compression
+        if compression == AUTO:
+            if self._auto_parquet_profile is None:
+                self._auto_parquet_profile = ParquetProfile(compression=AUTO)
+            return self._auto_parquet_profile
+        return self.parquet_profile if compression is None else None
+
+    @staticmethod
+    def _process_evaluate(evaluate):
+        """
+        Check the type of evaluate parameter and parse it accordingly.
+
+        :param evaluate: evaluation of the algorithm
+        :type evaluate: bool|dict|string
+        :return: bool|string
+        """
+        if isinstance(evaluate, dict):
+            return json_dump(evaluate)
+        return evaluate
+
+    @staticmethod
+    def _build_get_args(**kwargs):
+        return "?" + "&".join(
+            ["{}={}".format(key, value) for key, value in kwargs.items() if value is not None])
+
+    @staticmethod
+    def _is_binary(filepath: str):
+        """
+        Return true if the given filename appears to be binary.
+        File is considered to be binary if it contains a NULL byte.
+        FIXME: This approach incorrectly reports UTF-16 as binary.
+        """
+        with open(filepath, 'rb') as f:
+            for block in f:
+                if b'\0' in block:
+                    return True
+        return False
+
+
+@Singleton
+class api(BaseApi):
+
+    def __init__(self,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None,
+                 token: Optional[str] = None,
+                 token_refresh: Optional[str] = None,
+                 callback_url: Optional[str] = None,
+                 url: Optional[str] = None,
+                 validate: Optional[bool] = False,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+                 retry: Optional[RetryPolicy] = None,
+                 token_refresh_margin: float = 60,
+                 token_cache: Optional[Union[TokenCache, str]] = None,
+                 token_validator: Optional[TokenValidator] = None,
+                 serialization_cache: Optional[SerializationCache] = None,
+                 metadata_cache: Optional[MetadataCache] = None,
+                 template_cache: Optional[TemplateCache] = None,
+                 parquet_profile: Optional[ParquetProfile] = None):
+        """
+        COMPREDICT's AI Core Client that will provide an interface for communication. This class is singleton,
+        use `api.get_instance` to get the shared client, or `api.new_instance` for independent clients, e.g. for
+        several tenants or URLs in one process. The client is thread-safe, `last_error` is kept per thread.
+
+        :param username: User's username in AI Core.
+        :param password: User's password to AI Core.
+        :param token: API Key used for authorization.
+        :param token_refresh: Token used, when 'token' value is expired, to generate new token.
+        :param callback_url: URL for sending the results of long processes.
+        :param url: URL to desired version of AI Core used.
+        :param validate: indicates, if token should be validated (defaults to False)
+        :param pool_connections: Number of per-host connection pools kept alive by the client.
+        :param pool_maxsize: Maximum number of keep-alive connections per host, should be at least the number of
+            threads using the client concurrently.
+        :param spill_threshold: Size in bytes above which serialized features and parameters are spilled from memory
+            to a temporary file before upload.
+        :param retry: Policy for retrying failed requests with backoff, by default requests are not retried.
+        :param token_refresh_margin: Seconds before the expiry of the access token, when it is refreshed with the
+            refresh token ahead of the next request.
+        :param token_cache: `TokenCache`, or path to its file, shared by processes logging in with the same username
+            and password. Tokens are generated once and reused while valid, instead of each process logging in.
+        :param token_validator: `TokenValidator` checking tokens locally in `verify_token`, AI Core is called only when
+            the validity can't be decided locally.
+        :param serialization_cache: `SerializationCache` reusing the parquet encoding of features sent repeatedly.
+        :param metadata_cache: `MetadataCache` of algorithms and versions, shared resources are returned from it.
+        :param template_cache: `TemplateCache` keeping templates and graphs of algorithm versions on disk.
+        :param parquet_profile: `ParquetProfile` writing the features sent without `compression`.
+        """
+        self.url = api.BASE_URL.format(api.API_VERSION) if url is None else url
+        self.token_refresh_margin = token_refresh_margin
+        self._token_lock = threading.Lock()
+        self.token_cache = TokenCache(token_cache) if isinstance(token_cache, str) else token_cache
+        self._username = username
+        self.token_validator = token_validator
+        self.serialization_cache = serialization_cache
+        self.metadata_cache = metadata_cache
+        self.template_cache = template_cache
+        self.parquet_profile = parquet_profile
+        self._templates_metadata = MetadataCache()
+        self._validators = dict()
+        self._validators_lock = threading.Lock()
+        self._submission_pool = None
+        self._submission_lock = threading.Lock()
+        self.spill_threshold = spill_threshold
+        self.connection = Connection(url=self.url, pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                     retry=retry)
+        self.refresh_token = token_refresh
+
+        if token is not None and validate:
+            self.verify_token(token)
+            self.token = token
+        elif token is not None and not validate:
+            self.token = token
+        elif token is None and (username is not None and password is not None) and self.token_cache is not None:
+            tokens = self.token_cache.get_or_generate(
+                self.url, username, lambda cached: self._generate_cached_tokens(username, password, cached))
+            self.token, self.refresh_token = tokens['access'], tokens.get('refresh')
+        elif token is None and (username is not None and password is not None):
+            self.generate_token(username, password)
+        else:
+            raise ValueError("No token, or username and password, provided.")
+
+        self.callback_url = callback_url
+        self.connection.set_token(self.token)
+        self.connection.token_refresher = self._refresh_access_token
+
+    def _refresh_access_token(self, rejected_authorization: Optional[str] = None) -> bool:
+        """
+        Refresh the access token with the refresh token, when it expires within `token_refresh_margin` seconds or
+        when it was rejected by AI Core.
+
+        The refresh is single-flight: concurrent callers wait for the one refreshing, and callers holding a token that
+        was already replaced don't refresh it again.
+
+        :param rejected_authorization: Authorization header rejected by AI Core, None to only check the expiry.
+        :return: bool indicating if the request can be sent again with a new token, False if the refresh failed.
+        """
+        if rejected_authorization is None and not is_token_expiring(self.token, self.token_refresh_margin):
+            return False
+        with self._token_lock:
+            if rejected_authorization is not None and rejected_authorization != 'Bearer ' + self.token:
+                return True
+            if rejected_authorization is None and not is_token_expiring(self.token, self.token_refresh_margin):
+                return False
+            if self.refresh_token is None or is_token_expiring(self.refresh_token):
+                return False
+            try:
+                if self.token_cache is not None and self._username is not None:
+                    tokens = self.token_cache.get_or_generate(self.url, self._username, self._refresh_cached_tokens,
+                                                              rejected=self.token)
+                    self.token, self.refresh_token = tokens['access'], tokens.get('refresh', self.refresh_token)
+                    self.connection.set_token(self.token)
+                else:
+                    self.generate_token_from_refresh_token()
+            except (ClientError, ServerError):
+                # the request is sent with the current token, its response is handled as usual
+                return False
+            return True
+
+    def _generate_cached_tokens(self, username: str, password: str, cached: Optional[dict]) -> dict:
+        """
+        Generate tokens to be stored in the token cache, with the cached refresh token while it is valid, otherwise by
+        logging in.
+        """
+        if cached is not None and cached.get('refresh') and not is_token_expiring(cached['refresh']):
+            try:
+                self.generate_token_from_refresh_token(cached['refresh'])
+                return dict(access=self.token, refresh=cached['refresh'])
+            except ClientError:
+                pass
+        self.generate_token(username, password)
+        return dict(access=self.token, refresh=self.refresh_token)
+
+    def _refresh_cached_tokens(self, cached: Optional[dict]) -> dict:
+        """
+        Generate new access token to be stored in the token cache.
+        """
+        refresh_token = self.refresh_token
+        if cached is not None and cached.get('refresh') and not is_token_expiring(cached['refresh']):
+            refresh_token = cached['refresh']
+        self.generate_token_from_refresh_token(refresh_token)
+        return dict(access=self.token, refresh=refresh_token)
+
+    def generate_token(self, username: str, password: str):
+        """
+        Generate access token and refresh token from username and password.
+        Refresh token can be used later to generate new access token.
+
+        By calling this method, instance of the client is automatically updated with
+        new access_token and token_refresh.
+
+        :param username: user's username in AI Core
+        :param password: user's password to AI Core
+        """
+        response = generate_token(self.url, username, password, session=self.connection.session)
+        token = self.connection.handle_response(response, True)
+        self.token = token['access']
+        self.refresh_token = token['refresh']
+        self.connection.set_token(self.token)
+
+    def generate_token_from_refresh_token(self, refresh_token: str = None):
+        """
+        Takes a refresh type JSON web token and returns an access type JSON web token if the refresh token is valid.
+
+        By calling this method, instance of the client is automatically updated with new access token.
+        :param refresh_token: refresh token generated by user with username and password
+        """
+        if refresh_token is None and self.refresh_token is None:
+            raise ClientError("Please provide refresh token.")
+        token = refresh_token if refresh_token is not None else self.refresh_token
+        response = generate_token_from_refresh_token(self.url, token, session=self.connection.session)
+        token = self.connection.handle_response(response, True)
+        self.token = token['access']
+        self.connection.set_token(self.token)
+
+    def verify_token(self, token: str = None) -> bool:
+        """
+        Check if token is valid.
+
+        :param token: token which user would like to verify
+        :return: bool indicating if token is valid
+        """
+        if token is None and self.token is None:
+            raise ClientError("Please provide token to verify.")
+        token_to_verify = token if token is not None else self.token
+        if self._validate_token_locally(token_to_verify):
+            return True
+        response = verify_token(self.url, token_to_verify, session=self.connection.session)
+        try:
+            self.connection.handle_response(response, True)
+        except ClientError:
+            self._remember_token_verification(token_to_verify, False)
+            raise
+        self._remember_token_verification(token_to_verify, True)
+        return True
+
+    def _get_metadata(self, kind: str, endpoint: str, build, cache: Optional[MetadataCache] = None):
+        """
+        GET algorithm or version metadata, through `metadata_cache` when it is set.
+
+        :param kind: kind of resource, selecting its ttl in the cache
+        :param endpoint: the targeted endpoint
+        :param build: callable creating the resources from the response
+        :param cache: cache used instead of `metadata_cache`
+        :return: resource, list of resources or False
+        """
+        cache = cache if cache is not None else self.metadata_cache
+        if cache is None:
+            return build(self.connection.GET(endpoint))
+        cached = cache.get(endpoint)
+        if cached is not None and cached.is_fresh():
+            return cached.value
+        response = self.connection.GET(endpoint, headers=cached.conditional_headers() if cached is not None else None)
+        if response is None and cached is not None:
+            cache.refresh(endpoint, kind)
+            return cached.value
+        value = build(response)
+        if value is not False:
+            cache.set(endpoint, kind, value, self.connection.last_request.headers)
+        return value
+
+    def invalidate_metadata(self, algorithm_id: Optional[str] = None):
+        """
+        Remove algorithms and versions from `metadata_cache`, and from the versions whose templates are cached for
+        `validate_schema` and `optimize`, so they are requested again.
+
+        :param algorithm_id: algorithm whose metadata is removed, all metadata if None.
+        """
+        for cache in (self.metadata_cache, self._templates_metadata):
+            if cache is None:
+                continue
+            if algorithm_id is None:
+                cache.invalidate()
+            else:
+                cache.invalidate(f'/algorithms/{algorithm_id}')
+                cache.invalidate('/algorithms', recursive=False)
+
+    def get_algorithms(self) -> Union[List[resources.Algorithm], bool]:
+        """
+        Returns the collection of algorithms
+
+        :return: list of algorithms
+        """
+        return self._get_metadata('algorithms', '/algorithms',
+                                  lambda response: self._map_collection('Algorithm', response))
+
+    def get_algorithm(self, algorithm_id: str) -> Union[resources.Algorithm, bool]:
+        """
+        Get the information of the given algorithm id
+
+        :param algorithm_id: String identifier of the algorithm
+        :return: Algorithm resource
+        """
+        return self._get_metadata('algorithm', '/algorithms/{}'.format(algorithm_id),
+                                  lambda response: self._map_resource('Algorithm', response))
+
+    def _stream_features(self, features, compression=None, row_group_size=DEFAULT_ROW_GROUP_SIZE, profile=None):
+        """
+        Prepare features to be encoded while they are uploaded.
+
+        :param features: path to parquet file, parquet bytes, DataFrame, dictionary, arrow Table or RecordBatch, or an
+            iterable of DataFrames, Tables or RecordBatches.
+        :param compression: parquet compression codec.
+        :param row_group_size: Number of rows in one parquet row group.
+        :param profile: `ParquetProfile` of the features, its `row_group_size` replaces the given one if set.
+        :return: opened file or generator of parquet bytes, bool indicating if file should be removed afterwards.
+        """
+        if isinstance(features, str):
+            self._raise_error_if_file_type_incorrect(features, "features")
+            return map_file(features), False
+        if isinstance(features, bytes):
+            # already serialized, e.g. by `serialize_features`
+            return BytesIO(features), False
+        if profile is not None:
+            profile = profile.resolve(features)
+            return iter_parquet(features, row_group_size=profile.row_group_size or row_group_size,
+                                writer_options=profile.writer_options()), False
+        return iter_parquet(features, compression=compression, row_group_size=row_group_size), False
+
+    def _post_files(self, endpoint: str, params: dict, files: dict, stream: bool = False):
+        """
+        Send the form with files, as multipart body generated while uploading in streaming mode, or when the features
+        are a memory-mapped file, which is then uploaded from the map without being read into memory first.
+        """
+        if stream:
+            return self.connection.POST(endpoint, data=StreamingMultipart(params, files))
+        if isinstance(files['features'][1], mmap):
+            return self.connection.POST(endpoint, data=SizedMultipart(params, files))
+        return self.connection.POST(endpoint, data=params, files=files)
 
     def run_algorithm(self,
                       algorithm_id: str,
@@ -284,14 +623,20 @@ class api:
                       callback_url: Optional[Union[str, List[str]]] = None,
                       callback_param: Optional[Union[dict, List[dict]]] = None,
                       parameters: Optional[Union[str, dict]] = None,
-                      compression: Optional[str] = None,
-                      monitor: bool = True) -> Union[resources.Task, resources.Result, bool]:
+                      compression: Optional[Union[str, ParquetProfile]] = None,
+                      monitor: bool = True,
+                      stream: bool = False,
+                      row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                      deduplicate: bool = False,
+                      optimize: Union[bool, FeatureOptimizer] = False,
+                      validate_schema: bool = False) -> Union[resources.Task, resources.Result, bool]:
         """
         Run the given algorithm id with the passed data. The user have the ability to toggle encryption and evaluation.
 
         :param algorithm_id: String identifier of the algorithm
-        :param features: Features can be specified as path to features .parquet file, dictionary
-        or pandas.Dataframe.
+        :param features: Features can be specified as path to features .parquet file, dictionary, pandas.Dataframe,
+        arrow Table or RecordBatch, NumPy structured array or object exposing the dataframe interchange protocol
+        (`__dataframe__`). In streaming mode also as iterable of DataFrames or arrow record batches.
         :param version: Choose the version of the algorithm you would like to call. Defaults to latest version.
         :param evaluate: Boolean to whether evaluate the results of predictions or not.
         :param callback_param: The callback additional parameter to be sent with results.
@@ -306,36 +651,227 @@ class api:
         for the file content type you will send. Based on data type:
             - if data is pandas or dict, then the compression is done by the function.
             - if string or path, then it describes the compression of the file sent.
+            A `ParquetProfile`, or 'auto' for the codec with the lowest estimated encoding plus upload time, sets all
+            the parquet options of the features; the parameters are then sent uncompressed. Without compression,
+            `parquet_profile` of the client is used when it is set.
         :param monitor: Boolean to monitor the output results of the model or not.
+        :param stream: Encode the features into parquet row group by row group while uploading them with chunked
+            transfer encoding, so the memory used is bounded by one row group regardless of the size of features.
+        :param row_group_size: Number of rows in one parquet row group in streaming mode.
+        :param deduplicate: Upload only the unique rows of DataFrame or dictionary features. Predictions are
+            scattered back to the original rows, and `deduplication` of the Result or Task reports the dedup `ratio`.
+        :param optimize: Shrink DataFrame or dictionary features with the features template of the version before
+            uploading them, True for the default `FeatureOptimizer` or a configured one. `optimization` of the Result
+            or Task reports the dropped columns, the compacted dtypes and the memory saved.
+        :param validate_schema: Check DataFrame or dictionary features and dictionary parameters against the templates
+            of the version before sending anything, see `SchemaValidator`.
+        :raises SchemaError: with the differences from the templates, if `validate_schema` is set and they don't match.
         :return: Prediction if results are returned instantly or Task otherwise.
         """
-
+        deduplication, optimization, original = None, None, features
+        if deduplicate:
+            features, deduplication = self._deduplicate(features, stream)
+        if optimize:
+            features, optimization = self._optimize_features(features, optimize, algorithm_id, version)
+        if validate_schema:
+            self._validate_schema(algorithm_id, features, parameters, version)
+
+        profile = self._get_parquet_profile(compression)
+        if profile is not None:
+            compression = None
         features_file, is_features_file_to_remove = None, False
         parameters_file, is_parameters_file_to_remove = None, False
         try:
-            features_file, is_features_file_to_remove = self.__process_data(features, "features",
-                                                                            compression=compression)
+            if stream:
+                features_file, is_features_file_to_remove = self._stream_features(features, compression,
+                                                                                  row_group_size, profile)
+            else:
+                features_file, is_features_file_to_remove = self._process_data(features, "features",
+                                                                               compression=compression,
+                                                                               profile=profile)
             if parameters:
-                parameters_file, is_parameters_file_to_remove = self.__process_data(parameters, "parameters",
-                                                                                    compression=compression)
+                parameters_file, is_parameters_file_to_remove = self._process_data(parameters, "parameters",
+                                                                                   compression=compression)
 
             callback_url = self._set_callback_urls(
                 callback_url) if callback_url is not None else self.callback_url
 
-            params = dict(evaluate=self.__process_evaluate(evaluate), monitor=monitor,
+            params = dict(evaluate=self._process_evaluate(evaluate), monitor=monitor,
                           callback_url=callback_url, callback_param=json_dump(callback_param),
                           compression=compression, version=version)
 
             files = {"features": ("features.parquet", features_file, "application/parquet"),
                      "parameters": ("parameters.json", parameters_file, "application/json")}
 
-            response = self.connection.POST(f'/algorithms/{algorithm_id}/predict',
-                                            data=params, files=files)
+            response = self._post_files(f'/algorithms/{algorithm_id}/predict', params, files, stream)
             resource = 'Task' if response is not False and 'job_id' in response else 'Result'
         finally:
-            self.__remove_file(features_file, is_features_file_to_remove)
-            self.__remove_file(parameters_file, is_parameters_file_to_remove)
-        return self.__map_resource(resource, response)
+            self._remove_file(features_file, is_features_file_to_remove)
+            self._remove_file(parameters_file, is_parameters_file_to_remove)
+        result = self._restore_rows(self._map_resource(resource, response), deduplication, original)
+        if optimization is not None and result is not False:
+            result.optimization = optimization
+        return result
+
+    def _optimize_features(self, features, optimize: Union[bool, FeatureOptimizer], algorithm_id: str,
+                           version: Optional[str] = None) -> Tuple[DataFrame, Optimization]:
+        """
+        Optimize the features with the features template of the version, see `FeatureOptimizer`.
+        """
+        if not isinstance(features, (DataFrame, dict)):
+            raise ValueError("Optimization requires features as DataFrame or dictionary.")
+        optimizer = optimize if isinstance(optimize, FeatureOptimizer) else FeatureOptimizer()
+        return optimizer.optimize(features, self._get_features_format(algorithm_id, version))
+
+    def _get_features_format(self, algorithm_id: str, version: Optional[str] = None) -> Optional[list]:
+        """
+        Return the features template of the version, latest if None, taken from `metadata_cache` when it is set.
+        """
+        version = self._get_version(algorithm_id, version)
+        return version.features_format if version is not None else None
+
+    def _get_version(self, algorithm_id: str, version: Optional[str] = None) -> Optional[resources.Version]:
+        """
+        Return the version of the algorithm, latest if None, or None if it can't be retrieved. The versions are
+        taken from `metadata_cache` when it is set, and are otherwise cached by the client for
+        `DEFAULT_METADATA_TTL` seconds, so their templates are not requested for every prediction.
+        """
+        cache = self.metadata_cache if self.metadata_cache is not None else self._templates_metadata
+        if version is None:
+            algorithm = self._get_metadata('algorithm', f'/algorithms/{algorithm_id}',
+                                           lambda response: self._map_resource('Algorithm', response), cache)
+            return algorithm.versions[0] if algorithm is not False and algorithm.versions else None
+        version = self._get_metadata('version', f'/algorithms/{algorithm_id}/versions/{version}',
+                                     partial(self._build_version, algorithm_id), cache)
+        return version if version is not False else None
+
+    def _validate_schema(self, algorithm_id: str, features, parameters=None, version: Optional[str] = None):
+        """
+        Validate the features and parameters against the templates of the version, see `SchemaValidator.validate`.
+        """
+        validator = self.get_validator(algorithm_id, version)
+        if validator is not None:
+            validator.validate(features, parameters)
+
+    def get_validator(self, algorithm_id: str, version: Optional[str] = None) -> Optional[SchemaValidator]:
+        """
+        Return the `SchemaValidator` compiled from the features template of the version, latest if None, and from
+        its parameters template, downloaded through `template_cache` when it is set. Validators are compiled once
+        per algorithm version and kept by the client.
+
+        :param algorithm_id: String identifier of the algorithm
+        :param version: version of the algorithm, latest if None
+        :return: validator, or None if the version can't be retrieved
+        """
+        if version is not None:
+            with self._validators_lock:
+                validator = self._validators.get((algorithm_id, version))
+            if validator is not None:
+                return validator
+        resource = self._get_version(algorithm_id, version)
+        if resource is None:
+            return None
+        key = (algorithm_id, resource.version)
+        with self._validators_lock:
+            validator = self._validators.get(key)
+        if validator is None:
+            validator = SchemaValidator.from_version(resource,
+                                                     self._get_parameters_format(algorithm_id, resource.version))
+            with self._validators_lock:
+                validator = self._validators.setdefault(key, validator)
+        return validator
+
+    def _get_parameters_format(self, algorithm_id: str, version: str) -> Optional[list]:
+        """
+        Return the parameters template of the version, None if it can't be retrieved.
+        """
+        try:
+            template = self.get_template(algorithm_id, file_type='parameters', version=version)
+        except ClientError:
+            return None
+        if template is False:
+            return None
+        with template:
+            try:
+                return json_load(template)
+            except ValueError:
+                return None
+
+    @property
+    def submission_pool(self) -> SubmissionPool:
+        """
+        The pool running the predictions of `submit`, created with the default settings on first use. It can be
+        replaced by a `SubmissionPool` with custom settings.
+        """
+        with self._submission_lock:
+            if self._submission_pool is None:
+                self._submission_pool = SubmissionPool(self)
+            return self._submission_pool
+
+    @submission_pool.setter
+    def submission_pool(self, pool: SubmissionPool):
+        self._submission_pool = pool
+
+    def submit(self, algorithm_id: str, features: Union[str, bytes, DataFrame, dict], **kwargs) -> Future:
+        """
+        Run the given algorithm in the background of `submission_pool`: features are serialized in a process pool and
+        uploaded in a thread pool, and queued tasks are polled until they are finished. Blocks while the maximum
+        number of predictions of the pool are in flight.
+
+        :param algorithm_id: String identifier of the algorithm
+        :param features: Features as accepted by `run_algorithm`, or parquet file content as bytes.
+        :param kwargs: other arguments of `run_algorithm`.
+        :return: future completed with the final Result, or with the error of the prediction.
+        """
+        return self.submission_pool.submit(algorithm_id, features, **kwargs)
+
+    def run_algorithm_chunked(self,
+                              algorithm_id: str,
+                              features: Union[DataFrame, dict],
+                              chunk_size: Optional[int] = None,
+                              chunk_bytes: Optional[int] = None,
+                              max_attempts: int = 3,
+                              **kwargs) -> resources.Result:
+        """
+        Run the given algorithm on chunks of consecutive rows of the features, submitted concurrently through
+        `submission_pool`, and reassemble their results into one Result in the original order of the rows.
+
+        Chunks that fail with a server or connection error are submitted again, up to `max_attempts` times, while
+        the successful ones are kept. Other errors are raised at once.
+
+        :param algorithm_id: String identifier of the algorithm
+        :param features: Features as DataFrame or dictionary.
+        :param chunk_size: Number of rows in one chunk.
+        :param chunk_bytes: Approximate size in bytes of one chunk in memory, used if `chunk_size` is not given.
+        :param max_attempts: Maximum number of attempts of each chunk, at least 1.
+        :param kwargs: other arguments of `run_algorithm`, applied to every chunk.
+        :return: Result with merged `predictions`, `evaluations` and `monitors`, see `merge_chunks`.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        if kwargs.pop('validate_schema', False):
+            self._validate_schema(algorithm_id, features, kwargs.get('parameters'), kwargs.get('version'))
+        chunks = list(split_rows(features, chunk_size, chunk_bytes))
+        results = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        for attempt in range(1, max_attempts + 1):
+            futures = {index: self.submit(algorithm_id, chunks[index], **kwargs) for index in pending}
+            pending, error = [], None
+            for index, future in futures.items():
+                try:
+                    results[index] = future.result()
+                except RETRYABLE_CHUNK_ERRORS as exception:
+                    pending.append(index)
+                    error = exception
+            if not pending:
+                break
+        else:
+            raise error
+        return self._restore_rows(self._map_resource('Result', dict(
+            predictions=merge_chunks([result.predictions for result in results]),
+            evaluations=merge_chunks([result.evaluations for result in results]),
+            monitors=merge_chunks([result.monitors for result in results]),
+            chunks=len(chunks))), None, features)
 
     def train_algorithm(self,
                         algorithm_id: str,
@@ -343,14 +879,17 @@ class api:
                         version: Optional[str] = None,
                         export_new_version: Optional[bool] = None,
                         parameters: Optional[Union[str, dict]] = None,
-                        compression: Optional[str] = None,
-                        monitor: bool = True) -> Union[resources.Task, bool]:
+                        compression: Optional[Union[str, ParquetProfile]] = None,
+                        monitor: bool = True,
+                        stream: bool = False,
+                        row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> Union[resources.Task, bool]:
         """
         Train fit algorithm with the passed data.
 
         :param algorithm_id: String identifier of the algorithm.
-        :param features: Features can be specified as path to features .parquet file, dictionary
-        or pandas.Dataframe.
+        :param features: Features can be specified as path to features .parquet file, dictionary, pandas.Dataframe,
+        arrow Table or RecordBatch, NumPy structured array or object exposing the dataframe interchange protocol
+        (`__dataframe__`). In streaming mode also as iterable of DataFrames or arrow record batches.
         :param version: Choose the version of the algorithm you would like to call. Default is latest version.
         :param export_new_version: The trained model will be exported to a new version if True.
                Otherwise, the requested version will be updated. If None, then the model’s default behavior
@@ -360,18 +899,30 @@ class api:
                for the file content type you will send. Based on data type:
                - if data is pandas or dict, then the compression is done by the function.
                - if string or path, then it describes the compression of the file sent.
+               A `ParquetProfile` or 'auto' sets all the parquet options of the features, see `run_algorithm`.
         :param monitor: Boolean to monitor the output results of the model or not
+        :param stream: Encode the features into parquet row group by row group while uploading them with chunked
+            transfer encoding, so the memory used is bounded by one row group regardless of the size of features.
+        :param row_group_size: Number of rows in one parquet row group in streaming mode.
         :return: Task (since all processing fit algorithms always end up in queue).
         """
-        features_file, to_remove_features = None, False
-        parameters_file, to_remove_parameters = None, False
+        profile = self._get_parquet_profile(compression)
+        if profile is not None:
+            compression = None
+        features_file, is_features_file_to_remove = None, False
+        parameters_file, is_parameters_file_to_remove = None, False
 
         try:
-            features_file, is_features_file_to_remove = self.__process_data(features, "features",
-                                                                            compression=compression)
+            if stream:
+                features_file, is_features_file_to_remove = self._stream_features(features, compression,
+                                                                                  row_group_size, profile)
+            else:
+                features_file, is_features_file_to_remove = self._process_data(features, "features",
+                                                                               compression=compression,
+                                                                               profile=profile)
             if parameters is not None:
-                parameters_file, is_parameters_file_to_remove = self.__process_data(parameters, "parameters",
-                                                                                    compression=compression)
+                parameters_file, is_parameters_file_to_remove = self._process_data(parameters, "parameters",
+                                                                                   compression=compression)
 
             files = {"features": ("features.parquet", features_file, "application/parquet"),
                      "parameters": ("parameters.json", parameters_file, "application/json")}
@@ -379,25 +930,11 @@ class api:
             params = dict(export_new_version=export_new_version, compression=compression, version=version,
                           monitor=monitor)
 
-            response = self.connection.POST('/algorithms/{}/fit'.format(algorithm_id),
-                                            data=params, files=files)
+            response = self._post_files('/algorithms/{}/fit'.format(algorithm_id), params, files, stream)
         finally:
-            self.__remove_file(features_file, to_remove_features)
-            self.__remove_file(parameters_file, to_remove_parameters)
-        return self.__map_resource("Task", response)
-
-    @staticmethod
-    def __process_evaluate(evaluate):
-        """
-        Check the type of evaluate parameter and parse it accordingly.
-
-        :param evaluate: evaluation of the algorithm
-        :type evaluate: bool|dict|string
-        :return: bool|string
-        """
-        if isinstance(evaluate, dict):
-            return json_dump(evaluate)
-        return evaluate
+            self._remove_file(features_file, is_features_file_to_remove)
+            self._remove_file(parameters_file, is_parameters_file_to_remove)
+        return self._map_resource("Task", response)
 
     def cancel_task(self, task_id: str) -> Union[resources.Task, bool]:
         """
@@ -407,7 +944,7 @@ class api:
         :return: Cancelled task instance.
         """
         response = self.connection.DELETE('/algorithms/tasks/{}'.format(task_id))
-        return self.__map_resource('Task', response)
+        return self._map_resource('Task', response)
 
     def get_task_results(self, task_id: str) -> Union[resources.Task, bool]:
         """
@@ -417,7 +954,7 @@ class api:
         :return: The new results of the Task
         """
         response = self.connection.GET('/algorithms/tasks/{}'.format(task_id))
-        return self.__map_resource('Task', response)
+        return self._map_resource('Task', response)
 
     def get_algorithm_versions(self, algorithm_id: str) -> Union[List[resources.Version], bool]:
         """
@@ -426,10 +963,12 @@ class api:
         :param algorithm_id: The id of the main algorithm
         :return: List of versions
         """
-        response = self.connection.GET('/algorithms/{}/versions'.format(algorithm_id))
-        if isinstance(response, list):
-            [response[i].update(dict(algorithm_id=algorithm_id)) for i in range(len(response))]
-        return self.__map_collection('Version', response)
+        def build(response):
+            if isinstance(response, list):
+                [response[i].update(dict(algorithm_id=algorithm_id)) for i in range(len(response))]
+            return self._map_collection('Version', response)
+
+        return self._get_metadata('versions', '/algorithms/{}/versions'.format(algorithm_id), build)
 
     def get_algorithm_version(self, algorithm_id: str, version: str) -> Union[resources.Version, bool]:
         """
@@ -439,59 +978,100 @@ class api:
         :param version: Specify the version of the algorithm
         :return: Version
         """
-        response = self.connection.GET('/algorithms/{}/versions/{}'.format(algorithm_id, version))
+        return self._get_metadata('version', '/algorithms/{}/versions/{}'.format(algorithm_id, version),
+                                  partial(self._build_version, algorithm_id))
+
+    def _build_version(self, algorithm_id: str, response) -> Union[resources.Version, bool]:
         if isinstance(response, dict):
             response.update(dict(algorithm_id=algorithm_id))
-        return self.__map_resource('Version', response)
+        return self._map_resource('Version', response)
+
+    def _resolve_version(self, algorithm_id: str, version: Optional[str]) -> Optional[str]:
+        """
+        Return the given version, or the latest version of the algorithm if None.
+        """
+        if version is not None:
+            return version
+        algorithm = self.get_algorithm(algorithm_id)
+        if algorithm is False or not algorithm.versions:
+            return None
+        return algorithm.versions[0].version
+
+    def _get_file_path(self, kind: str, algorithm_id: str, file_type: str,
+                       version: Optional[str] = None) -> Union[str, bool]:
+        """
+        Return path of the template or graph in `template_cache`, downloading it on first use.
+
+        :param kind: 'template' or 'graph'
+        :return: path to the cached file, False on error
+        """
+        if self.template_cache is None:
+            raise ValueError("Paths of templates and graphs require `template_cache`.")
+        version = self._resolve_version(algorithm_id, version)
+        if version is None:
+            return False
+        get_args = self._build_get_args(type=file_type, version=version)
+        endpoint = '/algorithms/{}/{}{}'.format(algorithm_id, kind, get_args)
+        key = self.template_cache.key(kind, algorithm_id, version, file_type)
+        return self.template_cache.get_or_download(key, lambda file: self.connection.GET_FILE(endpoint, file))
+
+    def _get_file(self, kind: str, algorithm_id: str, file_type: str, version: Optional[str] = None):
+        if self.template_cache is not None:
+            path = self._get_file_path(kind, algorithm_id, file_type, version)
+            return open(path, 'rb') if path is not False else False
+        get_args = self._build_get_args(type=file_type, version=version)
+        return self.connection.GET('/algorithms/{}/{}{}'.format(algorithm_id, kind, get_args))
 
     def get_template(self, algorithm_id: str,
                      file_type: str = 'input',
-                     version: Optional[str] = None) -> NamedTemporaryFile:
+                     version: Optional[str] = None) -> IO[bytes]:
         """
         Return the template that explains the data to be sent for the algorithms. Bear in mind, to close the file once
         done to delete it.
 
+        With `template_cache`, the file is opened from the cache, and downloaded only the first time.
+
         :param algorithm_id: String identifier of the Algorithm.
         :param file_type: (default `input`) indicates from which algorithms template data graph should be retrieved.
             Can be 'input', 'output' or 'parameters'.
         :param version: (default None) version of algorithm from which template should be retrieved.
             Defaults to latest version of algorithm.
-        :return: NamedTemporaryFile of the results.
+        :return: NamedTemporaryFile of the results, or file opened from the cache.
         """
-        get_args = self.__build_get_args(type=file_type, version=version)
-        response = self.connection.GET('/algorithms/{}/template{}'.format(algorithm_id, get_args))
-        return response
+        return self._get_file('template', algorithm_id, file_type, version)
 
     def get_graph(self, algorithm_id: str, file_type: str,
-                  version: Optional[str] = None) -> NamedTemporaryFile:
+                  version: Optional[str] = None) -> IO[bytes]:
         """
         Return the graph that explains the input data to be sent for the algorithms.
 
+        With `template_cache`, the file is opened from the cache, and downloaded only the first time.
+
         :param algorithm_id: String identifier of the algorithm.
         :param file_type: (default `input`) indicates from which algorithms template data graph should be retrieved.
             Can be 'input', 'output' or 'parameters'.
         :param version: (default None) version of algorithm from which graph should be retrieved.
             Defaults to latest version of algorithm.
-        :return: NamedTemporaryFile of the results.
+        :return: NamedTemporaryFile of the results, or file opened from the cache.
         """
-        get_args = self.__build_get_args(type=file_type, version=version)
-        response = self.connection.GET('/algorithms/{}/graph{}'.format(algorithm_id, get_args))
-        return response
+        return self._get_file('graph', algorithm_id, file_type, version)
 
-    @staticmethod
-    def __build_get_args(**kwargs):
-        return "?" + "&".join(
-            ["{}={}".format(key, value) for key, value in kwargs.items() if value is not None])
+    def get_template_path(self, algorithm_id: str, file_type: str = 'input',
+                          version: Optional[str] = None) -> Union[str, bool]:
+        """
+        Return the path of the template in `template_cache`, downloaded only the first time. The file must not be
+        modified; use `TemplateCache.map` to memory-map it.
 
-    @staticmethod
-    def __is_binary(filepath: str):
+        :param algorithm_id: String identifier of the Algorithm.
+        :param file_type: 'input', 'output' or 'parameters'.
+        :param version: version of algorithm, defaults to latest version of algorithm.
+        :return: path to the template, False on error.
         """
-        Return true if the given filename appears to be binary.
-        File is considered to be binary if it contains a NULL byte.
-        FIXME: This approach incorrectly reports UTF-16 as binary.
+        return self._get_file_path('template', algorithm_id, file_type, version)
+
+    def get_graph_path(self, algorithm_id: str, file_type: str = 'input',
+                       version: Optional[str] = None) -> Union[str, bool]:
         """
-        with open(filepath, 'rb') as f:
-            for block in f:
-                if b'\0' in block:
-                    return True
-        return False
+        Return the path of the graph in `template_cache`, downloaded only the first time, see `get_template_path`.
+        """
+        return self._get_file_path('graph', algorithm_id, file_type, version)
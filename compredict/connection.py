@@ -1,33 +1,94 @@
+import threading
 from tempfile import NamedTemporaryFile
-from typing import Union
+from time import sleep
+from typing import Iterator, Optional, Union
 
-import requests
-from requests import Response
+from requests import Response, Session
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.adapters import HTTPAdapter
 
 from compredict.exceptions import ClientError, ServerError
 from compredict.exceptions import Error
+from compredict.utils.streaming import SizedMultipart, StreamingMultipart
 from compredict.utils.utils import extract_error_message
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class Connection:
 
-    def __init__(self, url, token=None):
+    def __init__(self, url, token=None, pool_connections=10, pool_maxsize=10, pool_block=False, retry=None):
         """
         Class response for HTTP requests and communication.
 
+        All requests are sent through one pooled session, so the TCP/TLS connections to AI Core are kept alive
+        and reused between calls. The connection can be shared by threads: headers are copied for each request, and
+        `last_request` and `last_error` are kept per thread.
+
         :param url: The base url string
         :param token: The API authorization token.
+        :param pool_connections: Number of per-host connection pools to keep.
+        :param pool_maxsize: Maximum number of connections kept alive per host.
+        :param pool_block: Whether to block when no free connection is available instead of opening a new one.
+        :param retry: `RetryPolicy` of failed requests, no request is retried if None.
         """
         self.url = url
-        self.last_error = False
+        self._local = threading.local()
         self.fail_on_error = False
         self.ssl = True
-        self.response = None
         self.headers = dict(Accept='application/json')
-        self.last_request = None
+        self.retry = retry
+        self.token_refresher = None
+        self.session = self.create_session(pool_connections, pool_maxsize, pool_block)
         if token is not None:
             self.headers['Authorization'] = 'Bearer ' + token
 
+    @property
+    def last_request(self) -> Optional[Response]:
+        """
+        The last response received by the current thread.
+        """
+        return getattr(self._local, 'last_request', None)
+
+    @last_request.setter
+    def last_request(self, response: Optional[Response]):
+        self._local.last_request = response
+
+    @property
+    def last_error(self) -> Union[Error, bool]:
+        """
+        The last error received by the current thread, False if none.
+        """
+        return getattr(self._local, 'last_error', False)
+
+    @last_error.setter
+    def last_error(self, error: Union[Error, bool]):
+        self._local.last_error = error
+
+    @staticmethod
+    def create_session(pool_connections=10, pool_maxsize=10, pool_block=False) -> Session:
+        """
+        Create keep-alive session with connection pooling for http and https.
+
+        :param pool_connections: Number of per-host connection pools to keep.
+        :param pool_maxsize: Maximum number of connections kept alive per host.
+        :param pool_block: Whether to block when no free connection is available.
+        :return: requests Session
+        """
+        session = Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        """
+        Close the pooled connections.
+
+        :return: None
+        """
+        self.session.close()
+
     def set_token(self, token):
         """
         Set the token for authorization.
@@ -42,30 +103,85 @@ class Connection:
         Responsible for sending POST request and uploading files if specified.
 
         :param endpoint: the endpoint of the URL.
-        :param data: The form data to be sent.
+        :param data: The form data to be sent, `StreamingMultipart` body uploaded with chunked transfer encoding, or
+            `SizedMultipart` body uploaded with its `Content-Length`.
         :param files: The files to be sent.
         :return: JSON if request is correct otherwise false.
         """
         address = self.url + endpoint
-        if files is not None:
-            if 'Content-Type' in self.headers:
-                del self.headers['Content-Type']
+        if isinstance(data, SizedMultipart):
+            content_type = data.content_type
+        elif isinstance(data, StreamingMultipart):
+            content_type = data.content_type
+            data = iter(data)
+        elif files is not None:
+            content_type = None
         else:
-            self.headers['Content-Type'] = 'application/json'
-        self.last_request = requests.post(address, files=files, data=data, headers=self.headers, verify=self.ssl)
+            content_type = 'application/json'
+        self.last_request = self._send('POST', address, content_type, files=files, data=data)
         return self.handle_response(self.last_request, self.fail_on_error)
 
-    def GET(self, endpoint):
+    def GET(self, endpoint, headers=None):
         """
-        Responsible for sending GET requests.
+        Responsible for sending GET requests. Templates and graphs are streamed into a temporary file.
 
         :param endpoint: the targeted endpoint.
-        :return: JSON if request is correct otherwise false.
+        :param headers: additional headers of the request, e.g. conditional `If-None-Match`.
+        :return: JSON if request is correct otherwise false, None if the resource was not modified (304).
         """
         address = self.url + endpoint
-        self.headers['Content-Type'] = 'application/json'
-        self.last_request = requests.get(address, None, headers=self.headers, verify=self.ssl)
-        return self.handle_response(self.last_request, self.fail_on_error)
+        stream = self._is_file(address)
+        self.last_request = self._send('GET', address, 'application/json', extra_headers=headers, stream=stream)
+        try:
+            if self.last_request.status_code == 304:
+                return None
+            return self.handle_response(self.last_request, self.fail_on_error)
+        finally:
+            self._release(self.last_request)
+
+    def GET_FILE(self, endpoint, file):
+        """
+        Download the file of the endpoint, e.g. template or graph, into the given binary file. The content is streamed
+        in chunks of `DOWNLOAD_CHUNK_SIZE` bytes, so it is never held in memory as a whole.
+
+        :param endpoint: the targeted endpoint.
+        :param file: binary file-like object the content is written to.
+        :return: extension of the file ('.png' or '.json') if request is correct otherwise false.
+        """
+        self.last_request = self._send('GET', self.url + endpoint, 'application/json', stream=True)
+        try:
+            if self.last_request.status_code >= 400:
+                return self.handle_response(self.last_request, self.fail_on_error)
+            self._write_content(self.last_request, file)
+        finally:
+            self._release(self.last_request)
+        return self._file_extension(self.last_request)
+
+    @staticmethod
+    def _is_file(url: str) -> bool:
+        return '/template' in url or '/graph' in url
+
+    @staticmethod
+    def _release(response: Optional[Response]):
+        """
+        Give the connection of a streamed response back to the pool, without reading the rest of its body.
+        """
+        if response is not None and response.raw is not None:
+            response.close()
+
+    @staticmethod
+    def _write_content(response: Response, file):
+        """
+        Write the body of the response into the file, chunk by chunk if it was not read yet.
+        """
+        chunks = (response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE) if response.raw is not None
+                  else (response.content,))
+        for chunk in chunks:
+            file.write(chunk)
+
+    @staticmethod
+    def _file_extension(response: Response) -> str:
+        return '.png' if response.headers.get('Content-Type') == 'image/png' else '.json'
 
     def DELETE(self, endpoint):
         """
@@ -75,10 +191,88 @@ class Connection:
         :return: JSON with task instance otherwise
         """
         address = self.url + endpoint
-        self.headers['Content-Type'] = 'application/json'
-        self.last_request = requests.delete(address, None, headers=self.headers, verify=self.ssl)
+        self.last_request = self._send('DELETE', address, 'application/json')
         return self.handle_response(self.last_request, self.fail_on_error)
 
+    def _request_headers(self, content_type: Optional[str] = None, extra_headers: Optional[dict] = None) -> dict:
+        """
+        Return a copy of the headers for one request, so concurrent requests don't change each other's headers.
+
+        :param content_type: Content-Type of the request, None to let the HTTP library set it (e.g. multipart).
+        :param extra_headers: additional headers of the request.
+        :return: headers of the request
+        """
+        headers = dict(self.headers)
+        headers.pop('Content-Type', None)
+        if content_type is not None:
+            headers['Content-Type'] = content_type
+        if extra_headers:
+            headers.update(extra_headers)
+        return headers
+
+    def _send(self, method: str, address: str, content_type: Optional[str] = None, extra_headers: Optional[dict] = None,
+              **kwargs) -> Response:
+        """
+        Send the request through the session, retrying it as allowed by the retry policy.
+
+        If `token_refresher` is set, it is called before sending to refresh the token ahead of its expiry, and once
+        more with the rejected authorization when AI Core responds with 401, in which case the request is replayed.
+
+        The returned response holds `retries`, the number of retries done, and `retry_sleep`, the total time in
+        seconds slept between the attempts.
+
+        :param method: HTTP method
+        :param address: full url
+        :param content_type: Content-Type of the request, see `_request_headers`.
+        :param extra_headers: additional headers of the request.
+        :param kwargs: other arguments of the request
+        :return: the last response
+        """
+        send = getattr(self.session, method.lower())
+        replayable = not isinstance(kwargs.get('data'), Iterator)
+        if self.token_refresher is not None:
+            self.token_refresher()
+        attempt, slept, token_refreshed = 0, 0.0, False
+        while True:
+            attempt += 1
+            can_retry = self.retry is not None and replayable and self.retry.can_retry(method, attempt)
+            headers = self._request_headers(content_type, extra_headers)
+            authorization = headers.get('Authorization')
+            try:
+                response = send(address, headers=headers, verify=self.ssl, **kwargs)
+            except RequestsConnectionError:
+                if not (can_retry and self.retry.retry_connection_errors):
+                    raise
+                response = None
+            if (response is not None and response.status_code == 401 and replayable and not token_refreshed
+                    and self.token_refresher is not None and self.token_refresher(authorization)):
+                token_refreshed = True
+                attempt -= 1
+                self._rewind_files(kwargs.get('files'))
+                continue
+            if response is not None and not (can_retry and self.retry.is_retryable_response(response)):
+                break
+            self._release(response)
+            backoff = self.retry.get_backoff(attempt, response)
+            sleep(backoff)
+            slept += backoff
+            self._rewind_files(kwargs.get('files'))
+        response.retries = attempt - 1
+        response.retry_sleep = slept
+        return response
+
+    @staticmethod
+    def _rewind_files(files):
+        """
+        Point the files to be uploaded back to their beginning, so the request can be sent again.
+        """
+        if not isinstance(files, dict):
+            return
+        for file in files.values():
+            content = file[1] if isinstance(file, (tuple, list)) else file
+            if hasattr(content, 'seek'):
+                content.seek(0)
+
     def handle_response(self, response: Response, fail_on_error: bool) -> Union[dict, bool]:
         """
         Handles responses based on the status code. In addition it raises exception if fail_on_error is True.
@@ -111,12 +305,14 @@ class Connection:
                 self.last_error = error
                 return False
 
-        if '/template' in response.url or '/graph' in response.url:
-            ext = '.png' if response.headers['Content-Type'] == 'image/png' else '.json'
-            response = NamedTemporaryFile(suffix=ext)
-            response.write(response.content)
-            response.seek(0)
-        else:
-            response = response.json()
+        if self._is_file(response.url):
+            file = NamedTemporaryFile(suffix=self._file_extension(response))
+            try:
+                self._write_content(response, file)
+            except BaseException:
+                file.close()
+                raise
+            file.seek(0)
+            return file
 
-        return response
+        return response.json()
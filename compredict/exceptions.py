@@ -2,13 +2,21 @@ class CompredictError(Exception):
     """Error generated from COMPREDICT SDK."""
 
     def __repr__(self):
-        return self.args[0]
+        return str(self.args[0])
 
 
 class ClientError(CompredictError):
     """Error generated by a client!"""
 
 
+class SchemaError(ClientError):
+    """Features or parameters don't match the templates of the algorithm version, found before sending them."""
+
+    def __init__(self, differences):
+        super(SchemaError, self).__init__("Features or parameters don't match the template: " + "; ".join(differences))
+        self.differences = differences
+
+
 class ServerError(CompredictError):
     """Error generated by COMPREDICT server"""
 
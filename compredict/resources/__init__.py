@@ -1,3 +1,5 @@
-from .resources import Algorithm, Evaluation, Version, Task, Result, Monitor
+from .resources import Algorithm, Evaluation, Version, Task, Result, Monitor, AsyncAlgorithm, AsyncVersion, AsyncTask, \
+    VersionResults
 
-__all__ = ["Algorithm", "Evaluation", "Version", "Task", "Result", "Monitor"]
+__all__ = ["Algorithm", "Evaluation", "Version", "Task", "Result", "Monitor", "AsyncAlgorithm", "AsyncVersion",
+           "AsyncTask", "VersionResults"]
@@ -8,12 +8,13 @@ class BaseResource(object):
         The base resource of all resources in the SDK. The class will:
 
         - Copy the dictionary result to self.
-        - Get the client instance for API calling.
+        - Keep the client that created the resource for API calling, defaults to the client instance.
 
         :param kwargs: The results of the request.
         """
+        resource_client = kwargs.pop('client', None)
         self.__dict__.update(kwargs)
-        self.client = client.api.get_instance()
+        self.client = resource_client if resource_client is not None else client.api.get_instance()
 
     def __getattr__(self, item):
         return self.item if item in self.__dict__ else None
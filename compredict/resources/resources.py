@@ -1,9 +1,15 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import NamedTemporaryFile
-from typing import Union, List
+from time import monotonic, perf_counter, sleep
+from typing import Union, List, Optional, Dict, Iterable
 
-from pandas import DataFrame
+import numpy as np
+from pandas import DataFrame, Index
 
 from compredict.resources.base import BaseResource
+from compredict.utils.polling import PollingPolicy
+from compredict.utils.predictions import to_columns, to_frame
 
 
 class Algorithm(BaseResource):
@@ -12,14 +18,54 @@ class Algorithm(BaseResource):
         super(Algorithm, self).__init__(**kwargs)
         self._last_result = None
         # create version
-        for i, version in enumerate(self.versions):
-            self.versions[i] = Version(algorithm_id=self.id, **version)
+        self.versions = [self._create_version(**version) for version in self.versions]
+
+    def _create_version(self, **kwargs) -> "Version":
+        return Version(client=self.client, algorithm_id=self.id, **kwargs)
 
     def run(self, features: Union[str, DataFrame, dict], **kwargs) -> Union["Task", "Result"]:
         """ Will call the last version of an algorithm."""
         self._last_result = self.client.run_algorithm(self.id, features, **kwargs)
         return self.last_results
 
+    def run_chunked(self, features: Union[DataFrame, dict], **kwargs) -> "Result":
+        """Will call the last version of an algorithm on chunks of rows, see `api.run_algorithm_chunked`."""
+        self._last_result = self.client.run_algorithm_chunked(self.id, features, **kwargs)
+        return self.last_results
+
+    def _version_names(self, versions: Optional[Iterable[Union[str, "Version"]]]) -> List[str]:
+        versions = self.versions if versions is None else versions
+        return [version.version if isinstance(version, Version) else version for version in versions]
+
+    def run_versions(self, features: Union[str, DataFrame, dict],
+                     versions: Optional[Iterable[Union[str, "Version"]]] = None,
+                     max_workers: Optional[int] = None, **kwargs) -> "VersionResults":
+        """
+        Run the given versions of the algorithm concurrently on the same features, which are serialized only once.
+
+        :param features: features, as accepted by `api.run_algorithm`.
+        :param versions: versions, as names or `Version` objects, defaults to all versions of the algorithm.
+        :param max_workers: maximum number of concurrent predictions, defaults to one per version.
+        :param kwargs: other arguments of `api.run_algorithm`.
+        :return: mapping of version name to Result or Task, with the latency of each version.
+        """
+        names = self._version_names(versions)
+        encoded = self.client._encode_features(features, kwargs.get('compression'))
+
+        def run(version: str):
+            start = perf_counter()
+            result = self.client.run_algorithm(self.id, encoded, version=version, **kwargs)
+            return result, perf_counter() - start
+
+        results = VersionResults()
+        if not names:
+            return results
+        with ThreadPoolExecutor(max_workers=max_workers or len(names)) as executor:
+            for name, (result, latency) in zip(names, executor.map(run, names)):
+                results[name] = result
+                results.latencies[name] = latency
+        return results
+
     def get_versions(self) -> List["Version"]:
         """Ordered by latest version alphabetically."""
         return self.versions
@@ -59,6 +105,11 @@ class Version(BaseResource):
         self._last_result = self.client.run_algorithm(self.algorithm_id, data, version=self.version, **kwargs)
         return self.last_results
 
+    def run_chunked(self, data: Union[DataFrame, dict], **kwargs) -> "Result":
+        """Will call its specific version of the algorithm on chunks of rows, see `api.run_algorithm_chunked`."""
+        self._last_result = self.client.run_algorithm_chunked(self.algorithm_id, data, version=self.version, **kwargs)
+        return self.last_results
+
     def get_detailed_template(self, file_type: str = 'input') -> NamedTemporaryFile:
         return self.client.get_template(self.algorithm_id, file_type=file_type, version=self.version)
 
@@ -82,13 +133,75 @@ class Version(BaseResource):
         return "Object: {}:{}".format(self.algorithm_id, self.version)
 
 
+class VersionResults(dict):
+    """Results of `Algorithm.run_versions` by version, `latencies` holds the seconds taken by each version."""
+
+    def __init__(self, *args, **kwargs):
+        super(VersionResults, self).__init__(*args, **kwargs)
+        self.latencies: Dict[str, float] = dict()
+
+
 class Evaluation(BaseResource):
 
     def __init__(self, **kwargs):
         super(Evaluation, self).__init__(**kwargs)
 
 
-class Result(BaseResource):
+class TabularResults:
+    """
+    Conversion of the predictions, evaluations or monitors of a Result or Task into DataFrame, arrow Table or NumPy
+    array. The decoded values are converted column by column, see `to_columns`, and the rows are labelled with the
+    index of the features when they were sent as DataFrame.
+    """
+
+    RESULT_FIELDS = ('predictions', 'evaluations', 'monitors')
+
+    def _columns(self, field: str) -> Dict[str, np.ndarray]:
+        if field not in self.RESULT_FIELDS:
+            raise ValueError(f"Field should be one of {', '.join(self.RESULT_FIELDS)}.")
+        return to_columns(getattr(self, field), field)
+
+    def _index(self) -> Optional[Index]:
+        return self.deduplication.index if self.deduplication is not None else self.features_index
+
+    def to_pandas(self, field: str = 'predictions') -> DataFrame:
+        """
+        Return the field as DataFrame, indexed like the features when their index is known.
+
+        :param field: 'predictions', 'evaluations' or 'monitors'
+        """
+        return to_frame(self._columns(field), self._index())
+
+    def to_arrow(self, field: str = 'predictions', index: bool = True):
+        """
+        Return the field as arrow Table, missing numbers being nulls.
+
+        :param field: 'predictions', 'evaluations' or 'monitors'
+        :param index: add the index of the features as first column, when it is known.
+        :return: pyarrow.Table
+        """
+        import pyarrow
+        columns = self._columns(field)
+        arrays = {name: pyarrow.array(column, from_pandas=True) for name, column in columns.items()}
+        labels = self._index() if index else None
+        if labels is not None and columns and len(labels) == len(next(iter(columns.values()))):
+            arrays = {labels.name or 'index': pyarrow.array(labels.to_numpy(), from_pandas=True), **arrays}
+        return pyarrow.table(arrays)
+
+    def to_numpy(self, field: str = 'predictions') -> np.ndarray:
+        """
+        Return the field as NumPy array: one dimension for one column, otherwise one column per column of
+        `to_pandas`, with their common dtype.
+
+        :param field: 'predictions', 'evaluations' or 'monitors'
+        """
+        columns = list(self._columns(field).values())
+        if len(columns) == 1:
+            return columns[0]
+        return np.column_stack(columns) if columns else np.empty(0)
+
+
+class Result(TabularResults, BaseResource):
 
     def __init__(self, **kwargs):
         super(Result, self).__init__(**kwargs)
@@ -100,10 +213,11 @@ class Monitor(BaseResource):
         super(Monitor, self).__init__(**kwargs)
 
 
-class Task(BaseResource):
+class Task(TabularResults, BaseResource):
     STATUS_PENDING = "Pending"
     STATUS_PROGRESS = "In Progress"
     STATUS_FINISHED = "Finished"
+    STATUS_CANCELED = "Canceled"
 
     def __init__(self, **kwargs):
         super(Task, self).__init__(**kwargs)
@@ -114,15 +228,48 @@ class Task(BaseResource):
 
     def update(self):
         task = self.client.get_task_results(self.job_id)
-        self.__dict__.update(task.__dict__)
+        if task is not False:
+            self.__dict__.update(task.__dict__)
+            self._restore_rows()
 
     def get_current_status(self) -> str:
         return self.status
 
+    def is_done(self) -> bool:
+        """Whether the task is finished or canceled, so its status won't change anymore."""
+        return self.status in (Task.STATUS_FINISHED, Task.STATUS_CANCELED)
+
+    def wait(self, timeout: Optional[float] = None, policy: Optional[PollingPolicy] = None) -> "Task":
+        """
+        Poll the task until it is done, with the adaptive intervals of the polling policy. The last poll is done at
+        the timeout.
+
+        :param timeout: seconds to wait, None to wait forever.
+        :param policy: `PollingPolicy`, default policy if None.
+        :return: the task itself
+        :raises TimeoutError: if the task is not done within the timeout
+        """
+        policy = policy if policy is not None else PollingPolicy()
+        deadline = None if timeout is None else monotonic() + timeout
+        poll = 0
+        while not self.is_done():
+            interval = policy.get_wait(poll, deadline)
+            if interval is None:
+                raise TimeoutError(f"Task {self.job_id} is not finished.")
+            sleep(interval)
+            self.update()
+            poll += 1
+        return self
+
     def cancel(self):
         task = self.client.cancel_task(self.job_id)
         self.__dict__.update(task.__dict__)
 
+    def _restore_rows(self):
+        """Scatter the predictions back to the original rows, if the features were deduplicated."""
+        if self.deduplication is not None:
+            self.deduplication.apply(self)
+
     def _set_results(self, predictions: dict, evaluations: dict, monitors: dict):
         self.predictions = None
         self.evaluations = None
@@ -131,3 +278,86 @@ class Task(BaseResource):
             self.predictions = predictions
             self.evaluations = evaluations
             self.monitors = monitors
+
+
+class AsyncAlgorithm(Algorithm):
+    """Algorithm returned by the `AsyncApi`, its requests are coroutines."""
+
+    def _create_version(self, **kwargs) -> "AsyncVersion":
+        return AsyncVersion(client=self.client, algorithm_id=self.id, **kwargs)
+
+    async def run(self, features: Union[str, DataFrame, dict], **kwargs) -> Union["AsyncTask", "Result"]:
+        """ Will call the last version of an algorithm."""
+        self._last_result = await self.client.run_algorithm(self.id, features, **kwargs)
+        return self.last_results
+
+    async def run_versions(self, features: Union[str, DataFrame, dict],
+                           versions: Optional[Iterable[Union[str, "Version"]]] = None,
+                           **kwargs) -> "VersionResults":
+        """Run the given versions concurrently on the same features, see `Algorithm.run_versions`."""
+        names = self._version_names(versions)
+        encoded = await self.client._run_in_executor(self.client._encode_features, features, kwargs.get('compression'))
+
+        async def run(version: str):
+            start = perf_counter()
+            result = await self.client.run_algorithm(self.id, encoded, version=version, **kwargs)
+            return result, perf_counter() - start
+
+        results = VersionResults()
+        for name, (result, latency) in zip(names, await asyncio.gather(*[run(name) for name in names])):
+            results[name] = result
+            results.latencies[name] = latency
+        return results
+
+    async def get_detailed_template(self, file_type: str = 'input') -> NamedTemporaryFile:
+        """return the template of the latest version"""
+        return await self.client.get_template(self.id, file_type)
+
+    async def get_detailed_graph(self, file_type: str = 'input') -> NamedTemporaryFile:
+        """return the graph of the latest version"""
+        return await self.client.get_graph(self.id, file_type)
+
+
+class AsyncVersion(Version):
+    """Version returned by the `AsyncApi`, its requests are coroutines."""
+
+    async def run(self, data: Union[str, DataFrame, dict], **kwargs) -> Union["AsyncTask", "Result"]:
+        """Will call its specific version of the algorithm."""
+        self._last_result = await self.client.run_algorithm(self.algorithm_id, data, version=self.version, **kwargs)
+        return self.last_results
+
+    async def get_detailed_template(self, file_type: str = 'input') -> NamedTemporaryFile:
+        return await self.client.get_template(self.algorithm_id, file_type=file_type, version=self.version)
+
+    async def get_detailed_graph(self, file_type: str = 'input') -> NamedTemporaryFile:
+        return await self.client.get_graph(self.algorithm_id, file_type=file_type, version=self.version)
+
+
+class AsyncTask(Task):
+    """Task returned by the `AsyncApi`, `update` and `cancel` are awaitable."""
+
+    async def update(self):
+        task = await self.client.get_task_results(self.job_id)
+        if task is not False:
+            self.__dict__.update(task.__dict__)
+            self._restore_rows()
+
+    async def wait(self, timeout: Optional[float] = None, policy: Optional[PollingPolicy] = None) -> "AsyncTask":
+        """
+        Poll the task until it is done, see `Task.wait`.
+        """
+        policy = policy if policy is not None else PollingPolicy()
+        deadline = None if timeout is None else monotonic() + timeout
+        poll = 0
+        while not self.is_done():
+            interval = policy.get_wait(poll, deadline)
+            if interval is None:
+                raise TimeoutError(f"Task {self.job_id} is not finished.")
+            await asyncio.sleep(interval)
+            await self.update()
+            poll += 1
+        return self
+
+    async def cancel(self):
+        task = await self.client.cancel_task(self.job_id)
+        self.__dict__.update(task.__dict__)
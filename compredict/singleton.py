@@ -1,6 +1,9 @@
+import threading
+
+
 class Singleton:
     """
-    A non-thread-safe helper class to ease implementing singletons.
+    A thread-safe helper class to ease implementing singletons.
     This should be used as a decorator -- not a metaclass -- to the
     class that should be a singleton.
 
@@ -12,6 +15,9 @@ class Singleton:
     To get the singleton instance, use the `instance` method. Trying
     to use `__call__` will result in a `TypeError` being raised.
 
+    Use `new_instance` to create independent instances next to the
+    singleton, e.g. for several tenants or URLs in one process.
+
     """
 
     BASE_URL = "https://core.compredict.ai/api/v{}"
@@ -19,6 +25,7 @@ class Singleton:
 
     def __init__(self, decorated):
         self._decorated = decorated
+        self._lock = threading.Lock()
 
     def get_instance(self, *args, **kwargs):
         """
@@ -29,8 +36,20 @@ class Singleton:
         try:
             return self._instance
         except AttributeError:
-            self._instance = self._decorated(*args, **kwargs)
-            return self._instance
+            pass
+        with self._lock:
+            try:
+                return self._instance
+            except AttributeError:
+                self._instance = self._decorated(*args, **kwargs)
+                return self._instance
+
+    def new_instance(self, *args, **kwargs):
+        """
+        Returns a new instance of the decorated class, independent of the
+        singleton instance.
+        """
+        return self._decorated(*args, **kwargs)
 
     def __call__(self):
         raise TypeError('Singletons must be accessed through `instance()`.')
@@ -1,8 +1,14 @@
+import base64
+import json
+import threading
+import time
+from typing import Iterable, Optional
+
 import requests
-from requests import Response
+from requests import Response, Session
 
 
-def generate_token(url: str, username: str, password: str) -> Response:
+def generate_token(url: str, username: str, password: str, session: Optional[Session] = None) -> Response:
     """
     Generate access token and refresh token from username and password.
     Refresh token can be used later to generate new access token.
@@ -10,29 +16,184 @@ def generate_token(url: str, username: str, password: str) -> Response:
     :param url: str base url to AI Core
     :param username: user's username in AI Core
     :param password: user's password to AI Core
+    :param session: pooled session to send the request with, defaults to a one-off connection
     :return: Response from AI Core
     """
     credentials = dict(username=username, password=password)
-    return requests.post(f'{url}/token/', json=credentials)
+    return _sender(session).post(f'{url}/token/', json=credentials)
 
 
-def generate_token_from_refresh_token(url: str, token: str) -> Response:
+def generate_token_from_refresh_token(url: str, token: str, session: Optional[Session] = None) -> Response:
     """
     Takes a refresh type JSON web token and returns an access type JSON web token if the refresh token is valid.
 
     :param url: base url to AI Core as string
     :param token: token generated by user with username and password
+    :param session: pooled session to send the request with, defaults to a one-off connection
     :return: response from AI Core
     """
-    return requests.post(f'{url}/token/refresh/', json={'refresh': token})
+    return _sender(session).post(f'{url}/token/refresh/', json={'refresh': token})
 
 
-def verify_token(url: str, token: str) -> Response:
+def verify_token(url: str, token: str, session: Optional[Session] = None) -> Response:
     """
     Check if token is valid.
 
     :param url: base url to AI Core as string
     :param token: token which user would like to verify
+    :param session: pooled session to send the request with, defaults to a one-off connection
     :return: response from AI Core
     """
-    return requests.post(f'{url}/token/verify/', json={'token': token})
+    return _sender(session).post(f'{url}/token/verify/', json={'token': token})
+
+
+def decode_token_payload(token: str) -> dict:
+    """
+    Decode the claims of JSON web token locally, without verifying its signature.
+
+    :param token: JSON web token
+    :return: dictionary of claims
+    :raises ValueError: if token is not a well-formed JSON web token
+    """
+    parts = token.split('.') if isinstance(token, str) else []
+    if len(parts) != 3:
+        raise ValueError("Token is not a JSON web token.")
+    payload = parts[1] + '=' * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode('ascii')))
+    except (ValueError, UnicodeEncodeError):
+        raise ValueError("Token payload can't be decoded.")
+    if not isinstance(claims, dict):
+        raise ValueError("Token payload is not a JSON object.")
+    return claims
+
+
+def get_token_expiry(token: str) -> Optional[float]:
+    """
+    Return the expiry time of JSON web token as unix timestamp.
+
+    :param token: JSON web token
+    :return: value of `exp` claim, or None if the token is not a JSON web token or doesn't expire
+    """
+    try:
+        expiry = decode_token_payload(token).get('exp')
+    except ValueError:
+        return None
+    return float(expiry) if isinstance(expiry, (int, float)) else None
+
+
+def is_token_expiring(token: str, margin: float = 0) -> bool:
+    """
+    Check locally if JSON web token expires within the given margin.
+
+    :param token: JSON web token
+    :param margin: seconds before the expiry, when the token is already considered expired
+    :return: bool, False if expiry of the token is unknown
+    """
+    expiry = get_token_expiry(token)
+    return expiry is not None and expiry - margin <= time.time()
+
+
+def validate_token_locally(token: str, public_key=None, algorithms: Iterable[str] = ('RS256',),
+                           leeway: float = 0) -> Optional[bool]:
+    """
+    Validate JSON web token locally: its structure, expiry and, when public key is given, its signature.
+
+    The signature check requires `PyJWT`.
+
+    :param token: JSON web token
+    :param public_key: key to verify the signature with, signature is not checked if None.
+    :param algorithms: accepted signing algorithms.
+    :param leeway: seconds of tolerance for the expiry and not-before claims.
+    :return: True if valid, False if invalid, None if it can't be decided locally.
+    """
+    try:
+        claims = decode_token_payload(token)
+    except ValueError:
+        return False
+    now = time.time()
+    expiry, not_before = claims.get('exp'), claims.get('nbf')
+    if not isinstance(expiry, (int, float)):
+        return None
+    if expiry + leeway <= now or (isinstance(not_before, (int, float)) and not_before - leeway > now):
+        return False
+    if public_key is None:
+        return True
+    try:
+        import jwt
+    except ImportError:
+        raise ImportError("Checking the signature of tokens requires `PyJWT`, install it with `pip install pyjwt`.")
+    try:
+        jwt.decode(token, public_key, algorithms=list(algorithms), leeway=leeway,
+                   options=dict(verify_aud=False, verify_iss=False))
+    except jwt.InvalidAlgorithmError:
+        return None
+    except jwt.InvalidTokenError:
+        return False
+    return True
+
+
+class TokenValidator:
+
+    def __init__(self, public_key=None, algorithms: Iterable[str] = ('RS256',), ttl: float = 300,
+                 leeway: float = 0):
+        """
+        Validates tokens locally with `validate_token_locally` and caches the results per token.
+
+        :param public_key: key to verify the signature of tokens with, signature is not checked if None.
+        :param algorithms: accepted signing algorithms.
+        :param ttl: seconds for which a validation result is cached, valid results are never cached beyond the
+            expiry of the token.
+        :param leeway: seconds of tolerance for the expiry and not-before claims.
+        """
+        self.public_key = public_key
+        self.algorithms = tuple(algorithms)
+        self.ttl = ttl
+        self.leeway = leeway
+        self._results = dict()
+        self._lock = threading.Lock()
+
+    def get_cached(self, token: str) -> Optional[bool]:
+        """
+        Return cached validation result of the token, or None if not cached.
+        """
+        cached = self._results.get(token)
+        if cached is None or cached[1] <= time.time():
+            return None
+        return cached[0]
+
+    def remember(self, token: str, valid: bool):
+        """
+        Cache validation result of the token, e.g. the result of the network verification.
+        """
+        cached_until = time.time() + self.ttl
+        expiry = get_token_expiry(token)
+        if valid and expiry is not None:
+            cached_until = min(cached_until, expiry + self.leeway)
+        with self._lock:
+            now = time.time()
+            for expired in [key for key, (_, until) in self._results.items() if until <= now]:
+                del self._results[expired]
+            self._results[token] = (valid, cached_until)
+
+    def validate(self, token: str) -> Optional[bool]:
+        """
+        Validate the token locally, using the cached result if available.
+
+        :param token: JSON web token
+        :return: True if valid, False if invalid, None if it can't be decided locally.
+        """
+        valid = self.get_cached(token)
+        if valid is not None:
+            return valid
+        valid = validate_token_locally(token, self.public_key, self.algorithms, self.leeway)
+        if valid is not None:
+            self.remember(token, valid)
+        return valid
+
+
+def _sender(session: Optional[Session] = None):
+    """
+    Return the session if given, otherwise the `requests` module for a one-off request.
+    """
+    return session if session is not None else requests
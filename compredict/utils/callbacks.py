@@ -0,0 +1,209 @@
+import hmac
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic
+from typing import Dict, Optional, TYPE_CHECKING
+from urllib.parse import parse_qs, quote
+
+from compredict.utils.polling import PollingPolicy
+
+if TYPE_CHECKING:  # pragma: no cover
+    from compredict.resources import Task
+
+DEFAULT_CALLBACK_PATH = '/compredict/callback'
+MAX_UNCLAIMED_RESULTS = 1000
+MAX_CALLBACK_SIZE = 16 * 1024 * 1024
+SECRET_PARAMETER = 'secret'
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        listener = self.server.listener
+        path, _, query = self.path.partition('?')
+        if path != listener.path:
+            return self._reply(404)
+        if not listener.is_authorized(parse_qs(query).get(SECRET_PARAMETER, [''])[0]):
+            return self._reply(403)
+        try:
+            length = int(self.headers['Content-Length'])
+        except (ValueError, TypeError):
+            return self._reply(411)
+        if length < 0 or length > listener.max_body_size:
+            return self._reply(413)
+        try:
+            result = json.loads(self.rfile.read(length))
+            job_id = result['job_id']
+        except (ValueError, TypeError, KeyError):
+            return self._reply(400)
+        listener.resolve(job_id, result)
+        self._reply(200)
+
+    def _reply(self, status: int):
+        self.send_response(status)
+        if status >= 400:
+            # the body of rejected requests is not read
+            self.close_connection = True
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CallbackListener:
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, path: str = DEFAULT_CALLBACK_PATH,
+                 public_url: Optional[str] = None, secret: Optional[str] = None,
+                 max_body_size: int = MAX_CALLBACK_SIZE):
+        """
+        Embedded HTTP server receiving the results that AI Core POSTs to the callback url of the tasks, so the tasks
+        are resolved without polling.
+
+        Tasks are registered with `register`, which returns a future completed with the updated task when its
+        result is received. `wait` falls back to polling when no callback is received in time.
+
+        Only the callbacks sent to `url`, which holds the secret of the listener in its query, are accepted, so other
+        clients reaching the listener can't resolve the tasks. Bodies larger than `max_body_size` are rejected.
+
+        :param host: interface to listen on.
+        :param port: port to listen on, 0 to pick a free port.
+        :param path: path receiving the callbacks.
+        :param public_url: url under which AI Core reaches the listener, e.g. behind a proxy. Defaults to the
+            address of the listener.
+        :param secret: secret expected in the callback url, random by default.
+        :param max_body_size: maximum size in bytes of the callbacks.
+        """
+        if max_body_size < 1:
+            raise ValueError("max_body_size must be positive.")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.public_url = public_url
+        self.secret = secret if secret is not None else secrets.token_urlsafe(32)
+        self.max_body_size = max_body_size
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = dict()
+        self._tasks: Dict[str, "Task"] = dict()
+        self._unclaimed = OrderedDict()
+
+    @property
+    def url(self) -> str:
+        """The callback url to pass to `run_algorithm` or `train_algorithm`, with the secret of the listener."""
+        url = self.public_url if self.public_url is not None else f"http://{self.host}:{self.port}{self.path}"
+        return f"{url}{'&' if '?' in url else '?'}{SECRET_PARAMETER}={quote(self.secret, safe='')}"
+
+    def is_authorized(self, secret: str) -> bool:
+        """Whether the secret of a received callback is the secret of the listener."""
+        return hmac.compare_digest(secret.encode(), self.secret.encode())
+
+    def start(self) -> "CallbackListener":
+        """
+        Start listening in a background thread.
+        """
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _CallbackHandler)
+            self._server.daemon_threads = True
+            self._server.listener = self
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, kwargs=dict(poll_interval=0.1),
+                                            name='compredict-callbacks', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop listening, pending futures are left unresolved.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server, self._thread = None, None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def register(self, task: "Task") -> Future:
+        """
+        Register the task to be resolved by its callback.
+
+        :param task: task returned by `run_algorithm` or `train_algorithm`.
+        :return: future completed with the updated task when its result is received.
+        """
+        with self._lock:
+            future = self._futures.get(task.job_id)
+            if future is None:
+                future = self._futures[task.job_id] = Future()
+                self._tasks[task.job_id] = task
+            result = self._unclaimed.pop(task.job_id, None)
+        if result is not None:
+            self.resolve(task.job_id, result)
+        return future
+
+    def resolve(self, job_id: str, result: dict):
+        """
+        Complete the future of the task with its received result. Results of tasks that are not registered yet are
+        kept until they are, as the callback can arrive before the task is returned.
+
+        :param job_id: job id of the task
+        :param result: result of the task as sent by AI Core
+        """
+        with self._lock:
+            future = self._futures.pop(job_id, None)
+            task = self._tasks.pop(job_id, None)
+            if future is None:
+                self._unclaimed[job_id] = result
+                while len(self._unclaimed) > MAX_UNCLAIMED_RESULTS:
+                    self._unclaimed.popitem(last=False)
+                return
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            resolved = task.client._map_resource('Task', result)
+            task.__dict__.update(resolved.__dict__)
+            task._restore_rows()
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(task)
+
+    def wait(self, task: "Task", timeout: Optional[float] = None, fallback_after: float = 60,
+             policy: Optional[PollingPolicy] = None) -> "Task":
+        """
+        Wait for the callback of the task, and poll it with `Task.wait` if the callback is not received within
+        `fallback_after` seconds.
+
+        :param task: task to wait for
+        :param timeout: seconds to wait in total, None to wait forever.
+        :param fallback_after: seconds to wait for the callback before polling.
+        :param policy: `PollingPolicy` used after the fallback.
+        :return: the updated task
+        :raises TimeoutError: if the task is not done within the timeout
+        """
+        if task.is_done():
+            return task
+        deadline = None if timeout is None else monotonic() + timeout
+        future = self.register(task)
+        try:
+            return future.result(fallback_after if timeout is None else min(fallback_after, timeout))
+        except FutureTimeoutError:
+            pass
+        with self._lock:
+            being_resolved = self._futures.get(task.job_id) is not future
+            if not being_resolved:
+                del self._futures[task.job_id]
+                del self._tasks[task.job_id]
+        if being_resolved:
+            return future.result()
+        future.cancel()
+        return task.wait(None if deadline is None else max(0.0, deadline - monotonic()), policy)
@@ -0,0 +1,85 @@
+from typing import Any, Tuple, Union
+
+import numpy as np
+from pandas import DataFrame, Index
+from pandas.util import hash_pandas_object
+
+# two independent 64 bits hashes per row, so distinct rows practically never collide
+HASH_KEYS = ('0123456789123456', 'compredict-dedup')
+
+
+class Deduplication:
+
+    def __init__(self, inverse: np.ndarray, unique_rows: int, index: Index):
+        """
+        Mapping of the rows of features to their unique rows, created by `deduplicate_rows`.
+
+        :param inverse: position of the unique row of each original row.
+        :param unique_rows: number of unique rows.
+        :param index: index of the original features.
+        """
+        self.inverse = inverse
+        self.unique_rows = unique_rows
+        self.index = index
+
+    @property
+    def rows(self) -> int:
+        return len(self.inverse)
+
+    @property
+    def ratio(self) -> float:
+        """
+        Number of original rows per uploaded row, e.g. 4.0 when only a quarter of the rows was uploaded.
+        """
+        return self.rows / self.unique_rows if self.unique_rows else 1.0
+
+    def scatter(self, value: Any) -> Any:
+        """
+        Expand a value returned for the unique rows back to the original rows.
+
+        - lists with one item per unique row are expanded to one item per original row,
+        - dictionaries are expanded key by key,
+        - other values, like evaluation metrics, are returned as they are.
+
+        :param value: value decoded from the response
+        :return: value with the shape of the original features
+        """
+        if isinstance(value, dict):
+            return {key: self.scatter(item) for key, item in value.items()}
+        if isinstance(value, list) and len(value) == self.unique_rows:
+            return np.fromiter(value, dtype=object, count=len(value))[self.inverse].tolist()
+        return value
+
+    def apply(self, resource):
+        """
+        Scatter the predictions of the Result or Task back to the original rows, and keep the deduplication in it.
+        """
+        resource.deduplication = self
+        if resource.predictions is not None:
+            resource.predictions = self.scatter(resource.predictions)
+
+
+def deduplicate_rows(data: Union[DataFrame, dict]) -> Tuple[DataFrame, Deduplication]:
+    """
+    Remove the repeated rows of the features, keeping the first occurrence of each row in its original order.
+
+    Rows are hashed vectorised with `hash_pandas_object`. Features with values that can't be hashed, like lists, are
+    kept as they are.
+
+    :param data: features as DataFrame or dictionary accepted by DataFrame.
+    :return: unique rows, and the deduplication to scatter the results back to the original rows.
+    """
+    if isinstance(data, dict):
+        data = DataFrame(data)
+    try:
+        hashes = np.column_stack([hash_pandas_object(data, index=False, hash_key=key).values for key in HASH_KEYS])
+    except TypeError:
+        return data, Deduplication(np.arange(len(data)), len(data), data.index)
+    if not len(data):
+        return data, Deduplication(np.arange(0), 0, data.index)
+    _, first, inverse = np.unique(hashes, axis=0, return_index=True, return_inverse=True)
+    # np.unique sorts by hash, renumber the unique rows by their first occurrence
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return data.iloc[first[order]], Deduplication(rank[inverse.ravel()], len(first), data.index)
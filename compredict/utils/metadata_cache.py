@@ -0,0 +1,99 @@
+import threading
+from time import monotonic
+from typing import Any, Mapping, Optional
+
+DEFAULT_METADATA_TTL = 300
+
+
+class CachedMetadata:
+    """Resource cached by `MetadataCache`, with the validators of its response."""
+
+    def __init__(self, value: Any, expires_at: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.value = value
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return monotonic() < self.expires_at
+
+    def conditional_headers(self) -> dict:
+        """
+        Return the headers revalidating the cached resource, empty if the server sent no validators.
+        """
+        headers = dict()
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class MetadataCache:
+
+    def __init__(self, ttl: float = DEFAULT_METADATA_TTL, ttls: Optional[Mapping[str, float]] = None):
+        """
+        Cache of the algorithms and versions returned by AI Core, so their metadata is not requested for every use.
+
+        Resources are returned from the cache for `ttl` seconds. Afterwards, they are revalidated with
+        `If-None-Match`/`If-Modified-Since` when AI Core sent `ETag`/`Last-Modified`, and the cached resources are kept
+        if they were not modified.
+
+        :param ttl: seconds for which cached resources are used without asking AI Core.
+        :param ttls: seconds by kind of resource, overriding `ttl`: 'algorithms', 'algorithm', 'versions' and 'version'.
+        """
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self._entries = dict()
+        self._lock = threading.Lock()
+
+    def get_ttl(self, kind: str) -> float:
+        return self.ttls.get(kind, self.ttl)
+
+    def get(self, endpoint: str) -> Optional[CachedMetadata]:
+        """
+        Return the cached resource of the endpoint, fresh or not, or None if not cached.
+        """
+        with self._lock:
+            return self._entries.get(endpoint)
+
+    def set(self, endpoint: str, kind: str, value: Any, headers: Optional[Mapping[str, str]] = None) -> CachedMetadata:
+        """
+        Cache the resource of the endpoint.
+
+        :param endpoint: requested endpoint
+        :param kind: kind of resource, selecting its ttl
+        :param value: resource or list of resources
+        :param headers: headers of the response, holding the validators
+        :return: the cached entry
+        """
+        headers = headers if headers is not None else dict()
+        entry = CachedMetadata(value, monotonic() + self.get_ttl(kind), headers.get('ETag'),
+                               headers.get('Last-Modified'))
+        with self._lock:
+            self._entries[endpoint] = entry
+        return entry
+
+    def refresh(self, endpoint: str, kind: str):
+        """
+        Extend the freshness of the cached resource, after AI Core confirmed it was not modified.
+        """
+        with self._lock:
+            entry = self._entries.get(endpoint)
+            if entry is not None:
+                entry.expires_at = monotonic() + self.get_ttl(kind)
+
+    def invalidate(self, endpoint: Optional[str] = None, recursive: bool = True):
+        """
+        Remove the cached resource of the endpoint, or everything if None.
+
+        :param endpoint: endpoint, e.g. '/algorithms/mass_estimation'
+        :param recursive: remove also the resources of the endpoints below it, e.g. its versions.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries
+                        if key == endpoint or (recursive and key.startswith(endpoint + '/'))]:
+                del self._entries[key]
@@ -0,0 +1,123 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from pandas import DataFrame, Series, to_numeric
+from pandas.api.types import infer_dtype
+
+DEFAULT_CATEGORICAL_THRESHOLD = 0.5
+
+
+def template_columns(template: Optional[list]) -> Dict[str, dict]:
+    """
+    Return the columns described by the features template of a version (`Version.features_format`), by name.
+
+    Columns are the entries of the template without children, named by their `input_name` or `name`.
+
+    :param template: features template of the version
+    :return: dictionary of the template entry of each column
+    """
+    columns = dict()
+    for entry in template or []:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get('children'):
+            columns.update(template_columns(entry['children']))
+            continue
+        name = entry.get('input_name', entry.get('name'))
+        if name is not None:
+            columns[name] = entry
+    return columns
+
+
+class Optimization:
+
+    def __init__(self, dropped_columns: List[str], dtypes: Dict[str, Tuple[str, str]], memory_before: int,
+                 memory_after: int):
+        """
+        Report of the changes done by `FeatureOptimizer` to the features of one request.
+
+        :param dropped_columns: columns not used by the algorithm, which were not uploaded.
+        :param dtypes: original and new dtype of each compacted column.
+        :param memory_before: size in bytes of the features in memory before the optimization.
+        :param memory_after: size in bytes of the uploaded features in memory.
+        """
+        self.dropped_columns = dropped_columns
+        self.dtypes = dtypes
+        self.memory_before = memory_before
+        self.memory_after = memory_after
+
+    @property
+    def memory_saved(self) -> int:
+        """Bytes of memory saved by the optimization, which is not the size saved in the uploaded parquet."""
+        return self.memory_before - self.memory_after
+
+
+class FeatureOptimizer:
+
+    def __init__(self, project: bool = True, downcast: bool = True,
+                 categorical_threshold: float = DEFAULT_CATEGORICAL_THRESHOLD):
+        """
+        Shrink features before they are uploaded, using the features template of the version:
+
+        - columns not in the template are dropped, if the template lists any column,
+        - integers are downcast to the narrowest integer dtype holding all their values,
+        - float64 columns are downcast to float32 when no value changes,
+        - string columns with few distinct values are converted to categorical, which is dictionary-encoded in parquet.
+
+        :param project: drop the columns not in the template.
+        :param downcast: downcast integer and float columns.
+        :param categorical_threshold: maximum ratio of distinct values to rows of string columns to convert them to
+            categorical, 0 to keep strings as they are.
+        """
+        self.project = project
+        self.downcast = downcast
+        self.categorical_threshold = categorical_threshold
+
+    def optimize(self, data: Union[DataFrame, dict], template: Optional[list] = None) -> Tuple[DataFrame, Optimization]:
+        """
+        Return the optimized copy of the features and the report of the changes.
+
+        :param data: features as DataFrame or dictionary accepted by DataFrame.
+        :param template: features template of the version, see `template_columns`.
+        :return: optimized features, report
+        """
+        if isinstance(data, dict):
+            data = DataFrame(data)
+        memory_before = int(data.memory_usage(index=False, deep=True).sum())
+        dropped = []
+        columns = template_columns(template)
+        if self.project and columns:
+            dropped = [column for column in data.columns if column not in columns]
+            data = data.drop(columns=dropped)
+        dtypes, compacted = dict(), dict()
+        for name, column in data.items():
+            new = self._compact(column)
+            if new is not column:
+                dtypes[name] = (str(column.dtype), str(new.dtype))
+                compacted[name] = new
+        if compacted:
+            data = data.copy(deep=False)
+            for name, column in compacted.items():
+                data[name] = column
+        return data, Optimization(dropped, dtypes, memory_before, int(data.memory_usage(index=False, deep=True).sum()))
+
+    def _compact(self, column: Series) -> Series:
+        """
+        Return the column with a narrower dtype, or the column itself if it can't be narrowed safely.
+        """
+        kind = column.dtype.kind
+        if self.downcast and kind in 'iu' and column.dtype.itemsize > 1:
+            new = to_numeric(column, downcast='unsigned' if kind == 'u' else 'integer')
+            return new if new.dtype.itemsize < column.dtype.itemsize else column
+        if self.downcast and kind == 'f' and column.dtype.itemsize == 8:
+            values = column.to_numpy()
+            with np.errstate(over='ignore', invalid='ignore'):
+                narrow = values.astype(np.float32)
+            if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+                return Series(narrow, index=column.index, name=column.name)
+            return column
+        if (self.categorical_threshold and kind == 'O' and len(column)
+                and column.nunique() <= self.categorical_threshold * len(column)
+                and infer_dtype(column, skipna=True) == 'string'):
+            return column.astype('category')
+        return column
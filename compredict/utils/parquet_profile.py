@@ -0,0 +1,168 @@
+import copy
+import threading
+from io import BytesIO
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from pandas import DataFrame
+
+from compredict.utils.streaming import is_columnar, to_arrow_table
+
+AUTO = 'auto'
+AUTO_CANDIDATES = ('snappy', 'zstd', 'gzip', 'none')
+DEFAULT_SAMPLE_ROWS = 10000
+# upload bandwidth in bytes per second assumed until one is given or observed
+DEFAULT_BANDWIDTH = 10 * 1024 * 1024
+BANDWIDTH_SMOOTHING = 0.3
+LEVELED_CODECS = ('gzip', 'brotli', 'zstd')
+
+
+class ParquetProfile:
+
+    def __init__(self, compression: Optional[str] = 'snappy', compression_level: Optional[int] = None,
+                 row_group_size: Optional[int] = None, use_dictionary: bool = True,
+                 candidates: Iterable[str] = AUTO_CANDIDATES, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                 bandwidth: Optional[float] = None):
+        """
+        Options of the parquet files written from features.
+
+        With `compression='auto'`, the codec is selected for each upload: the first `sample_rows` rows are encoded
+        with each candidate codec, and the codec with the lowest estimated encoding plus upload time of the whole
+        features is used. The upload time is estimated with `bandwidth`, or with the bandwidth recorded with `observe`
+        when it is not given. Uploads are not timed by the client, as the response time of a request includes the
+        inference time of AI Core.
+
+        :param compression: parquet codec ('snappy', 'zstd', 'gzip', 'brotli', 'lz4' or 'none'), or 'auto'.
+        :param compression_level: level of the codec, applied to 'gzip', 'brotli' and 'zstd'; default level if None.
+        :param row_group_size: maximum number of rows in one row group, default of arrow if None.
+        :param use_dictionary: dictionary-encode the columns.
+        :param candidates: codecs compared in 'auto' mode.
+        :param sample_rows: number of rows encoded to compare the codecs in 'auto' mode.
+        :param bandwidth: upload bandwidth in bytes per second, recorded with `observe` if None.
+        """
+        self.compression = compression
+        self.compression_level = compression_level
+        self.row_group_size = row_group_size
+        self.use_dictionary = use_dictionary
+        self.candidates = tuple(candidates)
+        self.sample_rows = sample_rows
+        self.bandwidth = bandwidth
+        self.observed_bandwidth: Optional[float] = None
+        self.last_selection: Optional[Dict[str, Tuple[float, int, float]]] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def is_auto(self) -> bool:
+        return self.compression == AUTO
+
+    @property
+    def codec(self) -> Optional[str]:
+        """
+        Codec of the written files, None if they are not compressed.
+        """
+        return None if self.compression in (None, 'none') else self.compression
+
+    def get_bandwidth(self) -> float:
+        if self.bandwidth is not None:
+            return self.bandwidth
+        return self.observed_bandwidth if self.observed_bandwidth is not None else DEFAULT_BANDWIDTH
+
+    def observe(self, size: int, seconds: float):
+        """
+        Record an upload of `size` bytes whose body took `seconds` to be sent, e.g. as measured by a network
+        monitor, updating the moving average of the bandwidth.
+        """
+        if size <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            bandwidth = size / seconds
+            self.observed_bandwidth = bandwidth if self.observed_bandwidth is None else (
+                BANDWIDTH_SMOOTHING * bandwidth + (1 - BANDWIDTH_SMOOTHING) * self.observed_bandwidth)
+
+    def cache_key(self) -> str:
+        """
+        Return the options changing the written file, to key the serialized features in `SerializationCache`.
+        """
+        return repr((self.compression, self.compression_level, self.row_group_size, self.use_dictionary))
+
+    def resolve(self, data) -> "ParquetProfile":
+        """
+        Return the profile to write the features with: the profile itself, or in 'auto' mode a copy with the
+        selected codec. Features which can't be sampled, like iterables of pieces, get the first candidate.
+        """
+        if not self.is_auto:
+            return self
+        resolved = copy.copy(self)
+        resolved.compression = self.select(data) if self._can_sample(data) else self.candidates[0]
+        return resolved
+
+    @staticmethod
+    def _can_sample(data) -> bool:
+        return isinstance(data, (DataFrame, dict)) or is_columnar(data)
+
+    def select(self, data) -> str:
+        """
+        Encode a sample of the features with every candidate codec and return the one with the lowest estimated
+        encoding plus upload time of the whole features. The estimates are kept in `last_selection` as
+        (encoding seconds, bytes, total seconds) by codec.
+
+        :param data: DataFrame, dictionary or columnar features, see `is_columnar`.
+        :return: selected codec
+        """
+        if isinstance(data, dict):
+            data = DataFrame(data)
+        if isinstance(data, DataFrame):
+            rows = len(data)
+            sample = to_arrow_table(data.iloc[:self.sample_rows])
+        else:
+            table = to_arrow_table(data)
+            rows = table.num_rows
+            sample = table.slice(0, self.sample_rows)
+        scale = rows / sample.num_rows if sample.num_rows else 1.0
+        bandwidth = self.get_bandwidth()
+        estimates = dict()
+        for codec in self.candidates:
+            start = perf_counter()
+            size = len(self._encode(sample, codec))
+            encoding = (perf_counter() - start) * scale
+            estimates[codec] = (encoding, int(size * scale), encoding + size * scale / bandwidth)
+        self.last_selection = estimates
+        return min(estimates, key=lambda codec: estimates[codec][2])
+
+    def writer_options(self, compression: Optional[str] = None) -> dict:
+        """
+        Return the options of `pyarrow.parquet.ParquetWriter`, for the given codec or the codec of the profile.
+        """
+        compression = compression if compression is not None else self.compression
+        if compression == AUTO:
+            compression = self.candidates[0]
+        level = self.compression_level if compression in LEVELED_CODECS else None
+        return dict(compression=compression or 'none', compression_level=level, use_dictionary=self.use_dictionary)
+
+    def _encode(self, table, compression: str) -> bytes:
+        import pyarrow.parquet
+        buffer = BytesIO()
+        pyarrow.parquet.write_table(table, buffer, row_group_size=self.row_group_size,
+                                    **self.writer_options(compression))
+        return buffer.getvalue()
+
+    def write(self, data, buffer):
+        """
+        Write the features as parquet into the buffer and point again to the top of the buffer for reading.
+
+        :param data: DataFrame, dictionary or columnar features, see `is_columnar`.
+        :param buffer: binary file-like object.
+        """
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(to_arrow_table(data), buffer, row_group_size=self.row_group_size,
+                                    **self.writer_options())
+        buffer.seek(0)
@@ -0,0 +1,211 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed as futures_as_completed
+from time import monotonic
+from typing import Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from compredict.resources import Task
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class PollingPolicy:
+
+    def __init__(self, initial_interval: float = 1.0, max_interval: float = 30.0, factor: float = 1.5):
+        """
+        Adaptive polling of tasks: the first poll is done `initial_interval` seconds after the task is known to be
+        unfinished, and each following interval is `factor` times longer, up to `max_interval`. Short tasks are
+        noticed quickly, while long tasks are polled rarely.
+
+        :param initial_interval: Seconds before the first poll.
+        :param max_interval: Maximum seconds between two polls.
+        :param factor: Growth of the interval after each poll.
+        """
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.factor = factor
+
+    def get_interval(self, poll: int) -> float:
+        """
+        Return the time to wait before the next poll.
+
+        :param poll: number of polls done so far
+        :return: time in seconds
+        """
+        return min(self.max_interval, self.initial_interval * self.factor ** poll)
+
+    def get_wait(self, poll: int, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        Return the time to wait before the next poll, shortened so the last poll is done at the deadline.
+
+        :param poll: number of polls done so far
+        :param deadline: `time.monotonic` time of the deadline, None for no deadline
+        :return: time in seconds, None if the deadline has passed
+        """
+        interval = self.get_interval(poll)
+        if deadline is None:
+            return interval
+        remaining = deadline - monotonic()
+        return min(interval, remaining) if remaining > 0 else None
+
+
+class TaskPoller:
+
+    def __init__(self, policy: Optional[PollingPolicy] = None, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Shared scheduler polling many tasks, each with the adaptive intervals of the policy, with at most
+        `max_workers` polls in flight at a time.
+
+        :param policy: `PollingPolicy`, default policy if None.
+        :param max_workers: maximum number of concurrent polls.
+        """
+        self.policy = policy if policy is not None else PollingPolicy()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='compredict-polling')
+        self._condition = threading.Condition()
+        self._scheduled = []
+        self._order = itertools.count()
+        self._thread = None
+        self._closed = False
+
+    def watch(self, task: "Task", timeout: Optional[float] = None) -> Future:
+        """
+        Poll the task until it is done.
+
+        :param task: task to poll, or Result returned instead of a task, which is resolved at once.
+        :param timeout: seconds to poll the task, None to poll it forever.
+        :return: future completed with the task when it is done, or with `TimeoutError`.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        if not hasattr(type(task), 'is_done') or task.is_done():
+            # a Result returned instead of a task is already done
+            future.set_result(task)
+        else:
+            self._schedule(task, future, None if timeout is None else monotonic() + timeout, 0)
+        return future
+
+    def _schedule(self, task: "Task", future: Future, deadline: Optional[float], polls: int):
+        wait = self.policy.get_wait(polls, deadline)
+        if wait is None:
+            future.set_exception(TimeoutError(f"Task {task.job_id} is not finished."))
+            return
+        due = monotonic() + wait
+        with self._condition:
+            if self._closed:
+                future.set_exception(CancelledError())
+                return
+            heapq.heappush(self._scheduled, (due, next(self._order), task, future, deadline, polls + 1))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='compredict-polling-scheduler', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        with self._condition:
+            while not self._closed:
+                if not self._scheduled:
+                    self._condition.wait()
+                    continue
+                wait_for = self._scheduled[0][0] - monotonic()
+                if wait_for > 0:
+                    self._condition.wait(wait_for)
+                    continue
+                self._executor.submit(self._poll, *heapq.heappop(self._scheduled)[2:])
+
+    def _poll(self, task: "Task", future: Future, deadline: Optional[float], polls: int):
+        try:
+            task.update()
+        except Exception as error:
+            future.set_exception(error)
+            return
+        if task.is_done():
+            future.set_result(task)
+        else:
+            self._schedule(task, future, deadline, polls)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop polling, futures of tasks that are not done are completed with `CancelledError`.
+
+        :param wait: wait for the polls in flight.
+        """
+        with self._condition:
+            self._closed = True
+            scheduled, self._scheduled = self._scheduled, []
+            self._condition.notify()
+        for _, _, _, future, _, _ in scheduled:
+            future.set_exception(CancelledError())
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=exc_type is None)
+
+
+def as_completed(tasks: Iterable["Task"], timeout: Optional[float] = None, policy: Optional[PollingPolicy] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator["Task"]:
+    """
+    Poll the tasks on one shared `TaskPoller` and yield them as they finish.
+
+    :param tasks: tasks to wait for
+    :param timeout: seconds to wait for all the tasks, None to wait forever.
+    :param policy: `PollingPolicy`, default policy if None.
+    :param max_workers: maximum number of concurrent polls.
+    :return: iterator of the finished tasks
+    :raises TimeoutError: if some tasks are not finished within the timeout
+    """
+    poller = TaskPoller(policy, max_workers)
+    try:
+        for future in futures_as_completed([poller.watch(task) for task in tasks], timeout):
+            yield future.result()
+    finally:
+        poller.shutdown(wait=False)
+
+
+class TaskGroup:
+
+    def __init__(self, tasks: Iterable["Task"] = (), policy: Optional[PollingPolicy] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Group of tasks polled together, see `as_completed`.
+
+        :param tasks: tasks of the group
+        :param policy: `PollingPolicy`, default policy if None.
+        :param max_workers: maximum number of concurrent polls.
+        """
+        self.tasks = list(tasks)
+        self.policy = policy
+        self.max_workers = max_workers
+
+    def add(self, task: "Task"):
+        self.tasks.append(task)
+
+    def as_completed(self, timeout: Optional[float] = None) -> Iterator["Task"]:
+        """
+        Yield the tasks of the group as they finish.
+
+        :param timeout: seconds to wait for all the tasks, None to wait forever.
+        :return: iterator of the finished tasks
+        """
+        return as_completed(self.tasks, timeout, self.policy, self.max_workers)
+
+    def wait(self, timeout: Optional[float] = None) -> List["Task"]:
+        """
+        Wait until all the tasks of the group are finished.
+
+        :param timeout: seconds to wait for all the tasks, None to wait forever.
+        :return: the tasks of the group
+        """
+        for _ in self.as_completed(timeout):
+            pass
+        return self.tasks
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
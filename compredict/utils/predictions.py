@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pandas import DataFrame, Index, Series
+
+
+def merge_chunks(values: List[Any]) -> Any:
+    """
+    Merge the values returned for consecutive chunks of rows into one value, keeping the order of the rows.
+
+    - lists are concatenated, skipping chunks without value,
+    - dictionaries are merged key by key, skipping chunks without value,
+    - other values, like evaluation metrics, are kept as list with one value per chunk.
+
+    :param values: values of the chunks in order of their rows
+    :return: merged value
+    """
+    present = [value for value in values if value is not None]
+    if not present:
+        return None
+    if all(isinstance(value, list) for value in present):
+        return [item for value in present for item in value]
+    if all(isinstance(value, dict) for value in present):
+        keys = list(dict.fromkeys(key for value in present for key in value))
+        return {key: merge_chunks([value.get(key) for value in present]) for key in keys}
+    return values
+
+
+def to_columns(value: Any, name: str = 'predictions') -> Dict[str, np.ndarray]:
+    """
+    Return the columns of a value decoded from the results, each list being converted to an array at once.
+
+    - lists of values are one column named `name`, missing numbers become NaN,
+    - lists of rows of the same length are one column per position, named `<name>_<position>`,
+    - lists of records are one column per key,
+    - dictionaries are one column per key, named `<key>.<sub key>` in nested dictionaries,
+    - other values, like evaluation metrics, are repeated for each row of the other columns.
+
+    :param value: predictions, evaluations or monitors of a Result or Task
+    :param name: name of the column of a list of values
+    :return: arrays of the same length by column name, empty if the value is None
+    """
+    columns = dict()
+    _collect(value, name, columns)
+    rows = max((len(column) for column in columns.values() if isinstance(column, np.ndarray)), default=1)
+    return {key: column if isinstance(column, np.ndarray) else _column([column] * rows)
+            for key, column in columns.items()}
+
+
+def _collect(value: Any, name: str, columns: dict, nested: bool = False):
+    if value is None:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _collect(item, f'{name}.{key}' if nested else str(key), columns, nested=True)
+        return
+    if not isinstance(value, list):
+        columns[name] = value
+        return
+    if value and all(isinstance(item, dict) for item in value):
+        for key in dict.fromkeys(key for item in value for key in item):
+            columns[f'{name}.{key}' if nested else str(key)] = _column([item.get(key) for item in value])
+        return
+    if value and isinstance(value[0], list):
+        try:
+            rows = np.array(value)
+        except ValueError:
+            rows = None
+        if rows is not None and rows.ndim == 2:
+            for position in range(rows.shape[1]):
+                columns[f'{name}_{position}'] = _column(rows[:, position])
+            return
+    columns[name] = _column(value)
+
+
+def _column(values) -> np.ndarray:
+    return Series(values, dtype=None if len(values) else object).to_numpy()
+
+
+def to_frame(columns: Dict[str, np.ndarray], index: Optional[Index] = None) -> DataFrame:
+    """
+    Return the DataFrame of the columns, with the index of the features when it has one label per row.
+    """
+    rows = len(next(iter(columns.values()))) if columns else 0
+    return DataFrame(columns, index=index if index is not None and len(index) == rows else None)
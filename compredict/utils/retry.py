@@ -0,0 +1,90 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+from requests import Response
+
+
+class RetryPolicy:
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0,
+                 status_codes: Iterable[int] = (429, 500, 502, 503, 504),
+                 methods: Iterable[str] = ('GET',),
+                 respect_retry_after: bool = True,
+                 retry_connection_errors: bool = True):
+        """
+        Policy deciding which requests are retried by `Connection` and how long to wait in between.
+
+        Waiting time follows exponential backoff with full jitter: a random time between 0 and
+        `min(max_backoff, backoff_factor * 2 ** retry)`, so clients failing at the same moment don't retry in sync.
+        When the server sends `Retry-After`, it is waited instead, up to `max_backoff`.
+
+        :param max_attempts: Maximum number of attempts, including the first one.
+        :param backoff_factor: Base of the exponential backoff in seconds.
+        :param max_backoff: Maximum backoff in seconds, also applied to `Retry-After`.
+        :param status_codes: Response status codes that are retried.
+        :param methods: HTTP methods that are retried. Only idempotent GET by default, add 'POST' to opt-in to retry
+            predictions and training.
+        :param respect_retry_after: Wait the time requested by the `Retry-After` header of the response.
+        :param retry_connection_errors: Retry when connection to the server fails.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_codes = frozenset(status_codes)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.respect_retry_after = respect_retry_after
+        self.retry_connection_errors = retry_connection_errors
+
+    def can_retry(self, method: str, attempt: int) -> bool:
+        """
+        Check if the request of the given method can be attempted again.
+
+        :param method: HTTP method
+        :param attempt: number of attempts done so far
+        :return: bool
+        """
+        return method.upper() in self.methods and attempt < self.max_attempts
+
+    def is_retryable_response(self, response: Response) -> bool:
+        return response.status_code in self.status_codes
+
+    def get_backoff(self, attempt: int, response: Optional[Response] = None) -> float:
+        """
+        Return the time to sleep before the next attempt.
+
+        :param attempt: number of attempts done so far
+        :param response: the failed response, None on connection error
+        :return: time in seconds
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after = self.parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse `Retry-After` header given either as seconds or as HTTP date.
+
+        :param value: value of the header
+        :return: time in seconds or None if it can't be parsed
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
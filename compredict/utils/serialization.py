@@ -0,0 +1,143 @@
+import mmap
+import os
+from io import BytesIO
+from json import dump
+from tempfile import SpooledTemporaryFile
+from typing import Iterator, Optional, Union
+
+from pandas import DataFrame
+from pandas.io.common import get_handle
+
+from compredict.utils.streaming import is_columnar, to_arrow_table
+
+DEFAULT_SPILL_THRESHOLD = 64 * 1024 * 1024
+PARQUET_MAGIC = b'PAR1'
+
+
+def spooled_buffer(spill_threshold: int = DEFAULT_SPILL_THRESHOLD) -> SpooledTemporaryFile:
+    """
+    Create buffer kept in memory until its size exceeds the threshold, then it is spilled to a temporary file on
+    disk. The disk file is removed as soon as the buffer is closed.
+
+    :param spill_threshold: size in bytes above which the content is moved to disk.
+    :return: binary buffer opened for writing and reading
+    """
+    return SpooledTemporaryFile(max_size=spill_threshold, mode='w+b')
+
+
+def write_features(data, buffer, compression: Optional[str] = None, profile=None):
+    """
+    Write features as parquet into the buffer and point again to the top of the buffer for reading.
+
+    Arrow tables and record batches, NumPy structured arrays and objects exposing the dataframe interchange protocol
+    are written through arrow directly, without converting them to pandas.
+
+    :param data: features as DataFrame, dictionary accepted by DataFrame, or columnar data, see `is_columnar`.
+    :param buffer: binary file-like object.
+    :param compression: parquet compression, same as in `to_parquet` in pandas.
+    :param profile: `ParquetProfile` with the options of the file, replacing `compression`.
+    :return: None
+    """
+    if profile is not None:
+        profile.write(data, buffer)
+        return
+    if is_columnar(data):
+        table = to_arrow_table(data)
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, buffer, compression=compression or 'none')
+    else:
+        if isinstance(data, dict):
+            data = DataFrame(data)
+        data.to_parquet(buffer, compression=compression)
+    buffer.seek(0)
+
+
+def serialize_features(data, compression: Optional[str] = None, profile=None) -> bytes:
+    """
+    Serialize features into parquet bytes, e.g. in a worker process.
+
+    :param data: features as DataFrame, dictionary accepted by DataFrame, or columnar data, see `write_features`.
+    :param compression: parquet compression, same as in `to_parquet` in pandas.
+    :param profile: `ParquetProfile` with the options of the file, replacing `compression`.
+    :return: parquet file content
+    """
+    buffer = BytesIO()
+    write_features(data, buffer, compression=compression, profile=profile)
+    return buffer.getvalue()
+
+
+def split_rows(data: Union[DataFrame, dict], chunk_size: Optional[int] = None,
+               chunk_bytes: Optional[int] = None) -> Iterator[DataFrame]:
+    """
+    Split features into chunks of consecutive rows, of `chunk_size` rows or of about `chunk_bytes` bytes in memory.
+
+    :param data: features as DataFrame or dictionary accepted by DataFrame.
+    :param chunk_size: number of rows in one chunk.
+    :param chunk_bytes: approximate size in bytes of one chunk, used if `chunk_size` is not given.
+    :return: iterator of DataFrames
+    """
+    if isinstance(data, dict):
+        data = DataFrame(data)
+    if chunk_size is None:
+        if chunk_bytes is None:
+            raise ValueError("Please provide `chunk_size` or `chunk_bytes`.")
+        row_bytes = data.memory_usage(index=False, deep=True).sum() / max(len(data), 1)
+        chunk_size = int(chunk_bytes // row_bytes) if row_bytes else len(data)
+    chunk_size = max(1, chunk_size)
+    for start in range(0, max(len(data), 1), chunk_size):
+        yield data.iloc[start:start + chunk_size]
+
+
+def write_parameters(data: dict, buffer, compression: Optional[str] = None):
+    """
+    Write parameters as JSON into the buffer and point again to the top of the buffer for reading.
+
+    :param data: JSON serializable parameters.
+    :param buffer: binary file-like object.
+    :param compression: JSON compression type, same compression methods as in `to_json` in pandas.
+    :return: None
+    """
+    with get_handle(buffer, "w", compression=compression) as handles:
+        dump(data, handles.handle)
+    buffer.seek(0)
+
+
+def validate_parquet_file(path: str):
+    """
+    Check that the file is a parquet file, from its content rather than its extension: it must start and end with
+    the parquet magic bytes, and end with a footer that arrow can read. Only the header and the footer are read. The
+    footer is parsed only when `pyarrow` is installed, files can be uploaded without any parquet engine.
+
+    :param path: path to the file
+    :raises ValueError: if the file is not a parquet file
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        header = file.read(len(PARQUET_MAGIC))
+        file.seek(max(size - 8, 0))
+        tail = file.read(8)
+    if size < 12 or header != PARQUET_MAGIC or tail[4:] != PARQUET_MAGIC:
+        raise ValueError(f"Features file {path} is not a parquet file.")
+    footer_length = int.from_bytes(tail[:4], 'little')
+    if footer_length + 12 > size:
+        raise ValueError(f"Features file {path} has a corrupted parquet footer.")
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return
+    try:
+        pyarrow.parquet.read_metadata(path)
+    except (pyarrow.ArrowException, OSError) as error:
+        raise ValueError(f"Features file {path} has a corrupted parquet footer: {error}")
+
+
+def map_file(path: str) -> mmap.mmap:
+    """
+    Memory-map the file read-only, so it is uploaded from the page cache without being read into memory first.
+
+    :param path: path to the file, not empty
+    :return: read-only memory map, to be closed once uploaded
+    """
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
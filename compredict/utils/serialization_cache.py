@@ -0,0 +1,192 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+
+from pandas import DataFrame
+from pandas.util import hash_pandas_object
+
+from compredict.utils.serialization import serialize_features
+
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SerializationCache:
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, directory: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None):
+        """
+        LRU cache of features serialized into parquet, keyed by hash of their content and of the compression, so the
+        same features sent several times, e.g. to several versions of an algorithm, are encoded once.
+
+        Entries evicted from memory are moved to the disk tier in `directory`, if given, from where they are evicted
+        as well when it exceeds `max_disk_bytes`.
+
+        :param max_bytes: maximum size in bytes of the serialized features kept in memory.
+        :param directory: directory of the disk tier, no disk tier if None.
+        :param max_disk_bytes: maximum size in bytes of the disk tier, defaults to 4 times `max_bytes`.
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else 4 * max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.parquet'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, name[:-len('.parquet')], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    @staticmethod
+    def key(data: Union[DataFrame, dict], compression: Optional[str] = None) -> str:
+        """
+        Return the hash of the content of the features and of the compression.
+
+        :param data: features as DataFrame or dictionary accepted by DataFrame.
+        :param compression: parquet compression.
+        :return: hexadecimal digest
+        """
+        if isinstance(data, dict):
+            data = DataFrame(data)
+        if not isinstance(data, DataFrame):
+            raise TypeError(f"Features of type {type(data).__name__} can't be cached.")
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(repr((compression, list(map(str, data.columns)), list(map(str, data.dtypes)),
+                            type(data.index).__name__)).encode('utf-8'))
+        digest.update(hash_pandas_object(data, index=True).values.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.parquet')
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the serialized features of the key, or None if not cached.
+        """
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                return content
+            if key not in self._disk:
+                return None
+            self._disk_bytes -= self._disk.pop(key)
+            try:
+                with open(self._path(key), 'rb') as file:
+                    content = file.read()
+                os.remove(self._path(key))
+            except OSError:
+                return None
+            self._store(key, content)
+            return content
+
+    def put(self, key: str, content: bytes):
+        """
+        Cache the serialized features of the key.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._store(key, content)
+
+    def _store(self, key: str, content: bytes):
+        if len(content) > self.max_bytes:
+            self._spill(key, content)
+            return
+        self._memory[key] = content
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self.max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key: str, content: bytes):
+        if self.directory is None or len(content) > self.max_disk_bytes:
+            return
+        with open(self._path(key), 'wb') as file:
+            file.write(content)
+        self._disk[key] = len(content)
+        self._disk_bytes += len(content)
+        while self._disk_bytes > self.max_disk_bytes:
+            evicted_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    def get_or_serialize(self, data: Union[DataFrame, dict], compression: Optional[str] = None,
+                         profile=None) -> bytes:
+        """
+        Return the features serialized into parquet, from the cache if they were serialized before. Features with
+        values that can't be hashed, like lists, and features which are not DataFrame or dictionary are serialized
+        without caching.
+
+        :param data: features as DataFrame or dictionary accepted by DataFrame.
+        :param compression: parquet compression.
+        :param profile: `ParquetProfile` with the options of the file, replacing `compression`.
+        :return: parquet file content
+        """
+        try:
+            key = self.key(data, compression if profile is None else profile.cache_key())
+        except TypeError:
+            self.record(hit=False)
+            return serialize_features(data, compression, profile)
+        content = self.get(key)
+        if content is not None:
+            self.record(hit=True, size=len(content))
+            return content
+        content = serialize_features(data, compression, profile)
+        self.record(hit=False)
+        self.put(key, content)
+        return content
+
+    def record(self, hit: bool, size: int = 0):
+        """
+        Count a hit, saving the serialization of `size` bytes, or a miss.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_saved += size
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """
+        Return the counters of the cache.
+        """
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, bytes_saved=self.bytes_saved,
+                        memory_entries=len(self._memory), memory_bytes=self._memory_bytes,
+                        disk_entries=len(self._disk), disk_bytes=self._disk_bytes)
+
+    def clear(self):
+        """
+        Remove all the entries, including the ones on disk.
+        """
+        with self._lock:
+            for key in self._disk:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._memory.clear()
+            self._disk.clear()
+            self._memory_bytes = self._disk_bytes = 0
@@ -0,0 +1,256 @@
+import mmap
+from typing import Iterable, Iterator, Optional, Union
+from uuid import uuid4
+
+import numpy
+from pandas import DataFrame, RangeIndex
+
+DEFAULT_ROW_GROUP_SIZE = 100000
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Streaming upload requires `pyarrow`, install it with `pip install pyarrow`.")
+    return pyarrow
+
+
+class _DrainableSink:
+    """Write-only file object collecting what parquet writer produced since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def is_columnar(data) -> bool:
+    """
+    Whether the features are an arrow Table or RecordBatch, a NumPy structured array or an object exposing the
+    dataframe interchange protocol (`__dataframe__`), which are converted to arrow without going through pandas.
+    """
+    if isinstance(data, (DataFrame, dict, str, bytes)):
+        return False
+    if isinstance(data, numpy.ndarray):
+        return data.dtype.names is not None
+    if type(data).__module__.split('.')[0] == 'pyarrow':
+        pyarrow = _import_pyarrow()
+        return isinstance(data, (pyarrow.Table, pyarrow.RecordBatch))
+    return hasattr(data, '__dataframe__')
+
+
+def to_arrow_table(data, schema=None):
+    """
+    Convert one piece of features into arrow table. Arrow and NumPy columns are used without copy when their memory
+    layout allows it.
+
+    :param data: DataFrame, dictionary, arrow Table or RecordBatch, NumPy structured array or object exposing the
+        dataframe interchange protocol.
+    :param schema: schema of the first piece, every following piece is converted to it.
+    :return: arrow Table
+    """
+    pyarrow = _import_pyarrow()
+    if isinstance(data, dict):
+        data = DataFrame(data)
+    if isinstance(data, DataFrame):
+        preserve_index = not isinstance(data.index, RangeIndex)
+        return pyarrow.Table.from_pandas(data, schema=schema, preserve_index=preserve_index)
+    if isinstance(data, pyarrow.RecordBatch):
+        data = pyarrow.Table.from_batches([data])
+    elif isinstance(data, numpy.ndarray) and data.dtype.names is not None:
+        data = pyarrow.table({name: data[name] for name in data.dtype.names})
+    elif not isinstance(data, pyarrow.Table) and hasattr(data, '__dataframe__'):
+        try:
+            from pyarrow.interchange import from_dataframe
+        except ImportError:
+            raise ImportError("Features exposing `__dataframe__` require `pyarrow>=11.0.0`.")
+        data = from_dataframe(data)
+    if isinstance(data, pyarrow.Table):
+        return data if schema is None else data.cast(schema)
+    raise TypeError(f"Features of type {type(data).__name__} can't be converted to arrow.")
+
+
+def iter_row_groups(features, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> Iterator:
+    """
+    Split features into pieces of at most `row_group_size` rows.
+
+    :param features: DataFrame, dictionary, arrow Table or RecordBatch, NumPy structured array or object exposing the
+        dataframe interchange protocol, or an iterable of them.
+    :param row_group_size: maximum number of rows in one piece.
+    :return: iterator of pieces
+    """
+    pyarrow = _import_pyarrow()
+    if isinstance(features, dict):
+        features = DataFrame(features)
+    elif is_columnar(features):
+        features = to_arrow_table(features)
+    if isinstance(features, (DataFrame, pyarrow.Table, pyarrow.RecordBatch)):
+        features = [features]
+    for piece in features:
+        if isinstance(piece, DataFrame):
+            for start in range(0, len(piece), row_group_size):
+                yield piece.iloc[start:start + row_group_size]
+        elif isinstance(piece, (pyarrow.Table, pyarrow.RecordBatch)):
+            for start in range(0, piece.num_rows, row_group_size):
+                yield piece.slice(start, row_group_size)
+        else:
+            yield piece
+
+
+def iter_parquet(features, compression: Optional[str] = None, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 writer_options: Optional[dict] = None) -> Iterator[bytes]:
+    """
+    Encode features into parquet incrementally, one row group at a time. Only the row group being encoded is held
+    in memory, regardless of the size of the features.
+
+    :param features: DataFrame, dictionary, arrow Table or RecordBatch, NumPy structured array or object exposing the
+        dataframe interchange protocol, or an iterable of them.
+    :param compression: parquet compression codec.
+    :param row_group_size: maximum number of rows in one row group.
+    :param writer_options: options of `pyarrow.parquet.ParquetWriter`, replacing `compression`, see `ParquetProfile`.
+    :return: iterator of the bytes of the parquet file
+    """
+    pyarrow = _import_pyarrow()
+    sink = _DrainableSink()
+    writer = None
+    try:
+        for piece in iter_row_groups(features, row_group_size):
+            table = to_arrow_table(piece, schema=None if writer is None else writer.schema)
+            if writer is None:
+                options = writer_options if writer_options is not None else dict(compression=compression or 'none')
+                writer = pyarrow.parquet.ParquetWriter(sink, table.schema, **options)
+            writer.write_table(table, row_group_size=row_group_size)
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("No features were provided to be uploaded.")
+    yield sink.drain()
+
+
+def iter_file(file, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Read file object in chunks.
+
+    :param file: binary file object.
+    :param chunk_size: size of one chunk in bytes.
+    :return: iterator of chunks
+    """
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class StreamingMultipart:
+    """
+    Multipart form body generated while it is being sent. Given to `Connection.POST` as data, it is uploaded with
+    chunked transfer encoding, so the whole body is never held in memory.
+    """
+
+    def __init__(self, fields: dict, files: dict):
+        """
+        :param fields: form fields, None values are skipped as `requests` does.
+        :param files: dictionary of (filename, content, content type), where content is bytes, binary file object or
+            iterable of bytes. None content is skipped.
+        """
+        self.boundary = uuid4().hex
+        self.fields = fields
+        self.files = files
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _part_header(self, name: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> bytes:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type is not None:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode('utf-8')
+
+    def __iter__(self) -> Iterator[bytes]:
+        for name, value in self.fields.items():
+            if value is not None:
+                yield self._part_header(name) + str(value).encode('utf-8') + b"\r\n"
+        for name, (filename, content, content_type) in self.files.items():
+            if content is None:
+                continue
+            yield self._part_header(name, filename, content_type)
+            for chunk in self._iter_content(content):
+                if chunk:
+                    yield chunk
+            yield b"\r\n"
+        yield f"--{self.boundary}--\r\n".encode('utf-8')
+
+    @staticmethod
+    def _iter_content(content: Union[bytes, Iterable[bytes]]) -> Iterator[bytes]:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            yield content
+        elif isinstance(content, mmap.mmap):
+            for start in range(0, len(content), DEFAULT_CHUNK_SIZE):
+                yield content[start:start + DEFAULT_CHUNK_SIZE]
+        elif hasattr(content, 'read'):
+            yield from iter_file(content)
+        else:
+            yield from content
+
+
+class SizedMultipart(StreamingMultipart):
+    """
+    Multipart form body of contents of known size: bytes, memory maps or seekable files. It is generated while it is
+    being sent like `StreamingMultipart`, but with `Content-Length` instead of chunked transfer encoding, and it can be
+    sent again when the request is retried.
+    """
+
+    def __iter__(self) -> Iterator[bytes]:
+        for _, content, _ in self.files.values():
+            if hasattr(content, 'seek'):
+                content.seek(0)
+        return super(SizedMultipart, self).__iter__()
+
+    def __len__(self) -> int:
+        size = sum(len(self._part_header(name)) + len(str(value).encode('utf-8')) + 2
+                   for name, value in self.fields.items() if value is not None)
+        for name, (filename, content, content_type) in self.files.items():
+            if content is not None:
+                size += len(self._part_header(name, filename, content_type)) + self._content_size(content) + 2
+        return size + len(f"--{self.boundary}--\r\n")
+
+    @staticmethod
+    def _content_size(content) -> int:
+        if isinstance(content, (bytes, bytearray, memoryview, mmap.mmap)):
+            return len(content)
+        position = content.tell()
+        size = content.seek(0, 2)
+        content.seek(position)
+        return size
@@ -0,0 +1,205 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from functools import partial
+from typing import Any, Callable, Optional, Tuple, Union, TYPE_CHECKING
+
+from pandas import DataFrame
+
+from compredict.exceptions import ClientError, ServerError
+from compredict.utils.polling import DEFAULT_MAX_WORKERS, PollingPolicy, TaskPoller
+from compredict.utils.serialization import serialize_features
+
+if TYPE_CHECKING:  # pragma: no cover
+    from compredict.client import api
+    from compredict.resources import Result, Task
+
+DEFAULT_MAX_IN_FLIGHT = 32
+
+
+class SubmissionPool:
+
+    def __init__(self,
+                 client: "api",
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 serialization_workers: Optional[int] = None,
+                 policy: Optional[PollingPolicy] = None,
+                 timeout: Optional[float] = None):
+        """
+        Pool running predictions in the background: features are serialized in worker processes, uploaded by worker
+        threads, and queued tasks are polled on a shared `TaskPoller` until they are finished.
+
+        At most `max_in_flight` predictions are processed at a time, further `submit` calls block until one of them
+        is done, so memory and the load on AI Core stay bounded.
+
+        :param client: client sending the requests.
+        :param max_in_flight: maximum number of predictions submitted and not finished yet.
+        :param max_workers: number of threads uploading the features, and number of concurrent polls.
+        :param serialization_workers: number of processes serializing DataFrames and dictionaries to parquet, None for
+            the number of CPUs, 0 to serialize them in the uploading threads.
+        :param policy: `PollingPolicy` of queued tasks.
+        :param timeout: seconds to wait for a queued task, None to wait forever.
+        """
+        self.client = client
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='compredict-submit')
+        self._processes = ProcessPoolExecutor(serialization_workers) if serialization_workers != 0 else None
+        self._poller = TaskPoller(policy, max_workers)
+
+    def submit(self, algorithm_id: str, features: Union[str, bytes, DataFrame, dict], **kwargs) -> Future:
+        """
+        Submit prediction of the algorithm, blocks while `max_in_flight` predictions are in progress.
+
+        :param algorithm_id: String identifier of the algorithm
+        :param features: features, as accepted by `api.run_algorithm`.
+        :param kwargs: other arguments of `api.run_algorithm`. Features are deduplicated before they are serialized,
+            and the predictions of the `Result` are scattered back to their original rows. Features are optimized
+            before they are serialized too, and the `optimization` is kept in the `Result`. With `validate_schema`,
+            features are validated before they are serialized.
+        :return: future completed with the final `Result`, or with the error of the prediction.
+        :raises ValueError: if `deduplicate` or `optimize` is set for features which are not DataFrame or
+            dictionary.
+        :raises SchemaError: if `validate_schema` is set and the features or parameters don't match the templates.
+        """
+        self._semaphore.acquire()
+        future = Future()
+        with self._lock:
+            self._in_flight.add(future)
+        future.add_done_callback(self._release)
+        try:
+            features, restore = self._prepare(algorithm_id, features, kwargs)
+            if self._processes is not None and isinstance(features, (DataFrame, dict)):
+                compression, profile = kwargs.get('compression'), self.client._get_parquet_profile(
+                    kwargs.get('compression'))
+                if profile is not None:
+                    compression, profile = None, profile.resolve(features)
+                cache, key, cached = self._get_cached(features, compression, profile)
+                if cached is not None:
+                    self._threads.submit(self._upload, future, algorithm_id, cached, kwargs, restore)
+                    return future
+                serialized = self._processes.submit(serialize_features, features, compression, profile)
+                if key is not None:
+                    serialized.add_done_callback(partial(self._cache_serialized, cache, key))
+                serialized.add_done_callback(partial(self._upload_serialized, future, algorithm_id, kwargs, restore))
+            else:
+                self._threads.submit(self._upload, future, algorithm_id, features, kwargs, restore)
+        except BaseException:
+            future.cancel()
+            raise
+        return future
+
+    def _prepare(self, algorithm_id: str, features, kwargs: dict) -> Tuple[Any, Callable]:
+        """
+        Apply to the features the options of `api.run_algorithm` which need them as DataFrame or dictionary, before
+        they are serialized. The options are removed from `kwargs`.
+
+        :return: features to serialize, callable completing the final `Result` with what was applied
+        """
+        original, deduplication, optimization = features, None, None
+        if kwargs.pop('deduplicate', False):
+            features, deduplication = self.client._deduplicate(features, kwargs.get('stream', False))
+        optimize = kwargs.pop('optimize', False)
+        if optimize:
+            features, optimization = self.client._optimize_features(features, optimize, algorithm_id,
+                                                                    kwargs.get('version'))
+        if kwargs.pop('validate_schema', False):
+            self.client._validate_schema(algorithm_id, features, kwargs.get('parameters'), kwargs.get('version'))
+        return features, partial(self._restore, features=original, deduplication=deduplication,
+                                 optimization=optimization)
+
+    def _restore(self, result: "Result", features=None, deduplication=None, optimization=None) -> "Result":
+        result = self.client._restore_rows(result, deduplication, features)
+        if optimization is not None:
+            result.optimization = optimization
+        return result
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._in_flight.discard(future)
+        self._semaphore.release()
+
+    def _get_cached(self, features: Union[DataFrame, dict], compression: Optional[str], profile=None):
+        """
+        Look the features up in the `serialization_cache` of the client.
+
+        :return: the cache, key of the features or None if they can't be cached, cached content or None
+        """
+        cache = self.client.serialization_cache
+        if cache is None:
+            return None, None, None
+        try:
+            key = cache.key(features, compression if profile is None else profile.cache_key())
+        except TypeError:
+            cache.record(hit=False)
+            return cache, None, None
+        content = cache.get(key)
+        cache.record(hit=content is not None, size=len(content) if content is not None else 0)
+        return cache, key, content
+
+    @staticmethod
+    def _cache_serialized(cache, key: str, serialized: Future):
+        if serialized.exception() is None:
+            cache.put(key, serialized.result())
+
+    def _upload_serialized(self, future: Future, algorithm_id: str, kwargs: dict, restore: Callable,
+                           serialized: Future):
+        if serialized.exception() is not None:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(serialized.exception())
+            return
+        self._threads.submit(self._upload, future, algorithm_id, serialized.result(), kwargs, restore)
+
+    def _upload(self, future: Future, algorithm_id: str, features, kwargs: dict, restore: Callable):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            response = self.client.run_algorithm(algorithm_id, features, **kwargs)
+            if response is False:
+                error = self.client.last_error
+                raise (ServerError if error and error.status_code >= 500 else ClientError)(str(error))
+        except BaseException as error:
+            future.set_exception(error)
+            return
+        if isinstance(response, self.client._get_resource_class('Task')):
+            self._poller.watch(response, self.timeout).add_done_callback(partial(self._resolve_task, future, restore))
+        else:
+            future.set_result(restore(response))
+
+    def _resolve_task(self, future: Future, restore: Callable, polled: Future):
+        if polled.exception() is not None:
+            future.set_exception(polled.exception())
+            return
+        task: "Task" = polled.result()
+        if task.success is not True:
+            future.set_exception(ServerError(f"Task {task.job_id} {task.status.lower()}: {task.error}"))
+            return
+        future.set_result(restore(self._to_result(task)))
+
+    def _to_result(self, task: "Task") -> "Result":
+        values = {key: value for key, value in task.__dict__.items() if key != 'client'}
+        return self.client._map_resource('Result', values)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the workers of the pool.
+
+        :param wait: wait for the submitted predictions to be finished, otherwise the ones not finished yet are
+            completed with `CancelledError`.
+        """
+        if wait:
+            with self._lock:
+                in_flight = list(self._in_flight)
+            wait_futures(in_flight)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+        self._threads.shutdown(wait=wait)
+        self._poller.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
@@ -0,0 +1,137 @@
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from tempfile import NamedTemporaryFile
+from typing import Callable, Optional, Union
+
+DEFAULT_TEMPLATE_CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'compredict', 'templates')
+DEFAULT_TEMPLATE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class TemplateCache:
+
+    def __init__(self, directory: str = DEFAULT_TEMPLATE_CACHE_DIRECTORY,
+                 max_bytes: int = DEFAULT_TEMPLATE_CACHE_MAX_BYTES):
+        """
+        Disk cache of the templates and graphs of algorithm versions, which don't change once the version is
+        published. Files are kept in `directory` up to `max_bytes`, the least recently used are removed first.
+
+        :param directory: directory of the cached files, it can be shared by processes.
+        :param max_bytes: maximum size in bytes of the cached files.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._files = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith('.'):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[os.path.splitext(name)[0]] = (name, size)
+            self._size += size
+
+    @staticmethod
+    def key(kind: str, algorithm_id: str, version: str, file_type: str) -> str:
+        """
+        Return the key of the file.
+
+        :param kind: 'template' or 'graph'
+        :param algorithm_id: String identifier of the algorithm
+        :param version: version of the algorithm
+        :param file_type: 'input', 'output' or 'parameters'
+        :return: hexadecimal digest
+        """
+        return hashlib.sha1('\n'.join((kind, algorithm_id, version, file_type)).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the path of the cached file, or None if not cached.
+        """
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None:
+                return None
+            path = os.path.join(self.directory, entry[0])
+            try:
+                os.utime(path)
+            except OSError:
+                self._size -= self._files.pop(key)[1]
+                return None
+            self._files.move_to_end(key)
+            return path
+
+    def get_or_download(self, key: str, download: Callable[..., Union[str, bool]]) -> Union[str, bool]:
+        """
+        Return the path of the cached file, downloading it first if it is not cached.
+
+        :param key: key of the file, see `key`
+        :param download: callable writing the file into the given binary file, returning its extension (e.g. '.png')
+            or False on error.
+        :return: path of the cached file, False if the download failed
+        """
+        path = self.get(key)
+        if path is not None:
+            return path
+        with NamedTemporaryFile(dir=self.directory, prefix='.download-', delete=False) as file:
+            try:
+                extension = download(file)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        if extension is False:
+            os.remove(file.name)
+            return False
+        name = key + extension
+        path = os.path.join(self.directory, name)
+        os.replace(file.name, path)
+        self._add(key, name, os.path.getsize(path))
+        return path
+
+    def _add(self, key: str, name: str, size: int):
+        with self._lock:
+            if key in self._files:
+                self._size -= self._files.pop(key)[1]
+            self._files[key] = (name, size)
+            self._size += size
+            while self._size > self.max_bytes and len(self._files) > 1:
+                _, (evicted, evicted_size) = self._files.popitem(last=False)
+                self._size -= evicted_size
+                try:
+                    os.remove(os.path.join(self.directory, evicted))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def map(path: str) -> mmap.mmap:
+        """
+        Memory-map the cached file read-only.
+
+        :param path: path returned by the cache
+        :return: read-only memory map, to be closed once done
+        """
+        with open(path, 'rb') as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def clear(self):
+        """
+        Remove all the cached files.
+        """
+        with self._lock:
+            for name, _ in self._files.values():
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+            self._files.clear()
+            self._size = 0
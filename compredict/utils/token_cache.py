@@ -0,0 +1,143 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from compredict.utils.authentications import is_token_expiring
+
+if os.name == 'nt':  # pragma: no cover
+    import msvcrt
+
+    def _lock(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'compredict', 'tokens.json')
+
+
+class TokenCache:
+
+    def __init__(self, path: str = DEFAULT_TOKEN_CACHE_PATH, margin: float = 60):
+        """
+        Token cache shared on disk by all the processes of a host, so workers starting together log in to AI Core
+        once and reuse the access and refresh tokens while they are valid.
+
+        Access to the cache is serialized with a lock file next to it: the first worker generates the tokens while
+        the others wait and then read them. The cache file is only readable by its owner.
+
+        :param path: path to the JSON file of the cache.
+        :param margin: seconds before the expiry of cached access token, when it is not reused anymore.
+        """
+        self.path = path
+        self.margin = margin
+
+    @staticmethod
+    def _key(url: str, username: str) -> str:
+        return f"{url}|{username}"
+
+    @contextmanager
+    def _locked(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.lock', 'a+') as lock_file:
+            _lock(lock_file)
+            try:
+                yield
+            finally:
+                _unlock(lock_file)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return dict()
+
+    def _write(self, entries: dict):
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(entries, file)
+        os.replace(temporary_path, self.path)
+
+    def is_valid(self, tokens: Optional[dict], rejected: Optional[str] = None) -> bool:
+        """
+        Check if cached access token can be reused.
+
+        :param tokens: cached dictionary with `access` and `refresh` tokens
+        :param rejected: access token known to be invalid
+        :return: bool
+        """
+        return (tokens is not None and tokens.get('access') is not None and tokens['access'] != rejected
+                and not is_token_expiring(tokens['access'], self.margin))
+
+    def get(self, url: str, username: str) -> Optional[dict]:
+        """
+        Return cached tokens of the user.
+
+        :param url: url of AI Core
+        :param username: user's username in AI Core
+        :return: dictionary with `access` and `refresh` tokens or None
+        """
+        with self._locked():
+            return self._read().get(self._key(url, username))
+
+    def set(self, url: str, username: str, tokens: dict):
+        """
+        Store tokens of the user.
+
+        :param url: url of AI Core
+        :param username: user's username in AI Core
+        :param tokens: dictionary with `access` and `refresh` tokens
+        """
+        with self._locked():
+            entries = self._read()
+            entries[self._key(url, username)] = tokens
+            self._write(entries)
+
+    def get_or_generate(self, url: str, username: str, generate: Callable[[Optional[dict]], dict],
+                        rejected: Optional[str] = None) -> dict:
+        """
+        Return cached tokens of the user if the access token is still valid, otherwise generate new tokens and store
+        them. Only one process generates the tokens at a time, others wait and reuse them.
+
+        :param url: url of AI Core
+        :param username: user's username in AI Core
+        :param generate: callable receiving the cached tokens (or None) and returning new dictionary with `access`
+            and `refresh` tokens.
+        :param rejected: access token known to be invalid, it is not reused even if not expired.
+        :return: dictionary with `access` and `refresh` tokens
+        """
+        key = self._key(url, username)
+        with self._locked():
+            entries = self._read()
+            tokens = entries.get(key)
+            if self.is_valid(tokens, rejected):
+                return tokens
+            tokens = generate(tokens)
+            entries[key] = tokens
+            self._write(entries)
+            return tokens
+
+    def invalidate(self, url: str, username: str):
+        """
+        Remove cached tokens of the user.
+        """
+        with self._locked():
+            entries = self._read()
+            if entries.pop(self._key(url, username), None) is not None:
+                self._write(entries)
@@ -0,0 +1,143 @@
+from typing import Dict, List, Optional, Union
+
+from pandas import CategoricalDtype, DataFrame, Series
+from pandas.api.types import infer_dtype, is_bool_dtype, is_datetime64_any_dtype, is_float_dtype, \
+    is_integer_dtype, is_numeric_dtype
+
+from compredict.exceptions import SchemaError
+from compredict.utils.optimization import template_columns
+
+# types of the templates, by kind of values checked
+TYPE_KINDS = {
+    'float': 'float', 'double': 'float', 'number': 'float', 'numeric': 'float',
+    'int': 'integer', 'integer': 'integer',
+    'str': 'string', 'string': 'string', 'text': 'string',
+    'bool': 'boolean', 'boolean': 'boolean',
+    'datetime': 'datetime', 'date': 'datetime', 'timestamp': 'datetime',
+}
+PARAMETER_TYPES = {'float': (int, float), 'integer': (int,), 'string': (str,), 'boolean': (bool,)}
+
+
+class ColumnRule:
+    """Expectations of one column of the features, compiled from its template entry."""
+
+    def __init__(self, name: str, kind: Optional[str], mandatory: bool, nullable: bool):
+        self.name = name
+        self.kind = kind
+        self.mandatory = mandatory
+        self.nullable = nullable
+
+    @classmethod
+    def from_template(cls, name: str, entry: dict) -> "ColumnRule":
+        return cls(name, TYPE_KINDS.get(str(entry.get('type', '')).lower()), bool(entry.get('mandatory', False)),
+                   bool(entry.get('nullable', True)))
+
+    def check(self, column: Series) -> List[str]:
+        """
+        Return the differences of the column from the rule, empty if it matches.
+        """
+        differences = []
+        if self.kind is not None and not self._has_kind(column):
+            differences.append(f"column '{self.name}': expected {self.kind}, got {column.dtype}")
+        if not self.nullable:
+            nulls = int(column.isna().sum())
+            if nulls:
+                differences.append(f"column '{self.name}': {nulls} null values, but it is not nullable")
+        return differences
+
+    def _has_kind(self, column: Series) -> bool:
+        dtype = column.dtype
+        if isinstance(dtype, CategoricalDtype):
+            dtype = dtype.categories.dtype
+            column = Series(column.cat.categories)
+        if self.kind == 'float':
+            return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+        if self.kind == 'integer':
+            if is_integer_dtype(dtype):
+                return True
+            # integers with nulls are loaded as floats
+            return is_float_dtype(dtype) and bool((column.dropna() % 1 == 0).all())
+        if self.kind == 'boolean':
+            return is_bool_dtype(dtype)
+        if self.kind == 'datetime':
+            return is_datetime64_any_dtype(dtype)
+        return infer_dtype(column, skipna=True) in ('string', 'empty')
+
+
+class SchemaValidator:
+
+    def __init__(self, features_format: Optional[list] = None, parameters_format: Optional[list] = None):
+        """
+        Validator of the features and parameters of a version, compiled once from its templates so that requests can
+        be checked locally, before anything is uploaded.
+
+        Features must have the mandatory columns of the template, with values of the type of the template, and
+        without nulls in the columns marked `nullable: false`. Parameters must have the mandatory parameters, with
+        values of the type of the template.
+
+        :param features_format: features template of the version, `Version.features_format`.
+        :param parameters_format: parameters template of the version, as returned by `api.get_template` with
+            `file_type='parameters'`.
+        """
+        self.columns: Dict[str, ColumnRule] = {name: ColumnRule.from_template(name, entry)
+                                               for name, entry in template_columns(features_format).items()}
+        self.parameters: Dict[str, ColumnRule] = {name: ColumnRule.from_template(name, entry)
+                                                  for name, entry in template_columns(parameters_format).items()}
+
+    @classmethod
+    def from_version(cls, version, parameters_format: Optional[list] = None) -> "SchemaValidator":
+        """
+        Compile the validator of the version, whose resource holds only the features template.
+        """
+        return cls(version.features_format, parameters_format)
+
+    def check_features(self, data: Union[DataFrame, dict]) -> List[str]:
+        """
+        Return the differences of the features from the template, empty if they match.
+
+        :param data: features as DataFrame or dictionary accepted by DataFrame.
+        """
+        if isinstance(data, dict):
+            data = DataFrame(data)
+        differences = []
+        for name, rule in self.columns.items():
+            if name not in data.columns:
+                if rule.mandatory:
+                    differences.append(f"missing column '{name}'")
+                continue
+            differences.extend(rule.check(data[name]))
+        return differences
+
+    def check_parameters(self, parameters: dict) -> List[str]:
+        """
+        Return the differences of the parameters from the template, empty if they match.
+        """
+        differences = []
+        for name, rule in self.parameters.items():
+            if name not in parameters:
+                if rule.mandatory:
+                    differences.append(f"missing parameter '{name}'")
+                continue
+            value = parameters[name]
+            types = PARAMETER_TYPES.get(rule.kind)
+            if value is None:
+                if not rule.nullable:
+                    differences.append(f"parameter '{name}': null, but it is not nullable")
+            elif types is not None and (not isinstance(value, types)
+                                        or (rule.kind != 'boolean' and isinstance(value, bool))):
+                differences.append(f"parameter '{name}': expected {rule.kind}, got {type(value).__name__}")
+        return differences
+
+    def validate(self, features=None, parameters=None):
+        """
+        Check the DataFrame or dictionary features and the dictionary parameters, other kinds are not checked.
+
+        :raises SchemaError: with all the differences, if they don't match the templates
+        """
+        differences = []
+        if isinstance(features, (DataFrame, dict)):
+            differences.extend(self.check_features(features))
+        if isinstance(parameters, dict):
+            differences.extend(self.check_parameters(parameters))
+        if differences:
+            raise SchemaError(differences)
@@ -15,7 +15,22 @@ dev_requirements = [
     'pytest~=6.2.4',
     'pytest-mock~=3.6.1',
     'pytest-cov~=2.12.1',
-    'fastparquet~=0.8.0'
+    'fastparquet~=0.8.0',
+    'aiohttp>=3.7.0,<4.0.0',
+    'pyarrow>=4.0.0',
+    'pyjwt>=2.0.0'
+]
+
+async_requirements = [
+    'aiohttp>=3.7.0,<4.0.0'
+]
+
+streaming_requirements = [
+    'pyarrow>=4.0.0'
+]
+
+jwt_requirements = [
+    'pyjwt[crypto]>=2.0.0'
 ]
 
 setup(
@@ -48,6 +63,9 @@ setup(
     # Dependent packages (distributions)
     install_requires=requirements,
     extras_require={
-            'dev': dev_requirements
+            'dev': dev_requirements,
+            'async': async_requirements,
+            'streaming': streaming_requirements,
+            'jwt': jwt_requirements
     }
 )
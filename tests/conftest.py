@@ -1,4 +1,6 @@
+import base64
 import json
+import time
 from pathlib import Path
 
 import pytest
@@ -270,3 +272,15 @@ def features_path():
 def parameters_path():
     parameters = Path(__file__).resolve().parent / "media/parameters-example.json"
     return parameters.__str__()
+
+
+@pytest.fixture(scope="session")
+def jwt_factory():
+    def jwt_factory(expires_in: float = 300, **claims):
+        def encode(part):
+            return base64.urlsafe_b64encode(json.dumps(part).encode('utf-8')).rstrip(b'=').decode('ascii')
+
+        claims.setdefault('exp', int(time.time() + expires_in))
+        return "{}.{}.{}".format(encode({"alg": "HS256", "typ": "JWT"}), encode(claims), "c2lnbmF0dXJl")
+
+    return jwt_factory
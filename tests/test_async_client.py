@@ -0,0 +1,261 @@
+import asyncio
+import gc
+import threading
+import weakref
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+from compredict.async_client import AsyncApi
+from compredict.async_connection import AsyncConnection
+from compredict.exceptions import ClientError
+from compredict.resources import AsyncAlgorithm, AsyncTask, AsyncVersion, Result
+from compredict.utils.retry import RetryPolicy
+
+
+def run_with_server(routes, test):
+    """Serve the given routes on a local port and run the test coroutine with a client pointing to it."""
+
+    async def runner():
+        app = web.Application()
+        app.add_routes(routes)
+        app_runner = web.AppRunner(app)
+        await app_runner.setup()
+        site = web.TCPSite(app_runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        client = AsyncApi(token='sometoken', url=f'http://127.0.0.1:{port}')
+        try:
+            return await test(client)
+        finally:
+            await client.close()
+            await app_runner.cleanup()
+
+    return asyncio.run(runner())
+
+
+def test_get_algorithm(algorithm):
+    async def handler(request):
+        assert request.headers['Authorization'] == 'Bearer sometoken'
+        return web.json_response(algorithm)
+
+    async def test(client):
+        return await client.get_algorithm('mass_estimation')
+
+    response = run_with_server([web.get('/algorithms/{algorithm_id}', handler)], test)
+
+    assert isinstance(response, AsyncAlgorithm)
+    assert isinstance(response.versions[0], AsyncVersion)
+    assert response.versions[0].client is response.client
+
+
+def test_run_algorithm_and_update_task(data):
+    received = dict()
+
+    async def predict(request):
+        form = await request.post()
+        received['features'] = form['features'].file.read()
+        received['evaluate'] = form['evaluate']
+        received['has_parameters'] = 'parameters' in form
+        return web.json_response({"job_id": "s1o2m3e4-jobid", "status": "Pending"})
+
+    async def task(request):
+        return web.json_response({"job_id": request.match_info['task_id'], "status": "Finished", "success": True,
+                                  "predictions": [1, 2, 3]})
+
+    async def test(client):
+        task = await client.run_algorithm('algorithm', data, evaluate=False)
+        await task.update()
+        return task
+
+    task = run_with_server([web.post('/algorithms/{algorithm_id}/predict', predict),
+                            web.get('/algorithms/tasks/{task_id}', task)], test)
+
+    assert isinstance(task, AsyncTask)
+    assert task.status == AsyncTask.STATUS_FINISHED
+    assert task.predictions == [1, 2, 3]
+    assert received['features'][:4] == b'PAR1'
+    assert received['evaluate'] == 'False'
+    assert received['has_parameters'] is False
+
+
+def test_run_algorithm_with_result(data):
+    async def predict(request):
+        return web.json_response({"reference": "12jffd", "status": "Finished", "predictions": [1]})
+
+    async def test(client):
+        return await client.run_algorithm('algorithm', data)
+
+    response = run_with_server([web.post('/algorithms/{algorithm_id}/predict', predict)], test)
+
+    assert isinstance(response, Result)
+    assert response.predictions == [1]
+
+
+def test_features_encoded_off_the_event_loop(data, features_path, mocker):
+    threads = []
+    process_data = AsyncApi._process_data
+
+    def recording(self, *args, **kwargs):
+        threads.append(threading.get_ident())
+        return process_data(self, *args, **kwargs)
+
+    mocker.patch.object(AsyncApi, '_process_data', recording)
+    received = []
+
+    async def predict(request):
+        received.append((await request.post())['features'].file.read())
+        return web.json_response({"predictions": [1]})
+
+    async def test(client):
+        await client.run_algorithm('algorithm', data, parameters={"km": 1})
+        await client.run_algorithm('algorithm', features_path)
+        return threading.get_ident()
+
+    loop_thread = run_with_server([web.post('/algorithms/{algorithm_id}/predict', predict)], test)
+
+    assert len(threads) == 3 and loop_thread not in threads
+    assert received[1] == Path(features_path).read_bytes()
+
+
+def test_many_tasks_in_flight():
+    async def task(request):
+        await asyncio.sleep(0.05)
+        return web.json_response({"job_id": request.match_info['task_id'], "status": "In Progress"})
+
+    async def test(client):
+        return await asyncio.gather(*[client.get_task_results(str(i)) for i in range(50)])
+
+    tasks = run_with_server([web.get('/algorithms/tasks/{task_id}', task)], test)
+
+    assert [task.job_id for task in tasks] == [str(i) for i in range(50)]
+
+
+def test_cancel_task(successful_cancel_task_response):
+    async def cancel(request):
+        return web.json_response(successful_cancel_task_response, status=202)
+
+    async def test(client):
+        task = AsyncTask(client=client, job_id=successful_cancel_task_response['job_id'])
+        await task.cancel()
+        return task
+
+    task = run_with_server([web.delete('/algorithms/tasks/{task_id}', cancel)], test)
+
+    assert task.status == 'Canceled'
+
+
+def test_generate_token(generated_token):
+    async def token(request):
+        assert await request.json() == {"username": "user", "password": "password"}
+        return web.json_response(generated_token)
+
+    async def algorithms(request):
+        return web.json_response([], headers={'X-Token': request.headers['Authorization']})
+
+    async def test(client):
+        await client.generate_token('user', 'password')
+        await client.get_algorithms()
+        return client, client.connection.last_request
+
+    client, last_request = run_with_server([web.post('/token/', token), web.get('/algorithms', algorithms)], test)
+
+    assert client.token == 'sometokenvalue'
+    assert client.refresh_token == 'somerefreshtokenvalue'
+    assert last_request.headers['X-Token'] == 'Bearer sometokenvalue'
+
+
+def test_client_error_raised(unsucessful_content):
+    async def algorithm(request):
+        return web.json_response(unsucessful_content, status=400)
+
+    async def test(client):
+        client.fail_on_error()
+        return await client.get_algorithm('algorithm')
+
+    with pytest.raises(ClientError):
+        run_with_server([web.get('/algorithms/{algorithm_id}', algorithm)], test)
+
+
+def test_last_error_kept_per_task(algorithm, unsucessful_content):
+    async def get_algorithm(request):
+        if request.match_info['algorithm_id'] == 'missing':
+            return web.json_response(unsucessful_content, status=400)
+        await asyncio.sleep(0.05)
+        return web.json_response(algorithm)
+
+    async def test(client):
+        async def get(algorithm_id):
+            response = await client.get_algorithm(algorithm_id)
+            return response, client.last_error
+
+        return await asyncio.gather(get('missing'), get('mass_estimation'))
+
+    (missing, missing_error), (found, found_error) = run_with_server(
+        [web.get('/algorithms/{algorithm_id}', get_algorithm)], test)
+
+    assert missing is False
+    assert missing_error.status_code == 400
+    assert isinstance(found, AsyncAlgorithm)
+    assert found_error is False
+
+
+def test_last_request_kept_per_connection():
+    async def test():
+        first, second = AsyncConnection('http://first'), AsyncConnection('http://second')
+        first.last_error = 'first error'
+        values = (first.last_error, second.last_error)
+        reference = weakref.ref(first)
+        del first
+        gc.collect()
+        return values, reference() is None
+
+    assert asyncio.run(test()) == (('first error', False), True)
+
+
+def test_create_without_credentials():
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncApi.create())
+
+
+def test_GET_retried(algorithm, mocker):
+    calls = []
+    mocker.patch('compredict.async_connection.asyncio.sleep', new=mocker.AsyncMock())
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return web.json_response({"error": "Service unavailable"}, status=503, headers={'Retry-After': '1'})
+        return web.json_response(algorithm)
+
+    async def test(client):
+        client.connection.retry = RetryPolicy()
+        return await client.get_algorithm('mass_estimation'), client.connection.last_request
+
+    response, last_request = run_with_server([web.get('/algorithms/{algorithm_id}', handler)], test)
+
+    assert isinstance(response, AsyncAlgorithm)
+    assert len(calls) == 2
+    assert last_request.retries == 1
+    assert last_request.retry_sleep == 1.0
+
+
+def test_run_versions(data):
+    versions = []
+
+    async def predict(request):
+        form = await request.post()
+        versions.append(form['version'])
+        return web.json_response({"predictions": [form['version']]})
+
+    async def test(client):
+        versions_data = [{'version': '1.0.0'}, {'version': '2.0.0'}]
+        algorithm = AsyncAlgorithm(client=client, id='algorithm', versions=versions_data)
+        return await algorithm.run_versions(data)
+
+    results = run_with_server([web.post('/algorithms/{algorithm_id}/predict', predict)], test)
+
+    assert sorted(versions) == ['1.0.0', '2.0.0']
+    assert results['2.0.0'].predictions == ['2.0.0']
+    assert set(results.latencies) == {'1.0.0', '2.0.0'}
@@ -0,0 +1,110 @@
+import pytest
+import requests
+from pandas import DataFrame
+
+from compredict.resources import Task
+from compredict.utils.callbacks import CallbackListener
+from compredict.utils.polling import PollingPolicy
+
+
+@pytest.fixture
+def listener():
+    with CallbackListener() as listener:
+        yield listener
+
+
+@pytest.fixture
+def pending_task(api_client):
+    return Task(client=api_client, job_id='s1o2m3e4-jobid', status=Task.STATUS_PENDING)
+
+
+def post_callback(listener, **result):
+    """Post synthetic callback the way AI Core does once the task is processed."""
+    return requests.post(listener.url, json=result, timeout=5)
+
+
+def test_callback_resolves_registered_task(listener, pending_task):
+    future = listener.register(pending_task)
+
+    response = post_callback(listener, job_id=pending_task.job_id, status=Task.STATUS_FINISHED, success=True,
+                             predictions=[1, 2, 3], callback_param={"run": 1})
+
+    assert response.status_code == 200
+    assert future.result(timeout=5) is pending_task
+    assert pending_task.status == Task.STATUS_FINISHED
+    assert pending_task.predictions == [1, 2, 3]
+    assert pending_task.callback_param == {"run": 1}
+
+
+def test_callback_received_before_registration(listener, pending_task):
+    post_callback(listener, job_id=pending_task.job_id, status=Task.STATUS_FINISHED, success=False, error="failed")
+
+    task = listener.wait(pending_task, timeout=5)
+
+    assert task.success is False
+    assert task.error == "failed"
+
+
+def test_invalid_callbacks_rejected(listener):
+    assert requests.post(listener.url, data=b'not json', timeout=5).status_code == 400
+    assert post_callback(listener, status=Task.STATUS_FINISHED).status_code == 400
+    assert requests.post(listener.url.replace(listener.path, '/other'), json={"job_id": "1"},
+                         timeout=5).status_code == 404
+
+
+def test_unauthorized_callbacks_rejected(listener, pending_task):
+    future = listener.register(pending_task)
+    address = f"http://{listener.host}:{listener.port}{listener.path}"
+
+    assert requests.post(address, json={"job_id": pending_task.job_id}, timeout=5).status_code == 403
+    assert requests.post(address + '?secret=guess', json={"job_id": pending_task.job_id}, timeout=5).status_code == 403
+    assert not future.done()
+    assert listener._unclaimed == {}
+
+
+def test_large_callbacks_rejected(pending_task):
+    with CallbackListener(secret='s/cr&t', max_body_size=100) as listener:
+        future = listener.register(pending_task)
+
+        assert listener.url.endswith('?secret=s%2Fcr%26t')
+        assert post_callback(listener, job_id=pending_task.job_id, predictions=[0] * 100).status_code == 413
+        assert post_callback(listener, job_id=pending_task.job_id, status=Task.STATUS_FINISHED).status_code == 200
+        assert future.result(timeout=5).status == Task.STATUS_FINISHED
+
+    assert CallbackListener(public_url='https://me.example.com/callback?run=1', secret='s').url == \
+        'https://me.example.com/callback?run=1&secret=s'
+
+
+def test_wait_falls_back_to_polling(listener, pending_task, api_client, mocker):
+    finished = Task(client=api_client, job_id=pending_task.job_id, status=Task.STATUS_FINISHED, success=True,
+                    predictions=[1])
+    get_task_results = mocker.patch.object(api_client, 'get_task_results', return_value=finished)
+
+    task = listener.wait(pending_task, timeout=5, fallback_after=0.05, policy=PollingPolicy(initial_interval=0.01))
+
+    assert task.predictions == [1]
+    get_task_results.assert_called_once_with(pending_task.job_id)
+    assert listener._futures == {}
+
+
+def test_run_algorithm_with_listener(listener, api_client, mocker, response_200_with_job_id):
+    post = mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+
+    task = api_client.run_algorithm('algorithm', {"a": [1]}, callback_url=listener.url)
+    future = listener.register(task)
+    post_callback(listener, job_id=task.job_id, status=Task.STATUS_FINISHED, success=True, predictions=[2])
+
+    assert post.call_args.kwargs['data']['callback_url'] == listener.url
+    assert future.result(timeout=5).predictions == [2]
+
+
+def test_callback_restores_deduplicated_rows(listener, api_client, mocker, response_200_with_job_id):
+    mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+    features = DataFrame({"a": [1, 1, 2]}, index=[5, 6, 7])
+
+    task = api_client.run_algorithm('algorithm', features, deduplicate=True, callback_url=listener.url)
+    future = listener.register(task)
+    post_callback(listener, job_id=task.job_id, status=Task.STATUS_FINISHED, success=True, predictions=[10, 20])
+
+    assert future.result(timeout=5).predictions == [10, 10, 20]
+    assert task.to_pandas()["predictions"].to_dict() == {5: 10, 6: 10, 7: 20}
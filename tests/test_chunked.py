@@ -0,0 +1,116 @@
+import io
+import json
+import threading
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+from requests import Response
+
+from compredict.exceptions import ClientError, ServerError
+from compredict.resources import Algorithm, Result
+from compredict.utils.predictions import merge_chunks
+from compredict.utils.serialization import split_rows
+from compredict.utils.submission import SubmissionPool
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"a": range(10), "b": [float(i) for i in range(10)]})
+
+
+@pytest.fixture
+def pool_client(api_client, mocker):
+    pool = SubmissionPool(api_client, max_in_flight=4, serialization_workers=0)
+    mocker.patch.object(api_client, '_submission_pool', pool)
+    yield api_client
+    pool.shutdown()
+
+
+def predicting(failures=()):
+    """Fake AI Core predicting 2 * a for each row, failing once for the chunks starting with the given rows."""
+    failed = set()
+    lock = threading.Lock()
+
+    def post(address, files=None, **kwargs):
+        rows = pd.read_parquet(io.BytesIO(files['features'][1].read()))
+        first = int(rows['a'].iloc[0])
+        with lock:
+            fail = first in failures and first not in failed
+            failed.add(first)
+        response = Response()
+        response.url = address
+        if fail:
+            response.status_code = 500
+            response._content = json.dumps({"error": "Worker died"}).encode()
+        else:
+            response.status_code = 200
+            response._content = json.dumps({"predictions": {"mass": [2 * a for a in rows['a']]},
+                                            "evaluations": {"mae": first}}).encode()
+        return response
+
+    return post
+
+
+def test_split_rows(features):
+    assert [len(chunk) for chunk in split_rows(features, chunk_size=4)] == [4, 4, 2]
+    assert [len(chunk) for chunk in split_rows(features.to_dict('list'), chunk_bytes=5 * 16)] == [5, 5]
+    with pytest.raises(ValueError):
+        list(split_rows(features))
+
+
+def test_merge_chunks():
+    assert merge_chunks([[1, 2], None, [3]]) == [1, 2, 3]
+    assert merge_chunks([{"x": [1], "mae": 0.1}, {"x": [2], "mae": 0.2}]) == {"x": [1, 2], "mae": [0.1, 0.2]}
+    assert merge_chunks([None, None]) is None
+
+
+def test_run_algorithm_chunked(pool_client, mocker, features):
+    post = mocker.patch('requests.Session.post', side_effect=predicting())
+
+    result = pool_client.run_algorithm_chunked('algorithm', features, chunk_size=3, parameters={"p": 1})
+
+    assert isinstance(result, Result)
+    assert post.call_count == 4
+    assert result.chunks == 4
+    assert result.predictions == {"mass": [2 * a for a in range(10)]}
+    assert result.evaluations == {"mae": [0, 3, 6, 9]}
+
+
+def test_run_algorithm_chunked_retries_failed_chunks(pool_client, mocker, features):
+    post = mocker.patch('requests.Session.post', side_effect=predicting(failures={3, 6}))
+
+    result = pool_client.run_algorithm_chunked('algorithm', features, chunk_size=3)
+
+    assert post.call_count == 6
+    assert result.predictions == {"mass": [2 * a for a in range(10)]}
+
+
+def test_run_algorithm_chunked_gives_up(pool_client, mocker, features):
+    mocker.patch('requests.Session.post', side_effect=predicting(failures={0}))
+
+    with pytest.raises(ServerError):
+        pool_client.run_algorithm_chunked('algorithm', features, chunk_size=5, max_attempts=1)
+
+
+def test_run_algorithm_chunked_client_errors_not_retried(pool_client, mocker, features):
+    post = mocker.patch('requests.Session.post', side_effect=predicting())
+
+    with pytest.raises(ValueError):
+        pool_client.run_algorithm_chunked('algorithm', features, chunk_size=5, max_attempts=0)
+    mocker.patch.object(pool_client, 'run_algorithm', side_effect=ClientError("Bad features"))
+    with pytest.raises(ClientError):
+        pool_client.run_algorithm_chunked('algorithm', features, chunk_size=10)
+
+    assert post.call_count == 0
+    assert pool_client.run_algorithm.call_count == 1
+
+
+def test_algorithm_run_chunked(pool_client, mocker, features, algorithm):
+    mocker.patch('requests.Session.post', side_effect=predicting())
+    algorithm = Algorithm(client=pool_client, **algorithm)
+
+    result = algorithm.run_chunked(features, chunk_bytes=1)
+
+    assert algorithm.last_results is result
+    assert result.chunks == 10
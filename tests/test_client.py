@@ -1,11 +1,24 @@
-from io import BufferedRandom
+import gzip
+import json
+import mmap
+import shutil
+import sys
+import threading
+import time
+from io import BufferedReader
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
 
 import pytest
 from pandas import DataFrame
 
+from compredict.client import api
 from compredict.exceptions import ClientError, ServerError
 from compredict.resources import Task, Algorithm, Version
+from compredict.singleton import Singleton
+from compredict.utils.authentications import TokenValidator
+from compredict.utils.metadata_cache import MetadataCache
+from compredict.utils.serialization import PARQUET_MAGIC
 
 
 @pytest.mark.parametrize("callback,expected",
@@ -36,7 +49,7 @@ def test_fail_on_error_and_verify_peer(api_client, option, expected):
 
 
 def test_last_error(response_400, mocker, connection):
-    mocker.patch('requests.get', return_value=response_400)
+    mocker.patch('requests.Session.get', return_value=response_400)
     connection.GET(endpoint="some/endpoint")
 
     actual_last_error = connection.last_error
@@ -50,7 +63,7 @@ def test_run_algorithm(api_client, mocker, response_200):
     callback_url = ["1callback", "2callback"]
     callback_param = [{1: "first"}, {2: "second"}]
 
-    mocker.patch('requests.post', return_value=response_200)
+    mocker.patch('requests.Session.post', return_value=response_200)
 
     response = api_client.run_algorithm(algorithm_id=algorithm_id, features=data,
                                         callback_url=callback_url,
@@ -62,7 +75,7 @@ def test_run_algorithm(api_client, mocker, response_200):
 
 def test_run_algorithm_with_features_and_parameters_given_as_path_to_files(api_client, mocker, response_200,
                                                                            features_path, parameters_path):
-    mocker.patch('requests.post', return_value=response_200)
+    mocker.patch('requests.Session.post', return_value=response_200)
 
     response = api_client.run_algorithm(
         algorithm_id="specific_algorithm",
@@ -75,7 +88,7 @@ def test_run_algorithm_with_features_and_parameters_given_as_path_to_files(api_c
 
 def test_run_algorithm_with_features_given_as_file_and_parameters_as_dict(api_client, mocker, response_200,
                                                                           features_path):
-    mocker.patch('requests.post', return_value=response_200)
+    mocker.patch('requests.Session.post', return_value=response_200)
     parameters = {'test': 'parameters'}
     response = api_client.run_algorithm(algorithm_id="specific_algorithm",
                                         version="2.1.1",
@@ -111,7 +124,7 @@ def test_run_algorithm_with_client_error(mocker, api_client, response_400):
     api_client.connection.fail_on_error = True
     algorithm_id = "algorithm-slug"
     data = {"data": [1, 2, 3], "test": [3, 4, 5]}
-    mocker.patch('requests.post', return_value=response_400)
+    mocker.patch('requests.Session.post', return_value=response_400)
 
     with pytest.raises(ClientError):
         api_client.run_algorithm(algorithm_id=algorithm_id, features=data)
@@ -120,7 +133,7 @@ def test_run_algorithm_with_client_error(mocker, api_client, response_400):
 def test_run_algorithm_with_server_error(mocker, api_client, response_500):
     algorithm_id = "id"
     data = {"data": [1, 2, 3], "test": [3, 4, 5]}
-    mocker.patch('requests.post', return_value=response_500)
+    mocker.patch('requests.Session.post', return_value=response_500)
     mocker.patch('compredict.connection.Connection.handle_response', side_effect=ServerError)
 
     with pytest.raises(ServerError):
@@ -132,13 +145,13 @@ def test_map_resource_with_error_raised(api_client):
     object = {"version": "0.0.1"}
 
     with pytest.raises(ImportError):
-        api_client._api__map_resource(resource, object)
+        api_client._map_resource(resource, object)
 
 
 def test_map_resource_with_task(api_client, object):
     resource = "Task"
 
-    instance = api_client._api__map_resource(resource, object)
+    instance = api_client._map_resource(resource, object)
 
     assert isinstance(instance, Task)
 
@@ -149,7 +162,7 @@ def test_map_resource_with_algorithm(api_client):
         "id": "23",
         "versions": [{'version': '9.4.6'}]
     }
-    instance = api_client._api__map_resource(resource, algorithm)
+    instance = api_client._map_resource(resource, algorithm)
 
     assert isinstance(instance, Algorithm)
 
@@ -159,14 +172,14 @@ def test_map_collection_with_raising_error(api_client, object):
     objects = [object, object]
 
     with pytest.raises(ImportError):
-        api_client._api__map_collection(resource, objects)
+        api_client._map_collection(resource, objects)
 
 
 def test_map_collection(api_client, object):
     resource = "Task"
     objects = [object, object]
 
-    results = api_client._api__map_collection(resource, objects)
+    results = api_client._map_collection(resource, objects)
 
     for result in results:
         assert isinstance(result, Task)
@@ -176,44 +189,91 @@ def test_map_collection(api_client, object):
     'file_path, file_type',
     [
         (Path(__file__).resolve().parent / "media/parameters.parquet", "parameters"),
-        (Path(__file__).resolve().parent / "media/features.json", "features")
+        (Path(__file__).resolve().parent / "media/example.json", "features"),
+        (Path(__file__).resolve().parent / "media/test.txt", "features")
     ]
 )
 def test_raise_errors_if_file_type_incorrect_with_value_error(file_path, file_type, api_client):
     with pytest.raises(ValueError):
-        api_client._api__raise_error_if_file_type_incorrect(file_path.__str__(), file_type)
+        api_client._raise_error_if_file_type_incorrect(file_path.__str__(), file_type)
 
 
 @pytest.mark.parametrize(
-    'data, type_of_data, file, to_delete',
+    'data, type_of_data, magic, to_delete',
     [
-        ({"test": 2200, "another_test": [1, 4, 6]}, 'parameters', BufferedRandom, True),
-        ({"features": [1, 2, 4, 6, 8, 10], "features_2": [1, 5, 19, 34, 1, 4]}, "features", BufferedRandom, True),
-        (DataFrame({"features": [9, 0, 2, 5], "features_2": [0, 2, 3, 6]}), "features",
-         BufferedRandom, True),
+        ({"test": 2200, "another_test": [1, 4, 6]}, 'parameters', b'{', True),
+        ({"features": [1, 2, 4, 6, 8, 10], "features_2": [1, 5, 19, 34, 1, 4]}, "features", b'PAR1', True),
+        (DataFrame({"features": [9, 0, 2, 5], "features_2": [0, 2, 3, 6]}), "features", b'PAR1', True),
         (DataFrame([{"features": "some_features", "features_2": "different_features"},
-                    {"features": "some_features", "features_2": "different_features"}]), "features", BufferedRandom,
+                    {"features": "some_features", "features_2": "different_features"}]), "features", b'PAR1',
          True)
     ]
 )
-def test_process_data(data, type_of_data, file, to_delete, api_client):
-    temp_file, delete_file = api_client._api__process_data(data, type_of_data)
+def test_process_data(data, type_of_data, magic, to_delete, api_client):
+    temp_file, delete_file = api_client._process_data(data, type_of_data)
     assert delete_file == to_delete
-    assert isinstance(temp_file.file, file)
+    assert isinstance(temp_file, SpooledTemporaryFile)
+    assert not temp_file._rolled
+    assert temp_file.read(len(magic)) == magic
+
+
+def test_process_data_spills_to_disk_above_threshold(api_client, mocker):
+    mocker.patch.object(api_client, 'spill_threshold', 100)
+    features = DataFrame({"features": range(1000)})
+
+    temp_file, to_delete = api_client._process_data(features, "features")
+
+    assert temp_file._rolled
+    assert temp_file.read(4) == b'PAR1'
+    api_client._remove_file(temp_file, to_delete)
+    assert temp_file.closed
+
+
+def test_process_parameters_with_compression(api_client):
+    temp_file, _ = api_client._process_data({"test": "parameters"}, "parameters", compression="gzip")
+
+    assert json.loads(gzip.decompress(temp_file.read())) == {"test": "parameters"}
 
 
 def test_process_features_data_provided_as_path_to_file(api_client):
     features = Path(__file__).resolve().parent / "media/features.parquet"
-    temp_file, to_delete = api_client._api__process_data(features.__str__(), "features")
-    assert isinstance(temp_file, BufferedRandom)
+    temp_file, to_delete = api_client._process_data(features.__str__(), "features")
+    assert isinstance(temp_file, mmap.mmap)
+    assert temp_file[:] == features.read_bytes()
+    with pytest.raises(TypeError):
+        temp_file[0] = 0
     assert not to_delete
+    temp_file.close()
+
+
+def test_features_file_recognized_by_content(api_client, features_path, tmp_path):
+    renamed = tmp_path / "features.bin"
+    shutil.copy(features_path, renamed)
+    truncated = tmp_path / "truncated.parquet"
+    content = Path(features_path).read_bytes()
+    truncated.write_bytes(content[:len(PARQUET_MAGIC) * 3] + content[-8:])
+
+    api_client._raise_error_if_file_type_incorrect(str(renamed), "features")
+    with pytest.raises(ValueError):
+        api_client._raise_error_if_file_type_incorrect(str(truncated), "features")
+
+
+def test_features_file_recognized_without_pyarrow(api_client, features_path, tmp_path, mocker):
+    mocker.patch.dict(sys.modules, {'pyarrow': None, 'pyarrow.parquet': None})
+    not_parquet = tmp_path / "features.parquet"
+    not_parquet.write_bytes(b"a,b\n1,2\n3,4\n")
+
+    api_client._raise_error_if_file_type_incorrect(features_path, "features")
+    with pytest.raises(ValueError):
+        api_client._raise_error_if_file_type_incorrect(str(not_parquet), "features")
 
 
 def test_process_parameters_data_provided_as_path_to_file(api_client):
     parameters = Path(__file__).resolve().parent / "media/parameters-example.json"
-    temp_file, to_delete = api_client._api__process_data(parameters.__str__(), "parameters")
-    assert isinstance(temp_file, BufferedRandom)
+    temp_file, to_delete = api_client._process_data(parameters.__str__(), "parameters")
+    assert isinstance(temp_file, BufferedReader)
     assert not to_delete
+    temp_file.close()
 
 
 def test_process_features_with_value_error(api_client):
@@ -221,7 +281,7 @@ def test_process_features_with_value_error(api_client):
     is, when dictionary is converted into pandas DataFrame."""
     features = {"features": [1, 2, 4, 6, 0], "features_2": [1, 5, 19, 34, 1, 4]}
     with pytest.raises(ValueError):
-        api_client._api__process_data(features, "features")
+        api_client._process_data(features, "features")
 
 
 def test_build_get_arguments(api_client):
@@ -229,14 +289,14 @@ def test_build_get_arguments(api_client):
     version = "1.2.2"
     expected = "?type=input&version=1.2.2"
 
-    actual = api_client._api__build_get_args(type=type, version=version)
+    actual = api_client._build_get_args(type=type, version=version)
 
     assert actual == expected
 
 
 def test_get_task_results(api_client, mocker, response_200_with_result):
     task_id = '12jffd'
-    mocker.patch('requests.get', return_value=response_200_with_result)
+    mocker.patch('requests.Session.get', return_value=response_200_with_result)
 
     response = api_client.get_task_results(task_id)
 
@@ -246,7 +306,7 @@ def test_get_task_results(api_client, mocker, response_200_with_result):
 
 def test_get_algorithm_versions(api_client, mocker, response_200_with_versions):
     algorithm_id = 'mass_estimation'
-    mocker.patch('requests.get', return_value=response_200_with_versions)
+    mocker.patch('requests.Session.get', return_value=response_200_with_versions)
 
     response = api_client.get_algorithm_versions(algorithm_id)
 
@@ -257,7 +317,7 @@ def test_get_algorithm_versions(api_client, mocker, response_200_with_versions):
 def test_get_algorithm_version(api_client, mocker, response_200_with_version):
     algorithm_id = 'co2_emission'
     version = '1.3.0'
-    mocker.patch('requests.get', return_value=response_200_with_version)
+    mocker.patch('requests.Session.get', return_value=response_200_with_version)
 
     response = api_client.get_algorithm_version(algorithm_id, version)
 
@@ -267,7 +327,7 @@ def test_get_algorithm_version(api_client, mocker, response_200_with_version):
 
 def test_get_template(api_client, mocker, response_200_with_url):
     algorithm_id = 'algorithm'
-    mocker.patch('requests.get', return_value=response_200_with_url)
+    mocker.patch('requests.Session.get', return_value=response_200_with_url)
     mocker.patch('tempfile._TemporaryFileWrapper')
 
     file = api_client.get_template(algorithm_id)
@@ -278,7 +338,7 @@ def test_get_template(api_client, mocker, response_200_with_url):
 
 def test_get_graph(api_client, mocker, response_200_with_url):
     algorithm_id = 'another_algorithm'
-    mocker.patch('requests.get', return_value=response_200_with_url)
+    mocker.patch('requests.Session.get', return_value=response_200_with_url)
     mocker.patch('tempfile._TemporaryFileWrapper')
 
     file = api_client.get_graph(algorithm_id=algorithm_id, file_type='input')
@@ -289,15 +349,57 @@ def test_get_graph(api_client, mocker, response_200_with_url):
 
 def test_get_algorithm(api_client, response_200_with_algorithm, mocker):
     algorithm_id = 'another_algorithm'
-    mocker.patch('requests.get', return_value=response_200_with_algorithm)
+    mocker.patch('requests.Session.get', return_value=response_200_with_algorithm)
 
     response = api_client.get_algorithm(algorithm_id)
 
     assert isinstance(response, Algorithm)
 
 
+def test_independent_instances(api_client, response_200_with_algorithm, mocker):
+    mocked_get = mocker.patch('requests.Session.get', return_value=response_200_with_algorithm)
+    tenant = api.new_instance(token='othertoken', url='https://tenant.compredict.ai/api/v2')
+
+    algorithm = tenant.get_algorithm('another_algorithm')
+
+    assert tenant is not api_client
+    assert isinstance(tenant, api)
+    assert algorithm.client is tenant
+    assert algorithm.versions[0].client is tenant
+    assert mocked_get.call_args.args[0].startswith('https://tenant.compredict.ai/api/v2')
+    assert mocked_get.call_args.kwargs['headers']['Authorization'] == 'Bearer othertoken'
+    assert api_client.connection.headers['Authorization'] != 'Bearer othertoken'
+
+
+def test_get_instance_thread_safe(mocker):
+    singleton = Singleton(api._decorated)
+    created = []
+    barrier = threading.Barrier(16)
+
+    def create(*args, **kwargs):
+        time.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    mocker.patch.object(singleton, '_decorated', side_effect=create)
+    instances = []
+
+    def get_instance():
+        barrier.wait()
+        instances.append(singleton.get_instance(token='sometoken'))
+
+    threads = [threading.Thread(target=get_instance) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(instance is created[0] for instance in instances)
+
+
 def test_get_algorithms(api_client, response_200_with_algorithms, mocker):
-    mocker.patch('requests.get', return_value=response_200_with_algorithms)
+    mocker.patch('requests.Session.get', return_value=response_200_with_algorithms)
 
     responses = api_client.get_algorithms()
 
@@ -310,14 +412,14 @@ def test_process_evaluate_with_dict(api_client):
         'feature': 'evaluation'
     }
 
-    evaluation = api_client._api__process_evaluate(evaluate_param)
+    evaluation = api_client._process_evaluate(evaluate_param)
     expected = '{"feature": "evaluation"}'
     assert evaluation == expected
 
 
 def test_cancel_task(api_client, mocker, response_202_cancelled_task):
     task_id = '35f438fd-6c4d-42a1-8ad0-dfa8dbfcf5da'
-    mocker.patch('requests.delete', return_value=response_202_cancelled_task)
+    mocker.patch('requests.Session.delete', return_value=response_202_cancelled_task)
     cancelled_task = api_client.cancel_task(task_id)
     assert isinstance(cancelled_task, Task)
 
@@ -325,7 +427,7 @@ def test_cancel_task(api_client, mocker, response_202_cancelled_task):
 def test_printing_error(mocker, api_client, response_500):
     algorithm_id = "id"
     data = data = {"data": [1, 2, 3], "test": [3, 4, 5]}
-    mocker.patch('requests.post', return_value=response_500)
+    mocker.patch('requests.Session.post', return_value=response_500)
     mocker.patch('compredict.connection.Connection.handle_response',
                  side_effect=ServerError("This is error that is going to be printed"))
 
@@ -339,7 +441,7 @@ def test_printing_error(mocker, api_client, response_500):
 def test_train_algorithm(mocker, api_client, response_200_with_job_id):
     algorithm_id = "algorithm-slug"
     data = data = {"data": [1, 2, 3], "test": [3, 4, 5]}
-    mocker.patch('requests.post', return_value=response_200_with_job_id)
+    mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
     result_task = api_client.train_algorithm(algorithm_id, data)
     assert isinstance(result_task, Task)
     assert result_task.job_id == "s1o2m3e4-jobid"
@@ -349,7 +451,7 @@ def test_train_algorithm_with_client_error(mocker, api_client, response_400):
     api_client.connection.fail_on_error = True
     algorithm_id = "trainable-algorithm"
     data = {"data": [1, 2, 3], "test": [3, 4, 5]}
-    mocker.patch('requests.post', return_value=response_400)
+    mocker.patch('requests.Session.post', return_value=response_400)
 
     with pytest.raises(ClientError):
         api_client.train_algorithm(algorithm_id=algorithm_id, features=data, export_new_version=True)
@@ -358,7 +460,7 @@ def test_train_algorithm_with_client_error(mocker, api_client, response_400):
 def test_train_algorithm_with_server_error(mocker, api_client, response_500):
     algorithm_id = "trainable-algorithm"
     data = {"data": [1, 2, 3], "test": [3, 4, 5]}
-    mocker.patch('requests.post', return_value=response_500)
+    mocker.patch('requests.Session.post', return_value=response_500)
     mocker.patch('compredict.connection.Connection.handle_response', side_effect=ServerError)
 
     with pytest.raises(ServerError):
@@ -366,39 +468,264 @@ def test_train_algorithm_with_server_error(mocker, api_client, response_500):
 
 
 def test_generate_token(api_client, mocker, response_200_with_tokens_generated):
-    mocker.patch('requests.post', return_value=response_200_with_tokens_generated)
+    mocker.patch('requests.Session.post', return_value=response_200_with_tokens_generated)
     api_client.generate_token(username="someuser", password="andpassword")
     assert api_client.token == "sometokenvalue"
     assert api_client.refresh_token == "somerefreshtokenvalue"
 
 
 def test_generate_token_with_error(api_client, mocker, response_400_with_credentials_error):
-    mocker.patch('requests.post', return_value=response_400_with_credentials_error)
+    mocker.patch('requests.Session.post', return_value=response_400_with_credentials_error)
     with pytest.raises(ClientError) as excinfo:
         api_client.generate_token(username="user", password="somepass")
     assert 'errors' in str(excinfo.value)
 
 
 def test_refresh_token(api_client, mocker, response_200_with_refreshed_token):
-    mocker.patch('requests.post', return_value=response_200_with_refreshed_token)
+    mocker.patch('requests.Session.post', return_value=response_200_with_refreshed_token)
     api_client.generate_token_from_refresh_token('generate_token_from_refresh_token')
     assert api_client.token == 'refreshedtoken'
 
 
 def test_refresh_token_with_error(api_client, mocker, response_400_with_wrong_refresh_token):
-    mocker.patch('requests.post', return_value=response_400_with_wrong_refresh_token)
+    mocker.patch('requests.Session.post', return_value=response_400_with_wrong_refresh_token)
     with pytest.raises(ClientError) as excinfo:
         api_client.generate_token_from_refresh_token('token_to_refresh')
     assert 'errors' in str(excinfo.value)
 
 
 def test_verify_token(api_client, mocker, response_200_token_verified):
-    mocker.patch('requests.post', return_value=response_200_token_verified)
+    mocker.patch('requests.Session.post', return_value=response_200_token_verified)
     assert api_client.verify_token('sometoken')
 
 
 def test_verify_with_error(api_client, mocker, response_429_throttling_error):
-    mocker.patch('requests.post', return_value=response_429_throttling_error)
+    mocker.patch('requests.Session.post', return_value=response_429_throttling_error)
     with pytest.raises(ClientError) as excinfo:
         api_client.verify_token('someothertoken')
     assert 'error' in str(excinfo.value)
+
+
+def test_verify_token_locally(api_client, mocker, jwt_factory):
+    post = mocker.patch('requests.Session.post')
+    mocker.patch.object(api_client, 'token_validator', TokenValidator())
+
+    assert api_client.verify_token(jwt_factory())
+    with pytest.raises(ClientError):
+        api_client.verify_token(jwt_factory(expires_in=-1))
+    post.assert_not_called()
+
+
+def test_verify_token_falls_back_to_ai_core(api_client, mocker, jwt_factory, response_200_token_verified):
+    post = mocker.patch('requests.Session.post', return_value=response_200_token_verified)
+    mocker.patch.object(api_client, 'token_validator', TokenValidator())
+    token = jwt_factory(exp=None)
+
+    assert api_client.verify_token(token)
+    assert api_client.verify_token(token)
+    post.assert_called_once()
+
+
+def test_token_refreshed_ahead_of_expiry(api_client, mocker, jwt_factory, response_factory, response_200):
+    mocker.patch.object(api_client, 'token', jwt_factory(expires_in=10))
+    mocker.patch.object(api_client, 'refresh_token', jwt_factory(expires_in=3600))
+    api_client.connection.set_token(api_client.token)
+    new_token = jwt_factory(expires_in=300, jti="new")
+    refreshed = response_factory(200, {'access': new_token}, 'https://core.compredict.ai/api/v2/token/refresh/')
+    mocked_post = mocker.patch('requests.Session.post', return_value=refreshed)
+    mocked_get = mocker.patch('requests.Session.get', return_value=response_200)
+
+    api_client.get_task_results('12jffd')
+
+    assert mocked_post.call_count == 1
+    assert mocked_get.call_args.kwargs['headers']['Authorization'] == 'Bearer ' + new_token
+    assert api_client.token == new_token
+
+
+def test_failed_refresh_sends_request_with_token(api_client, mocker, jwt_factory, response_factory, response_200):
+    token = jwt_factory(expires_in=10)
+    mocker.patch.object(api_client, 'token', token)
+    mocker.patch.object(api_client, 'refresh_token', jwt_factory(expires_in=3600))
+    mocker.patch.object(api_client.connection, 'fail_on_error', False)
+    api_client.connection.set_token(token)
+    rejected = response_factory(401, {"error": "Token is invalid or expired"})
+    mocker.patch('requests.Session.post', return_value=rejected)
+    mocked_get = mocker.patch('requests.Session.get', side_effect=[response_200, rejected])
+
+    assert isinstance(api_client.get_task_results('12jffd'), Task)
+    assert mocked_get.call_args.kwargs['headers']['Authorization'] == 'Bearer ' + token
+    assert api_client.get_task_results('12jffd') is False
+    assert api_client.last_error.status_code == 401
+
+
+def test_token_not_refreshed_when_valid(api_client, mocker, jwt_factory, response_200):
+    mocker.patch.object(api_client, 'token', jwt_factory(expires_in=3600))
+    mocker.patch.object(api_client, 'refresh_token', jwt_factory(expires_in=7200))
+    mocked_post = mocker.patch('requests.Session.post')
+    mocker.patch('requests.Session.get', return_value=response_200)
+
+    api_client.get_task_results('12jffd')
+
+    assert not mocked_post.called
+
+
+def test_request_replayed_after_refresh_on_401(api_client, mocker, response_factory, response_200):
+    mocker.patch.object(api_client, 'token', 'sometoken')
+    mocker.patch.object(api_client, 'refresh_token', 'somerefreshtoken')
+    api_client.connection.set_token('sometoken')
+    unauthorized = response_factory(401, {"error": "Token is invalid or expired"})
+    mocked_get = mocker.patch('requests.Session.get', side_effect=[unauthorized, response_200])
+    refreshed = response_factory(200, {'access': 'refreshedtoken'}, 'https://core.compredict.ai/api/v2/token/refresh/')
+    mocked_post = mocker.patch('requests.Session.post', return_value=refreshed)
+
+    response = api_client.get_task_results('12jffd')
+
+    assert isinstance(response, Task)
+    assert mocked_get.call_count == 2
+    assert mocked_post.call_count == 1
+    assert api_client.connection.headers['Authorization'] == 'Bearer refreshedtoken'
+
+
+def test_refresh_on_401_is_single_flight(api_client, mocker, response_factory, response_200):
+    mocker.patch.object(api_client, 'token', 'expiredtoken')
+    mocker.patch.object(api_client, 'refresh_token', 'somerefreshtoken')
+    api_client.connection.set_token('expiredtoken')
+    unauthorized = response_factory(401, {"error": "Token is invalid or expired"})
+    barrier = threading.Barrier(64)
+
+    def get(address, headers=None, **kwargs):
+        return unauthorized if headers['Authorization'] == 'Bearer expiredtoken' else response_200
+
+    def refresh(*args, **kwargs):
+        time.sleep(0.05)
+        return response_factory(200, {'access': 'refreshedtoken'}, 'https://core.compredict.ai/api/v2/token/refresh')
+
+    def poll():
+        barrier.wait()
+        api_client.get_task_results('12jffd')
+
+    mocker.patch('requests.Session.get', side_effect=get)
+    mocked_post = mocker.patch('requests.Session.post', side_effect=refresh)
+
+    threads = [threading.Thread(target=poll) for _ in range(64)]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    assert mocked_post.call_count == 1
+    assert api_client.token == 'refreshedtoken'
+
+
+def test_run_versions(api_client, mocker, response_factory):
+    barrier = threading.Barrier(3, timeout=5)
+    sent = dict()
+
+    def post(address, data=None, files=None, **kwargs):
+        barrier.wait()
+        sent[data['version']] = files['features'][1].read()
+        return response_factory(200, {"predictions": [data['version']]}, address)
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    to_parquet = mocker.spy(DataFrame, 'to_parquet')
+    algorithm = Algorithm(client=api_client, id='algorithm', versions=[{'version': '1.0.0'}, {'version': '1.1.0'},
+                                                                       {'version': '2.0.0'}])
+
+    results = algorithm.run_versions(DataFrame({"a": [1, 2]}), evaluate=False)
+
+    assert to_parquet.call_count == 1
+    assert len(set(sent.values())) == 1
+    assert {version: result.predictions for version, result in results.items()} == \
+        {'1.0.0': ['1.0.0'], '1.1.0': ['1.1.0'], '2.0.0': ['2.0.0']}
+    assert set(results.latencies) == {'1.0.0', '1.1.0', '2.0.0'}
+    assert all(latency >= 0 for latency in results.latencies.values())
+
+
+def test_run_versions_streaming(api_client, mocker, response_200_with_job_id):
+    def post(address, data=None, **kwargs):
+        sent.append(b''.join(data))
+        return response_200_with_job_id
+
+    sent = []
+    mocker.patch('requests.Session.post', side_effect=post)
+    algorithm = Algorithm(client=api_client, id='algorithm', versions=[{'version': '1.0.0'}, {'version': '2.0.0'}])
+
+    results = algorithm.run_versions(DataFrame({"a": [1, 2]}), stream=True)
+
+    assert len(sent) == 2 and b'PAR1' in sent[0]
+    assert all(isinstance(task, Task) for task in results.values())
+
+
+def test_run_selected_versions(api_client, mocker, response_200_with_job_id):
+    post = mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+    algorithm = Algorithm(client=api_client, id='algorithm', versions=[{'version': '1.0.0'}, {'version': '2.0.0'}])
+
+    results = algorithm.run_versions({"a": [1, 2]}, versions=[algorithm.versions[1]])
+
+    assert list(results) == ['2.0.0']
+    assert isinstance(results['2.0.0'], Task)
+    assert post.call_args.kwargs['data']['version'] == '2.0.0'
+
+
+@pytest.fixture
+def metadata_client(api_client, mocker):
+    mocker.patch.object(api_client, 'metadata_cache', MetadataCache(ttl=60, ttls={'versions': 0}))
+    return api_client
+
+
+def test_metadata_cached_and_shared(metadata_client, mocker, response_200_with_algorithm):
+    mocked_get = mocker.patch('requests.Session.get', return_value=response_200_with_algorithm)
+
+    first = metadata_client.get_algorithm('mass_estimation')
+    second = metadata_client.get_algorithm('mass_estimation')
+
+    assert first is second
+    assert mocked_get.call_count == 1
+
+
+def test_metadata_revalidated_with_etag(metadata_client, mocker, response_factory):
+    versions = response_factory(200, [{"version": "1.0.0"}], 'https://core.compredict.ai/api/v2/algorithms/a/versions')
+    versions.headers['ETag'] = '"v1"'
+    not_modified = response_factory(304, None, versions.url)
+    mocked_get = mocker.patch('requests.Session.get', side_effect=[versions, not_modified])
+
+    first = metadata_client.get_algorithm_versions('a')
+    second = metadata_client.get_algorithm_versions('a')
+
+    assert first is second
+    assert first[0].algorithm_id == 'a'
+    assert 'If-None-Match' not in mocked_get.call_args_list[0].kwargs['headers']
+    assert mocked_get.call_args_list[1].kwargs['headers']['If-None-Match'] == '"v1"'
+
+
+def test_metadata_replaced_when_modified(metadata_client, mocker, response_factory):
+    url = 'https://core.compredict.ai/api/v2/algorithms/a/versions'
+    first_response = response_factory(200, [{"version": "1.0.0"}], url)
+    first_response.headers['Last-Modified'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    mocked_get = mocker.patch('requests.Session.get',
+                              side_effect=[first_response, response_factory(200, [{"version": "2.0.0"}], url)])
+
+    metadata_client.get_algorithm_versions('a')
+    versions = metadata_client.get_algorithm_versions('a')
+
+    assert mocked_get.call_args.kwargs['headers']['If-Modified-Since'] == 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert versions[0].version == '2.0.0'
+
+
+def test_metadata_invalidation(metadata_client, mocker, response_200_with_algorithm):
+    mocked_get = mocker.patch('requests.Session.get', return_value=response_200_with_algorithm)
+
+    first = metadata_client.get_algorithm('mass_estimation')
+    metadata_client.get_algorithm('other')
+    metadata_client.invalidate_metadata('mass_estimation')
+    second = metadata_client.get_algorithm('mass_estimation')
+    metadata_client.get_algorithm('other')
+
+    assert first is not second
+    assert mocked_get.call_count == 3
+
+
+def test_metadata_errors_not_cached(metadata_client, mocker, response_400, response_200_with_algorithm):
+    mocker.patch.object(metadata_client.connection, 'fail_on_error', False)
+    mocker.patch('requests.Session.get', side_effect=[response_400, response_200_with_algorithm])
+
+    assert metadata_client.get_algorithm('mass_estimation') is False
+    assert isinstance(metadata_client.get_algorithm('mass_estimation'), Algorithm)
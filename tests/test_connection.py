@@ -1,9 +1,15 @@
+import io
 import pathlib
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
+import requests
 
 from compredict.connection import Connection
 from compredict.exceptions import ClientError, ServerError
+from compredict.utils.retry import RetryPolicy
 
 
 def test_set_token(connection):
@@ -41,6 +47,73 @@ def test_handle_response_with_graph(connection, response_200_with_url, mocker):
     assert mocked_wrapper.called is True
 
 
+def test_handle_response_with_graph_writes_content(connection, response_200_with_url):
+    file = connection.handle_response(response_200_with_url, True)
+
+    assert file.name.endswith('.png')
+    assert file.read() == response_200_with_url.content
+    file.close()
+
+
+GRAPH_SIZE = 32 * 1024 * 1024
+
+
+class GraphHandler(BaseHTTPRequestHandler):
+    """Serves a graph of GRAPH_SIZE bytes, written in blocks so the server itself stays small in memory."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(GRAPH_SIZE))
+        self.end_headers()
+        block = bytes(range(256)) * 256
+        for _ in range(GRAPH_SIZE // len(block)):
+            self.wfile.write(block)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def graph_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GraphHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}/api/v1'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def assert_graph(file):
+    block = bytes(range(256)) * 256
+    size = 0
+    for chunk in iter(lambda: file.read(len(block)), b''):
+        assert chunk == block[:len(chunk)]
+        size += len(chunk)
+    assert size == GRAPH_SIZE
+
+
+@pytest.mark.parametrize('download', ['GET', 'GET_FILE'])
+def test_large_graph_is_streamed(graph_server, tmp_path, download):
+    connection = Connection(url=graph_server)
+    endpoint = '/algorithms/56/graph?type=input'
+    tracemalloc.start()
+    try:
+        if download == 'GET':
+            file = connection.GET(endpoint)
+        else:
+            file = open(tmp_path / 'graph.png', 'w+b')
+            assert connection.GET_FILE(endpoint, file) == '.png'
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    with file:
+        file.seek(0)
+        assert_graph(file)
+    assert peak < GRAPH_SIZE // 8
+
+
 def test_handle_successful_response(connection, response_200):
     actual_response = connection.handle_response(response_200, False)
     expected_response = {
@@ -53,7 +126,7 @@ def test_handle_successful_response(connection, response_200):
 def test_successful_POST(connection, response_200, mocker):
     endpoint = "/some/additional/endpoint"
     data = {"data": "here we have some data"}
-    mocker.patch('requests.post', return_value=response_200)
+    mocker.patch('requests.Session.post', return_value=response_200)
     actual_response = connection.POST(endpoint=endpoint, data=data)
 
     expected_response = {
@@ -65,21 +138,19 @@ def test_successful_POST(connection, response_200, mocker):
 
 def test_successful_POST_with_file(connection, response_200, mocker, data):
     file = pathlib.Path(__file__).parent.resolve().joinpath('example.json')
-    mocker.patch('requests.post', return_value=response_200)
-    content_type = "json/apllication"
-    connection.headers["Content-Type"] = content_type
+    mocked_post = mocker.patch('requests.Session.post', return_value=response_200)
     actual_result = connection.POST(endpoint="not/as/important/endpoint/here", data=data,
                                     files=file)
     expected = {'error': 'False', 'result': 'some result'}
     assert actual_result == expected
-    with pytest.raises(KeyError):
-        connection.headers['Content-Type']
+    assert 'Content-Type' not in mocked_post.call_args.kwargs['headers']
+    assert 'Content-Type' not in connection.headers
 
 
 def test_unsuccessful_POST(connection, response_400, mocker):
     endpoint = "/some/additional/endpoint"
     data = {"data": "not enough data"}
-    mocker.patch('requests.post', return_value=response_400)
+    mocker.patch('requests.Session.post', return_value=response_400)
     actual_response = connection.POST(endpoint=endpoint, data=data)
 
     assert actual_response is False
@@ -88,7 +159,7 @@ def test_unsuccessful_POST(connection, response_400, mocker):
 def test_successful_GET(connection, response_200, mocker):
     endpoint = "some/additional/endpoint/get"
 
-    mocker.patch('requests.get', return_value=response_200)
+    mocker.patch('requests.Session.get', return_value=response_200)
 
     expected_response = {
         "error": "False",
@@ -102,7 +173,7 @@ def test_successful_GET(connection, response_200, mocker):
 def test_unsuccessful_GET(connection, response_500, mocker):
     endpoint = "some/additional/endpoint/get"
 
-    mocker.patch('requests.get', return_value=response_500)
+    mocker.patch('requests.Session.get', return_value=response_500)
 
     actual_response = connection.GET(endpoint=endpoint)
 
@@ -119,7 +190,7 @@ def test_create_headers_with_auth():
 
 def test_successful_DELETE(connection, response_202_cancelled_task, mocker, successful_cancel_task_response):
     endpoint = 'api/v1/algorithms/tasks/2323234sdfsdf'
-    mocker.patch('requests.delete', return_value=response_202_cancelled_task)
+    mocker.patch('requests.Session.delete', return_value=response_202_cancelled_task)
     expected = successful_cancel_task_response
     actual = connection.DELETE(endpoint=endpoint)
     assert actual == expected
@@ -127,13 +198,152 @@ def test_successful_DELETE(connection, response_202_cancelled_task, mocker, succ
 
 def test_usuccessful_DELETE(connection, response_404_task_not_found, mocker):
     endpoint = 'api/v1/algorithms/tasks/2323dfsdf'
-    mocker.patch('requests.delete', return_value=response_404_task_not_found)
+    mocker.patch('requests.Session.delete', return_value=response_404_task_not_found)
     actual = connection.DELETE(endpoint=endpoint)
     assert actual is False
 
 
 def test_unsuccessful_GET_with_502(mocker, connection, response_502_with_html):
     endpoint = 'api/v1/algorithms/'
-    mocker.patch('requests.get', return_value=response_502_with_html)
+    mocker.patch('requests.Session.get', return_value=response_502_with_html)
     actual_response = connection.GET(endpoint=endpoint)
     assert actual_response is False
+
+
+def test_connection_pool_configuration():
+    connection = Connection(url="not/of/much/importance/here", pool_connections=3, pool_maxsize=32)
+    adapter = connection.session.get_adapter('https://core.compredict.ai/api/v2')
+
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 32
+    assert connection.session.get_adapter('http://localhost') is adapter
+
+
+def test_requests_reuse_session(connection, response_200, mocker):
+    mocked_get = mocker.patch('requests.Session.get', return_value=response_200)
+    session = connection.session
+
+    connection.GET(endpoint="first/endpoint")
+    connection.GET(endpoint="second/endpoint")
+
+    assert mocked_get.call_count == 2
+    assert connection.session is session
+
+
+def test_GET_retried_with_backoff(response_factory, successful_content, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", retry=RetryPolicy(max_attempts=3))
+    unavailable = response_factory(503, {"error": "Service unavailable"})
+    success = response_factory(200, successful_content, 'https://core.compredict.ai/api/v1/algorithms/56')
+    mocked_get = mocker.patch('requests.Session.get', side_effect=[unavailable, unavailable, success])
+    mocked_sleep = mocker.patch('compredict.connection.sleep')
+
+    actual_response = connection.GET(endpoint="algorithms/56")
+
+    assert actual_response == successful_content
+    assert mocked_get.call_count == 3
+    assert mocked_sleep.call_count == 2
+    assert connection.last_request.retries == 2
+    assert connection.last_request.retry_sleep == sum(call.args[0] for call in mocked_sleep.call_args_list)
+
+
+def test_GET_retry_gives_up_after_max_attempts(response_500, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", retry=RetryPolicy(max_attempts=2))
+    mocked_get = mocker.patch('requests.Session.get', return_value=response_500)
+    mocker.patch('compredict.connection.sleep')
+
+    assert connection.GET(endpoint="algorithms") is False
+    assert mocked_get.call_count == 2
+    assert connection.last_request.retries == 1
+
+
+def test_GET_retry_honours_retry_after(response_factory, response_200, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", retry=RetryPolicy())
+    throttled = response_factory(429, {"error": "Request was throttled."})
+    throttled.headers['Retry-After'] = '6'
+    mocker.patch('requests.Session.get', side_effect=[throttled, response_200])
+    mocked_sleep = mocker.patch('compredict.connection.sleep')
+
+    connection.GET(endpoint="algorithms")
+
+    mocked_sleep.assert_called_once_with(6.0)
+    assert connection.last_request.retry_sleep == 6.0
+
+
+def test_GET_retried_on_connection_error(response_200, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", retry=RetryPolicy())
+    mocker.patch('requests.Session.get', side_effect=[requests.ConnectionError(), response_200])
+    mocker.patch('compredict.connection.sleep')
+
+    assert connection.GET(endpoint="algorithms") == {"error": "False", "result": "some result"}
+
+
+def test_POST_not_retried_without_opt_in(response_500, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", retry=RetryPolicy())
+    mocked_post = mocker.patch('requests.Session.post', return_value=response_500)
+
+    connection.POST(endpoint="algorithms/56/predict", data={})
+
+    assert mocked_post.call_count == 1
+    assert connection.last_request.retries == 0
+
+
+def test_POST_retried_with_opt_in_and_files_rewound(response_500, response_200, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", retry=RetryPolicy(methods=('GET', 'POST')))
+    uploaded = []
+
+    def post(address, files=None, **kwargs):
+        uploaded.append(files["features"][1].read())
+        return response_500 if len(uploaded) == 1 else response_200
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    mocker.patch('compredict.connection.sleep')
+
+    connection.POST(endpoint="algorithms/56/predict", data={},
+                    files={"features": ("features.parquet", io.BytesIO(b"PAR1"), "application/parquet")})
+
+    assert uploaded == [b"PAR1", b"PAR1"]
+
+
+def test_headers_copied_for_each_request(response_200, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/", token="sometoken")
+    sent = []
+    barrier = threading.Barrier(8)
+
+    def send(address, headers=None, **kwargs):
+        barrier.wait()
+        sent.append((address, dict(headers)))
+        return response_200
+
+    mocker.patch('requests.Session.post', side_effect=send)
+    mocker.patch('requests.Session.get', side_effect=send)
+    threads = [threading.Thread(target=connection.POST, args=("/files", {}, {"f": ("f", None, None)}))
+               for _ in range(4)] + [threading.Thread(target=connection.GET, args=("/json",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sent) == 8
+    for address, headers in sent:
+        assert headers.get('Content-Type') == (None if address.endswith('/files') else 'application/json')
+        assert headers['Authorization'] == 'Bearer sometoken'
+    assert connection.headers == {'Accept': 'application/json', 'Authorization': 'Bearer sometoken'}
+
+
+def test_last_request_and_error_per_thread(response_200, response_400, mocker):
+    connection = Connection(url="https://core.compredict.ai/api/")
+    mocker.patch('requests.Session.get', return_value=response_400)
+    connection.GET("/failing")
+    results = dict()
+
+    def other_thread():
+        results['error'] = connection.last_error
+        results['request'] = connection.last_request
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+
+    assert connection.last_error
+    assert connection.last_request is response_400
+    assert results == {'error': False, 'request': None}
@@ -0,0 +1,121 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+from requests import Response
+
+from compredict.resources import Result, Task
+from compredict.utils.deduplication import deduplicate_rows
+from compredict.utils.submission import SubmissionPool
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"speed": [0.0, 10.0, 0.0, 0.0, 20.0, 10.0], "gear": ["n", "3", "n", "n", "5", "3"]},
+                     index=[10, 11, 12, 13, 14, 15])
+
+
+def test_deduplicate_rows(features):
+    unique, deduplication = deduplicate_rows(features)
+
+    assert_frame_equal(unique, features.loc[[10, 11, 14]])
+    assert deduplication.inverse.tolist() == [0, 1, 0, 0, 2, 1]
+    assert (deduplication.rows, deduplication.unique_rows, deduplication.ratio) == (6, 3, 2.0)
+    assert deduplication.index.equals(features.index)
+
+
+def test_deduplicate_rows_with_nan_and_dict():
+    unique, deduplication = deduplicate_rows({"a": [np.nan, 1.0, np.nan], "b": [1, 1, 1]})
+
+    assert len(unique) == 2
+    assert deduplication.inverse.tolist() == [0, 1, 0]
+
+
+def test_deduplicate_rows_unhashable():
+    features = DataFrame({"a": [[1], [1]]})
+
+    unique, deduplication = deduplicate_rows(features)
+
+    assert unique is features
+    assert deduplication.ratio == 1.0
+
+
+def test_scatter(features):
+    _, deduplication = deduplicate_rows(features)
+
+    assert deduplication.scatter([1, 2, 3]) == [1, 2, 1, 1, 3, 2]
+    assert deduplication.scatter({"mass": [[1, 1], [2, 2], [3, 3]], "mae": 0.1}) == {
+        "mass": [[1, 1], [2, 2], [1, 1], [1, 1], [3, 3], [2, 2]], "mae": 0.1}
+
+
+def test_run_algorithm_deduplicate(api_client, mocker, response_factory, features):
+    uploaded = []
+
+    def post(address, files=None, **kwargs):
+        uploaded.append(pd.read_parquet(io.BytesIO(files['features'][1].read())))
+        return response_factory(200, {"predictions": {"mass": [1, 2, 3]}, "evaluations": {"mae": 0.5}}, address)
+
+    mocker.patch('requests.Session.post', side_effect=post)
+
+    result = api_client.run_algorithm('algorithm', features, deduplicate=True)
+
+    assert isinstance(result, Result)
+    assert len(uploaded[0]) == 3
+    assert result.predictions == {"mass": [1, 2, 1, 1, 3, 2]}
+    assert result.evaluations == {"mae": 0.5}
+    assert result.deduplication.ratio == 2.0
+
+
+def test_task_deduplicated_results(api_client, mocker, response_200_with_job_id, features):
+    mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+    finished = Task(client=api_client, job_id="s1o2m3e4-jobid", status=Task.STATUS_FINISHED, success=True,
+                    predictions=[1, 2, 3])
+    mocker.patch.object(api_client, 'get_task_results', return_value=finished)
+
+    task = api_client.run_algorithm('algorithm', features, deduplicate=True)
+    task.update()
+
+    assert task.predictions == [1, 2, 1, 1, 3, 2]
+    assert task.deduplication.rows == 6
+
+
+def test_run_algorithm_deduplicate_path(api_client, features_path):
+    with pytest.raises(ValueError):
+        api_client.run_algorithm('algorithm', features_path, deduplicate=True)
+
+
+def predicting_speed(address, files=None, **kwargs):
+    rows = pd.read_parquet(io.BytesIO(files['features'][1].read()))
+    response = Response()
+    response.url, response.status_code = address, 200
+    response._content = json.dumps({"predictions": rows['speed'].tolist()}).encode()
+    return response
+
+
+def test_submit_deduplicate(api_client, mocker, features):
+    post = mocker.patch('requests.Session.post', side_effect=predicting_speed)
+
+    with SubmissionPool(api_client, serialization_workers=1) as pool:
+        result = pool.submit('algorithm', features, deduplicate=True).result(timeout=30)
+        with pytest.raises(ValueError):
+            pool.submit('algorithm', b'PAR1', deduplicate=True)
+
+    assert post.call_count == 1
+    assert result.predictions == features['speed'].tolist()
+    assert result.deduplication.ratio == 2.0
+    assert result.to_pandas().index.tolist() == features.index.tolist()
+
+
+def test_run_algorithm_chunked_deduplicate(api_client, mocker, features):
+    mocker.patch('requests.Session.post', side_effect=predicting_speed)
+    pool = SubmissionPool(api_client, serialization_workers=1)
+    mocker.patch.object(api_client, '_submission_pool', pool)
+
+    result = api_client.run_algorithm_chunked('algorithm', features, chunk_size=3, deduplicate=True)
+    pool.shutdown()
+
+    assert result.predictions == features['speed'].tolist()
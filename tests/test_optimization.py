@@ -0,0 +1,117 @@
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from compredict.utils.metadata_cache import MetadataCache
+from compredict.utils.optimization import FeatureOptimizer, template_columns
+from compredict.utils.submission import SubmissionPool
+
+TEMPLATE = [{"name": "speed", "type": "float", "mandatory": True},
+            {"name": "gear", "type": "str", "mandatory": True},
+            {"name": "count", "type": "int", "mandatory": False}]
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"speed": [0.5, 1.25, np.nan, 3.0], "gear": ["n", "3", "n", "n"], "count": [1, 2, 300, 4],
+                      "comment": ["a", "b", "c", "d"]})
+
+
+def test_template_columns():
+    template = json.loads((Path(__file__).resolve().parent / "media/example.json").read_text())
+
+    assert list(template_columns(template)) == ["distance"]
+    assert list(template_columns(TEMPLATE)) == ["speed", "gear", "count"]
+    assert template_columns(None) == {}
+
+
+def test_optimize(features):
+    optimized, optimization = FeatureOptimizer().optimize(features, TEMPLATE)
+
+    assert list(optimized.columns) == ["speed", "gear", "count"]
+    assert optimization.dropped_columns == ["comment"]
+    assert optimization.dtypes == {"speed": ("float64", "float32"), "gear": ("object", "category"),
+                                   "count": ("int64", "int16")}
+    assert optimization.memory_saved > 0
+    assert features["count"].dtype == np.int64
+    assert optimized["speed"].astype(np.float64).equals(features["speed"])
+
+
+def test_optimize_keeps_precision_and_columns_without_template():
+    features = {"x": [0.1, 0.2], "y": ["a", "b"]}
+
+    optimized, optimization = FeatureOptimizer().optimize(features)
+
+    assert list(optimized.columns) == ["x", "y"]
+    assert optimization.dtypes == {}
+    assert optimization.dropped_columns == []
+
+
+def test_run_algorithm_optimize(api_client, mocker, response_factory, features):
+    algorithm = {"id": "algorithm", "name": "Algorithm",
+                 "versions": [{"version": "1.0.0", "features_format": TEMPLATE}]}
+    get = mocker.patch('requests.Session.get',
+                       return_value=response_factory(200, algorithm, 'https://core.compredict.ai/api/v1/algorithms/a'))
+    uploaded = []
+
+    def post(address, files=None, **kwargs):
+        uploaded.append(pd.read_parquet(io.BytesIO(files['features'][1].read())))
+        return response_factory(200, {"predictions": [1, 2, 3, 4]}, address)
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    mocker.patch.object(api_client, 'metadata_cache', MetadataCache())
+
+    for _ in range(2):
+        result = api_client.run_algorithm('algorithm', features, optimize=True)
+
+    assert get.call_count == 1
+    assert list(uploaded[0].columns) == ["speed", "gear", "count"]
+    assert uploaded[0]["count"].dtype == np.int16
+    assert result.optimization.dropped_columns == ["comment"]
+
+
+def test_run_algorithm_optimize_without_metadata_cache(api_client, mocker, response_factory, features):
+    algorithm = {"id": "optimized", "versions": [{"version": "1.0.0", "features_format": TEMPLATE}]}
+    get = mocker.patch('requests.Session.get', return_value=response_factory(
+        200, algorithm, 'https://core.compredict.ai/api/v1/algorithms/optimized'))
+    mocker.patch('requests.Session.post', return_value=response_factory(
+        200, {"predictions": [1, 2, 3, 4]}, 'https://core.compredict.ai/api/v1/algorithms/optimized/predict'))
+
+    for _ in range(3):
+        result = api_client.run_algorithm('optimized', features, optimize=True)
+    api_client.invalidate_metadata('optimized')
+
+    assert get.call_count == 1
+    assert result.optimization.dropped_columns == ["comment"]
+
+
+def test_run_algorithm_optimize_path(api_client, features_path):
+    with pytest.raises(ValueError):
+        api_client.run_algorithm('algorithm', features_path, optimize=True)
+
+
+def test_submit_optimize(api_client, mocker, response_factory, features):
+    algorithm = {"id": "algorithm", "name": "Algorithm",
+                 "versions": [{"version": "1.0.0", "features_format": TEMPLATE}]}
+    mocker.patch('requests.Session.get',
+                 return_value=response_factory(200, algorithm, 'https://core.compredict.ai/api/v1/algorithms/a'))
+    uploaded = []
+
+    def post(address, files=None, **kwargs):
+        uploaded.append(pd.read_parquet(io.BytesIO(files['features'][1].read())))
+        return response_factory(200, {"predictions": [1, 2, 3, 4]}, address)
+
+    mocker.patch('requests.Session.post', side_effect=post)
+
+    with SubmissionPool(api_client, serialization_workers=1) as pool:
+        result = pool.submit('algorithm', features, optimize=True).result(timeout=30)
+        with pytest.raises(ValueError):
+            pool.submit('algorithm', b'PAR1', optimize=True)
+
+    assert list(uploaded[0].columns) == ["speed", "gear", "count"]
+    assert result.optimization.dropped_columns == ["comment"]
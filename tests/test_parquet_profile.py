@@ -0,0 +1,131 @@
+import io
+import pickle
+from datetime import timedelta
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+from pandas import DataFrame
+
+from compredict.utils.parquet_profile import ParquetProfile
+from compredict.utils.submission import SubmissionPool
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"speed": np.repeat(np.arange(50, dtype=np.float64), 200), "gear": ["n", "3"] * 5000})
+
+
+def read_metadata(content: bytes):
+    return pq.ParquetFile(io.BytesIO(content)).metadata
+
+
+def column_codec(metadata) -> str:
+    return metadata.row_group(0).column(0).compression
+
+
+def test_write(features):
+    buffer = io.BytesIO()
+
+    ParquetProfile(compression='zstd', compression_level=9, row_group_size=4000).write(features, buffer)
+
+    metadata = read_metadata(buffer.getvalue())
+    assert metadata.num_row_groups == 3
+    assert column_codec(metadata) == 'ZSTD'
+    assert pq.read_table(buffer).to_pandas().equals(features)
+
+
+@pytest.mark.parametrize('bandwidth, measure', [(1.0, 1), (1e15, 0)])
+def test_select(features, bandwidth, measure):
+    profile = ParquetProfile(compression='auto', sample_rows=1000, bandwidth=bandwidth)
+
+    resolved = profile.resolve(features)
+
+    selection = profile.last_selection
+    assert set(selection) == {'snappy', 'zstd', 'gzip', 'none'}
+    assert resolved.compression == min(selection, key=lambda codec: selection[codec][measure])
+    assert profile.is_auto and not resolved.is_auto
+    assert selection['none'][1] > selection['zstd'][1]
+
+
+def test_resolve_without_sample():
+    profile = ParquetProfile(compression='auto', candidates=('zstd', 'none'))
+
+    assert profile.resolve(iter([])).compression == 'zstd'
+
+
+def test_observe():
+    profile = ParquetProfile()
+    profile.observe(1000, 1.0)
+    profile.observe(2000, 1.0)
+    profile.observe(1000, 0)
+
+    assert profile.get_bandwidth() == pytest.approx(0.3 * 2000 + 0.7 * 1000)
+
+
+def test_pickle():
+    profile = pickle.loads(pickle.dumps(ParquetProfile(compression='gzip', compression_level=1)))
+
+    assert profile.writer_options() == dict(compression='gzip', compression_level=1, use_dictionary=True)
+    profile.observe(10, 1.0)
+
+
+def uploads(mocker, response):
+    uploaded = []
+
+    def post(address, data=None, files=None, **kwargs):
+        uploaded.append((data, files['features'][1].read()))
+        return response
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    return uploaded
+
+
+def test_run_algorithm_auto(api_client, mocker, response_200, features):
+    uploaded = uploads(mocker, response_200)
+
+    api_client.run_algorithm('algorithm', features, compression='auto', parameters={"km": 1})
+
+    data, content = uploaded[0]
+    selection = api_client._auto_parquet_profile.last_selection
+    selected = min(selection, key=lambda codec: selection[codec][2])
+    assert data['compression'] is None
+    assert column_codec(read_metadata(content)) == ('UNCOMPRESSED' if selected == 'none' else selected.upper())
+
+
+def test_client_parquet_profile(api_client, mocker, response_200, features):
+    uploaded = uploads(mocker, response_200)
+    mocker.patch.object(api_client, 'parquet_profile', ParquetProfile(compression='gzip', row_group_size=5000))
+
+    api_client.run_algorithm('algorithm', features)
+    api_client.run_algorithm('algorithm', features, compression='snappy')
+
+    assert read_metadata(uploaded[0][1]).num_row_groups == 2
+    assert column_codec(read_metadata(uploaded[0][1])) == 'GZIP'
+    assert column_codec(read_metadata(uploaded[1][1])) == 'SNAPPY'
+    assert uploaded[1][0]['compression'] == 'snappy'
+
+
+def test_client_does_not_observe_response_time(api_client, mocker, response_factory, successful_content,
+                                               features_path, features):
+    response = response_factory(200, successful_content, 'https://core.compredict.ai/api/v1/algorithms/56')
+    response.elapsed = timedelta(seconds=0.5)
+    post = mocker.patch('requests.Session.post', return_value=response)
+    profile = ParquetProfile()
+    mocker.patch.object(api_client, 'parquet_profile', profile)
+
+    api_client.run_algorithm('algorithm', features_path)
+    api_client.run_algorithm('algorithm', features_path, compression='auto')
+    api_client.run_algorithm('algorithm', features)
+
+    assert post.call_count == 3
+    assert profile.observed_bandwidth is None
+
+
+def test_submit_with_profile(api_client, mocker, response_200, features):
+    uploaded = uploads(mocker, response_200)
+
+    with SubmissionPool(api_client, serialization_workers=1) as pool:
+        pool.submit('algorithm', features, compression=ParquetProfile(compression='zstd')).result(timeout=30)
+
+    assert column_codec(read_metadata(uploaded[0][1])) == 'ZSTD'
@@ -0,0 +1,147 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from compredict.resources import Result, Task
+from compredict.utils.polling import PollingPolicy, TaskGroup, as_completed
+
+
+@pytest.fixture
+def fake_tasks(api_client, mocker):
+    """Tasks finishing after the given number of polls, keyed by job_id."""
+    polls = Counter()
+    finish_after = dict()
+    lock = threading.Lock()
+
+    def get_task_results(job_id):
+        with lock:
+            polls[job_id] += 1
+            status = Task.STATUS_FINISHED if polls[job_id] >= finish_after[job_id] else Task.STATUS_PROGRESS
+        return Task(client=api_client, job_id=job_id, status=status, success=True, predictions=[job_id])
+
+    def create(job_id, after):
+        finish_after[job_id] = after
+        return Task(client=api_client, job_id=job_id, status=Task.STATUS_PENDING)
+
+    mocker.patch.object(api_client, 'get_task_results', side_effect=get_task_results)
+    create.polls = polls
+    return create
+
+
+def test_polling_policy_intervals():
+    policy = PollingPolicy(initial_interval=1, max_interval=5, factor=2)
+
+    assert [policy.get_interval(poll) for poll in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_task_wait(fake_tasks, mocker):
+    mocked_sleep = mocker.patch('compredict.resources.resources.sleep')
+    task = fake_tasks('job', after=4)
+
+    assert task.wait(policy=PollingPolicy(initial_interval=1, factor=2)) is task
+
+    assert task.status == Task.STATUS_FINISHED
+    assert task.predictions == ['job']
+    assert [call.args[0] for call in mocked_sleep.call_args_list] == [1, 2, 4, 8]
+
+
+@pytest.fixture
+def fake_clock(mocker):
+    """Clock of the polling, advanced by the mocked sleep."""
+    clock = [0.0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    mocker.patch('compredict.resources.resources.monotonic', side_effect=lambda: clock[0])
+    mocker.patch('compredict.utils.polling.monotonic', side_effect=lambda: clock[0])
+    return mocker.patch('compredict.resources.resources.sleep', side_effect=sleep)
+
+
+def test_task_wait_timeout(fake_tasks, fake_clock):
+    task = fake_tasks('job', after=100)
+
+    with pytest.raises(TimeoutError):
+        task.wait(timeout=2.5, policy=PollingPolicy(initial_interval=1, factor=1))
+    assert [call.args[0] for call in fake_clock.call_args_list] == [1, 1, 0.5]
+    assert fake_tasks.polls['job'] == 3
+
+
+def test_task_wait_polls_at_timeout(fake_tasks, fake_clock):
+    task = fake_tasks('job', after=2)
+
+    assert task.wait(timeout=1.5, policy=PollingPolicy(initial_interval=1, factor=1)) is task
+    assert task.is_done()
+    assert [call.args[0] for call in fake_clock.call_args_list] == [1, 0.5]
+
+
+def test_task_wait_when_done(api_client):
+    task = Task(client=api_client, job_id='job', status=Task.STATUS_CANCELED)
+
+    assert task.wait(timeout=0) is task
+
+
+def test_as_completed_yields_in_finishing_order(fake_tasks):
+    tasks = [fake_tasks(f'job{i}', after=after) for i, after in enumerate([3, 1, 2])]
+    policy = PollingPolicy(initial_interval=0.01, factor=1)
+
+    finished = [task.job_id for task in as_completed(tasks, timeout=5, policy=policy)]
+
+    assert finished == ['job1', 'job2', 'job0']
+    assert fake_tasks.polls == {'job0': 3, 'job1': 1, 'job2': 2}
+
+
+def test_as_completed_bounded_concurrency(fake_tasks, api_client, mocker):
+    tasks = [fake_tasks(f'job{i}', after=2) for i in range(50)]
+    get_task_results = api_client.get_task_results.side_effect
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def counting(job_id):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        try:
+            return get_task_results(job_id)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    mocker.patch.object(api_client, 'get_task_results', side_effect=counting)
+
+    finished = list(as_completed(tasks, timeout=5, policy=PollingPolicy(initial_interval=0.001), max_workers=4))
+
+    assert len(finished) == 50
+    assert peak[0] <= 4
+    assert sum(fake_tasks.polls.values()) == 100
+
+
+def test_as_completed_timeout(fake_tasks):
+    tasks = [fake_tasks('fast', after=1), fake_tasks('slow', after=1000)]
+
+    finished = []
+    with pytest.raises(TimeoutError):
+        for task in as_completed(tasks, timeout=0.2, policy=PollingPolicy(initial_interval=0.01, max_interval=0.05)):
+            finished.append(task.job_id)
+
+    assert finished == ['fast']
+
+
+def test_task_group_wait(fake_tasks, api_client):
+    group = TaskGroup(policy=PollingPolicy(initial_interval=0.01))
+    group.add(fake_tasks('first', after=1))
+    group.add(Task(client=api_client, job_id='done', status=Task.STATUS_FINISHED))
+
+    tasks = group.wait(timeout=5)
+
+    assert len(group) == 2
+    assert all(task.is_done() for task in tasks)
+    assert fake_tasks.polls == {'first': 1}
+
+
+def test_task_group_with_result(fake_tasks, api_client):
+    result = Result(client=api_client, predictions=[1])
+    group = TaskGroup([fake_tasks('task', after=1), result], policy=PollingPolicy(initial_interval=0.01))
+
+    assert list(group.as_completed(timeout=5))[0] is result
@@ -0,0 +1,66 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+from pandas import DataFrame, Index
+
+from compredict.resources.resources import Result, Task
+from compredict.utils.predictions import to_columns
+
+
+def test_to_columns():
+    assert list(to_columns([1, None, 3])["predictions"]) == pytest.approx([1, np.nan, 3], nan_ok=True)
+    columns = to_columns({"mass": [1, 2], "mae": 0.5, "load": {"max": [3, 4]}})
+    assert {name: column.tolist() for name, column in columns.items()} == \
+        {"mass": [1, 2], "mae": [0.5, 0.5], "load.max": [3, 4]}
+    assert {name: column.tolist() for name, column in to_columns([[1, 2], [3, 4]], "mass").items()} == \
+        {"mass_0": [1, 3], "mass_1": [2, 4]}
+    assert {name: column.tolist() for name, column in to_columns([{"a": 1}, {"a": 2, "b": "x"}]).items()} == \
+        {"a": [1, 2], "b": [None, "x"]}
+    assert to_columns(None) == {}
+
+
+def test_result_conversions(api_client):
+    result = Result(client=api_client, predictions={"mass": [1.5, 2.5, None], "label": ["a", "b", "c"]},
+                    evaluations={"mae": 0.5}, features_index=Index([10, 20, 30], name="row"))
+
+    frame = result.to_pandas()
+    assert list(frame.columns) == ["mass", "label"]
+    assert frame.index.tolist() == [10, 20, 30]
+    assert frame["mass"].dtype == np.float64
+    assert result.to_pandas("evaluations").to_dict("list") == {"mae": [0.5]}
+
+    table = result.to_arrow()
+    assert table.column_names == ["row", "mass", "label"]
+    assert table.column("mass").null_count == 1
+    assert result.to_arrow(index=False).schema.field("mass").type == pa.float64()
+
+    assert result.to_numpy("evaluations").tolist() == [0.5]
+    assert result.to_numpy().shape == (3, 2)
+    with pytest.raises(ValueError):
+        result.to_pandas("features")
+
+
+def test_run_algorithm_keeps_features_index(api_client, mocker, response_factory):
+    features = DataFrame({"a": [1, 2, 1, 3]}, index=Index(["w", "x", "y", "z"]))
+    mocker.patch('requests.Session.post', return_value=response_factory(
+        200, {"predictions": [5, 6, 7]}, 'https://core.compredict.ai/api/v1/algorithms/algorithm/predict'))
+
+    result = api_client.run_algorithm('algorithm', features, deduplicate=True)
+
+    assert result.to_pandas()["predictions"].to_dict() == {"w": 5, "x": 6, "y": 5, "z": 7}
+
+
+def test_task_conversions_after_update(api_client, mocker, response_200_with_job_id, data):
+    mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+    finished = Task(client=api_client, job_id="s1o2m3e4-jobid", status=Task.STATUS_FINISHED, success=True,
+                    predictions=[[1, 2], [3, 4], [5, 6]])
+    mocker.patch.object(api_client, 'get_task_results', return_value=finished)
+
+    task = api_client.run_algorithm('algorithm', DataFrame(data, index=[7, 8, 9]))
+    assert task.to_pandas().empty
+    task.update()
+
+    assert task.to_pandas().to_dict("index") == {7: {"predictions_0": 1, "predictions_1": 2},
+                                                 8: {"predictions_0": 3, "predictions_1": 4},
+                                                 9: {"predictions_0": 5, "predictions_1": 6}}
+    assert task.to_numpy().tolist() == [[1, 2], [3, 4], [5, 6]]
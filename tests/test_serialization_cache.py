@@ -0,0 +1,113 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+
+from compredict.resources import Version
+from compredict.utils.serialization import serialize_features
+from compredict.utils.serialization_cache import SerializationCache
+from compredict.utils.submission import SubmissionPool
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"a": [1.0, 2.0, 3.0], "b": ["x", "y", "z"]})
+
+
+def test_key_depends_on_content_and_compression(features):
+    key = SerializationCache.key(features)
+
+    assert SerializationCache.key(features.copy()) == key
+    assert SerializationCache.key(features.to_dict('list')) == key
+    assert SerializationCache.key(features, compression='gzip') != key
+    assert SerializationCache.key(features.assign(a=[1.0, 2.0, 4.0])) != key
+    assert SerializationCache.key(features.rename(columns={"a": "c"})) != key
+    assert SerializationCache.key(features.astype({"a": "float32"})) != key
+    assert SerializationCache.key(features.set_index(pd.Index([5, 6, 7]))) != key
+
+
+def test_get_or_serialize_counts_hits(features, mocker):
+    cache = SerializationCache()
+    serialize = mocker.spy(pd.DataFrame, 'to_parquet')
+
+    first = cache.get_or_serialize(features)
+    second = cache.get_or_serialize(features.copy())
+
+    assert first is second
+    assert serialize.call_count == 1
+    assert_frame_equal(pd.read_parquet(io.BytesIO(first)), features)
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['bytes_saved'] == len(first)
+
+
+def test_unhashable_features_not_cached():
+    cache = SerializationCache()
+    features = DataFrame({"a": [[1, 2], [3]]})
+
+    cache.get_or_serialize(features)
+    cache.get_or_serialize(features)
+
+    assert cache.stats()['misses'] == 2
+    assert cache.stats()['memory_entries'] == 0
+
+
+def test_lru_eviction_to_disk_tier(tmp_path):
+    contents = {key: bytes([index]) * 100 for index, key in enumerate("abcd")}
+    cache = SerializationCache(max_bytes=250, directory=str(tmp_path), max_disk_bytes=150)
+
+    for key, content in contents.items():
+        cache.put(key, content)
+    cache.get('c')
+    cache.put('e', b'e' * 100)
+
+    stats = cache.stats()
+    assert (stats['memory_entries'], stats['memory_bytes']) == (2, 200)
+    assert (stats['disk_entries'], stats['disk_bytes']) == (1, 100)
+    assert sorted(os.listdir(tmp_path)) == ['d.parquet']
+    assert cache.get('a') is None
+    assert cache.get('d') == contents['d']
+    assert cache.get('c') == contents['c']
+
+
+def test_disk_tier_reused_by_new_cache(tmp_path, features):
+    SerializationCache(max_bytes=0, directory=str(tmp_path), max_disk_bytes=10 ** 6).get_or_serialize(features)
+
+    cache = SerializationCache(max_bytes=0, directory=str(tmp_path), max_disk_bytes=10 ** 6)
+    cache.get_or_serialize(features)
+
+    assert cache.stats()['hits'] == 1
+
+
+def test_versions_share_serialized_features(api_client, mocker, response_200, features):
+    sent = []
+
+    def post(address, files=None, **kwargs):
+        sent.append(files['features'][1].read())
+        return response_200
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    mocker.patch.object(api_client, 'serialization_cache', SerializationCache())
+    to_parquet = mocker.spy(pd.DataFrame, 'to_parquet')
+
+    for version in ['1.0.0', '1.1.0', '2.0.0']:
+        Version(client=api_client, algorithm_id='algorithm', version=version).run(features)
+
+    assert to_parquet.call_count == 1
+    assert sent == [serialize_features(features)] * 3
+    assert api_client.serialization_cache.hits == 2
+
+
+def test_submission_pool_uses_cache(api_client, mocker, response_200, features):
+    mocker.patch('requests.Session.post', return_value=response_200)
+    mocker.patch.object(api_client, 'serialization_cache', SerializationCache())
+
+    with SubmissionPool(api_client, serialization_workers=1) as pool:
+        pool.submit('algorithm', features).result(timeout=30)
+        pool.submit('algorithm', features).result(timeout=30)
+
+    assert api_client.serialization_cache.stats()['hits'] == 1
+    assert api_client.serialization_cache.stats()['misses'] == 1
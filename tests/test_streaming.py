@@ -0,0 +1,253 @@
+import io
+import json
+import threading
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+
+from compredict.client import api
+from compredict.connection import Connection
+from compredict.utils.serialization import serialize_features
+from compredict.utils.submission import SubmissionPool
+from compredict.utils.streaming import SizedMultipart, StreamingMultipart, is_columnar, iter_parquet, iter_row_groups, \
+    to_arrow_table
+
+
+def parse_multipart(body: bytes, content_type: str) -> dict:
+    message = BytesParser().parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+    return {part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+            for part in message.get_payload()}
+
+
+@pytest.fixture
+def large_features():
+    rng = np.random.default_rng(0)
+    return DataFrame(rng.random((10000, 4)), columns=["a", "b", "c", "d"])
+
+
+def test_iter_parquet_writes_row_groups(large_features):
+    chunks = list(iter_parquet(large_features, row_group_size=1000))
+    parquet = pq.ParquetFile(io.BytesIO(b''.join(chunks)))
+
+    assert parquet.num_row_groups == 10
+    assert_frame_equal(parquet.read().to_pandas(), large_features)
+
+
+def test_iter_parquet_memory_bounded_by_row_group(large_features):
+    chunks = list(iter_parquet(large_features, row_group_size=1000))
+    row_group_bytes = large_features.iloc[:1000].memory_usage(index=False).sum()
+
+    assert len(chunks) == 11
+    assert max(len(chunk) for chunk in chunks) < 1.5 * row_group_bytes
+
+
+def test_iter_parquet_from_generator_of_dataframes_and_record_batches(large_features):
+    def pieces():
+        yield large_features.iloc[:2500]
+        yield pa.RecordBatch.from_pandas(large_features.iloc[2500:5000], preserve_index=False)
+        yield pa.Table.from_pandas(large_features.iloc[5000:], preserve_index=False)
+
+    table = pq.read_table(io.BytesIO(b''.join(iter_parquet(pieces(), compression='snappy'))))
+
+    assert_frame_equal(table.to_pandas(), large_features)
+
+
+def test_iter_parquet_keeps_custom_index():
+    features = DataFrame({"value": [1.0, 2.0, 3.0]}, index=["x", "y", "z"])
+
+    table = pq.read_table(io.BytesIO(b''.join(iter_parquet(features, row_group_size=2))))
+
+    assert_frame_equal(table.to_pandas(), features)
+
+
+def test_iter_parquet_without_features():
+    with pytest.raises(ValueError):
+        list(iter_parquet(iter([])))
+
+
+def test_iter_row_groups_with_dict():
+    pieces = list(iter_row_groups({"a": [1, 2, 3]}, row_group_size=2))
+
+    assert [len(piece) for piece in pieces] == [2, 1]
+
+
+def test_streaming_multipart_body():
+    body = StreamingMultipart(dict(evaluate=True, version=None),
+                              {"features": ("features.parquet", iter([b"PAR1", b"data"]), "application/parquet"),
+                               "parameters": ("parameters.json", None, "application/json"),
+                               "other": ("other.json", io.BytesIO(b'{"a": 1}'), "application/json")})
+
+    parts = parse_multipart(b''.join(body), body.content_type)
+
+    assert parts == {"evaluate": b"True", "features": b"PAR1data", "other": b'{"a": 1}'}
+
+
+def test_run_algorithm_streaming(api_client, mocker, response_200, large_features):
+    def post(address, data=None, headers=None, **kwargs):
+        sent['body'] = b''.join(data)
+        sent['content_type'] = headers['Content-Type']
+        return response_200
+
+    sent = dict()
+    mocker.patch('requests.Session.post', side_effect=post)
+
+    response = api_client.run_algorithm("algorithm", (large_features.iloc[i:i + 3000] for i in range(0, 10000, 3000)),
+                                        parameters={"test": "parameters"}, stream=True, row_group_size=1000)
+
+    parts = parse_multipart(sent['body'], sent['content_type'])
+    features = pq.ParquetFile(io.BytesIO(parts['features']))
+    assert response.result == "some result"
+    assert parts['parameters'] == b'{"test": "parameters"}'
+    assert parts['monitor'] == b'True'
+    assert features.num_row_groups == 10
+    assert_frame_equal(features.read().to_pandas(), large_features)
+
+
+def test_train_algorithm_streaming_from_path(api_client, mocker, response_200_with_job_id, features_path):
+    def post(address, data=None, headers=None, **kwargs):
+        sent['body'] = b''.join(data)
+        sent['content_type'] = headers['Content-Type']
+        return response_200_with_job_id
+
+    sent = dict()
+    mocker.patch('requests.Session.post', side_effect=post)
+
+    task = api_client.train_algorithm("algorithm", features_path, stream=True)
+
+    parts = parse_multipart(sent['body'], sent['content_type'])
+    with open(features_path, 'rb') as file:
+        assert parts['features'] == file.read()
+    assert task.job_id == "s1o2m3e4-jobid"
+
+
+def test_run_algorithm_streaming_serialized_features(api_client, mocker, response_200, large_features):
+    def post(address, data=None, headers=None, **kwargs):
+        sent.append(parse_multipart(b''.join(data), headers['Content-Type']))
+        return response_200
+
+    sent = []
+    mocker.patch('requests.Session.post', side_effect=post)
+    mocker.patch.object(api_client, '_submission_pool', SubmissionPool(api_client, serialization_workers=1))
+    serialized = serialize_features(large_features)
+
+    api_client.run_algorithm("algorithm", serialized, stream=True)
+    api_client.submit("algorithm", large_features, stream=True).result(timeout=30)
+    api_client.submission_pool.shutdown()
+
+    assert [parts['features'] for parts in sent] == [serialized] * 2
+
+
+class Interchangeable:
+    """Dataframe of another library, exposing only the dataframe interchange protocol."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __dataframe__(self, nan_as_null=False, allow_copy=True):
+        return self.table.__dataframe__(nan_as_null=nan_as_null, allow_copy=allow_copy)
+
+
+@pytest.fixture
+def columnar_features():
+    return pa.table({"a": np.arange(5, dtype=np.int64), "b": np.linspace(0, 1, 5)})
+
+
+@pytest.mark.parametrize('convert', [
+    lambda table: table,
+    lambda table: table.to_batches()[0],
+    lambda table: np.rec.fromarrays([column.to_numpy() for column in table.columns], names=table.column_names),
+    Interchangeable,
+])
+def test_is_columnar_and_to_arrow_table(columnar_features, convert):
+    features = convert(columnar_features)
+
+    assert is_columnar(features)
+    assert to_arrow_table(features).equals(columnar_features)
+
+
+def test_is_columnar_rejects_other_features():
+    assert not any(is_columnar(features) for features in (DataFrame({"a": [1]}), {"a": [1]}, "features.parquet",
+                                                          np.arange(3)))
+
+
+def test_run_algorithm_with_record_batch(api_client, mocker, response_200, columnar_features):
+    uploaded = []
+
+    def post(address, files=None, **kwargs):
+        uploaded.append(pq.read_table(io.BytesIO(files['features'][1].read())))
+        return response_200
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    to_parquet = mocker.patch.object(DataFrame, 'to_parquet')
+
+    api_client.run_algorithm('algorithm', columnar_features.to_batches()[0])
+
+    assert uploaded[0].equals(columnar_features)
+    assert not to_parquet.called
+
+
+def test_iter_parquet_from_structured_array(columnar_features):
+    array = np.rec.fromarrays([column.to_numpy() for column in columnar_features.columns],
+                              names=columnar_features.column_names)
+
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(iter_parquet(array, row_group_size=2))))
+
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().equals(columnar_features)
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    """Records the body and the headers of the uploaded form."""
+
+    uploads = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.uploads.append((dict(self.headers), body))
+        content = json.dumps({"predictions": [1]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_run_algorithm_uploads_mapped_file_with_content_length(features_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UploadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = api.new_instance(token='sometoken', validate=False)
+    client.connection = Connection(url='http://127.0.0.1:{}/api/v1'.format(server.server_address[1]))
+    try:
+        result = client.run_algorithm('algorithm', features_path, parameters={"km": 1})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    headers, body = UploadHandler.uploads[-1]
+    parts = parse_multipart(body, headers['Content-Type'])
+    assert 'Transfer-Encoding' not in headers
+    with open(features_path, 'rb') as file:
+        assert parts['features'] == file.read()
+    assert json.loads(parts['parameters']) == {"km": 1}
+    assert parts['evaluate'] == b'True'
+    assert result.predictions == [1]
+
+
+def test_sized_multipart_length(features_path):
+    with open(features_path, 'rb') as file:
+        files = {"features": ("features.parquet", file, "application/parquet"),
+                 "parameters": ("parameters.json", None, "application/json")}
+        body = SizedMultipart({"a": 1, "b": None}, files)
+        content = b"".join(body)
+
+        assert len(body) == len(content)
+        assert b"".join(body) == content
@@ -0,0 +1,125 @@
+import io
+import threading
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+
+from compredict.exceptions import ClientError, ServerError
+from compredict.resources import Result, Task
+from compredict.utils.polling import PollingPolicy
+from compredict.utils.serialization import serialize_features
+from compredict.utils.submission import SubmissionPool
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"a": [1.0, 2.0, 3.0], "b": [4.0, 5.0, 6.0]})
+
+
+def test_serialize_features(features):
+    assert_frame_equal(pd.read_parquet(io.BytesIO(serialize_features(features))), features)
+
+
+def test_submit_serializes_in_process_pool(api_client, mocker, response_200, features):
+    uploaded = []
+
+    def post(address, files=None, **kwargs):
+        uploaded.append(pd.read_parquet(io.BytesIO(files['features'][1].read())))
+        return response_200
+
+    mocker.patch('requests.Session.post', side_effect=post)
+
+    with SubmissionPool(api_client, serialization_workers=1) as pool:
+        result = pool.submit('algorithm', features).result(timeout=30)
+
+    assert isinstance(result, Result)
+    assert result.result == "some result"
+    assert_frame_equal(uploaded[0], features)
+
+
+def test_submit_waits_for_queued_task(api_client, mocker, response_200_with_job_id, features):
+    mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+    finished = Task(client=api_client, job_id="s1o2m3e4-jobid", status=Task.STATUS_FINISHED, success=True,
+                    predictions=[1, 2, 3])
+    mocker.patch.object(api_client, 'get_task_results', return_value=finished)
+
+    with SubmissionPool(api_client, serialization_workers=0, policy=PollingPolicy(initial_interval=0.01)) as pool:
+        result = pool.submit('algorithm', features).result(timeout=5)
+
+    assert isinstance(result, Result)
+    assert result.job_id == "s1o2m3e4-jobid"
+    assert result.predictions == [1, 2, 3]
+
+
+def test_submit_failed_task(api_client, mocker, response_200_with_job_id, features):
+    mocker.patch('requests.Session.post', return_value=response_200_with_job_id)
+    failed = Task(client=api_client, job_id="s1o2m3e4-jobid", status=Task.STATUS_FINISHED, success=False,
+                  error="Wrong features")
+    mocker.patch.object(api_client, 'get_task_results', return_value=failed)
+
+    with SubmissionPool(api_client, serialization_workers=0, policy=PollingPolicy(initial_interval=0.01)) as pool:
+        future = pool.submit('algorithm', features)
+
+    with pytest.raises(ServerError, match="Wrong features"):
+        future.result()
+
+
+def test_submit_with_error_response(api_client, mocker, response_400, features):
+    mocker.patch('requests.Session.post', return_value=response_400)
+
+    with SubmissionPool(api_client, serialization_workers=0) as pool:
+        future = pool.submit('algorithm', features)
+
+    with pytest.raises(ClientError):
+        future.result()
+
+
+def test_submit_backpressure(api_client, mocker, response_200, features):
+    release = threading.Event()
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def post(*args, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        release.wait(5)
+        with lock:
+            in_flight[0] -= 1
+        return response_200
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    pool = SubmissionPool(api_client, max_in_flight=2, max_workers=4, serialization_workers=0)
+    pool.submit('algorithm', features)
+    pool.submit('algorithm', features)
+    submitted = threading.Event()
+    submitter = threading.Thread(target=lambda: (pool.submit('algorithm', features), submitted.set()))
+    submitter.start()
+
+    assert not submitted.wait(0.2)
+    release.set()
+    assert submitted.wait(5)
+    submitter.join()
+    pool.shutdown()
+
+    assert peak[0] == 2
+
+
+def test_api_submit_with_bytes(api_client, mocker, response_200, features):
+    sent = dict()
+
+    def post(address, data=None, files=None, **kwargs):
+        sent.update(data=data, features=files['features'][1].read())
+        return response_200
+
+    mocker.patch('requests.Session.post', side_effect=post)
+    mocker.patch.object(api_client, '_submission_pool', SubmissionPool(api_client, serialization_workers=0))
+
+    result = api_client.submit('algorithm', serialize_features(features), evaluate=False).result(timeout=5)
+    api_client.submission_pool.shutdown()
+
+    assert result.result == "some result"
+    assert sent['data']['evaluate'] is False
+    assert sent['features'] == serialize_features(features)
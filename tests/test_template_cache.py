@@ -0,0 +1,110 @@
+import os
+
+import pytest
+from requests import Response
+
+from compredict.utils.template_cache import TemplateCache
+
+
+@pytest.fixture
+def template_cache(tmp_path):
+    return TemplateCache(directory=str(tmp_path / "templates"), max_bytes=1024)
+
+
+@pytest.fixture
+def cached_client(api_client, mocker, template_cache):
+    mocker.patch.object(api_client, 'template_cache', template_cache)
+    return api_client
+
+
+def file_response(content, content_type='image/png'):
+    response = Response()
+    response.status_code = 200
+    response._content = content
+    response.headers['Content-Type'] = content_type
+    response.url = 'https://core.compredict.ai/api/v1/algorithms/56/graph'
+    return response
+
+
+def write(content, extension='.json'):
+    def download(file):
+        file.write(content)
+        return extension
+    return download
+
+
+def test_get_or_download_once(template_cache):
+    key = TemplateCache.key('template', 'algorithm', '1.0.0', 'input')
+
+    path = template_cache.get_or_download(key, write(b'{"a": 1}'))
+
+    assert path.endswith('.json')
+    assert template_cache.get_or_download(key, pytest.fail) == path
+    with open(path, 'rb') as file:
+        assert file.read() == b'{"a": 1}'
+
+
+def test_get_or_download_failure(template_cache):
+    key = TemplateCache.key('graph', 'algorithm', '1.0.0', 'input')
+
+    assert template_cache.get_or_download(key, lambda file: False) is False
+    assert template_cache.get(key) is None
+    assert os.listdir(template_cache.directory) == []
+
+
+def test_lru_eviction(template_cache):
+    keys = [TemplateCache.key('graph', 'algorithm', str(i), 'input') for i in range(3)]
+    template_cache.get_or_download(keys[0], write(b'0' * 400, '.png'))
+    template_cache.get_or_download(keys[1], write(b'1' * 400, '.png'))
+    template_cache.get(keys[0])
+
+    template_cache.get_or_download(keys[2], write(b'2' * 400, '.png'))
+
+    assert template_cache.get(keys[0]) is not None
+    assert template_cache.get(keys[1]) is None
+    assert len(os.listdir(template_cache.directory)) == 2
+
+
+def test_index_is_reloaded(template_cache):
+    key = TemplateCache.key('template', 'algorithm', '1.0.0', 'output')
+    path = template_cache.get_or_download(key, write(b'{}'))
+
+    assert TemplateCache(directory=template_cache.directory).get(key) == path
+
+
+def test_map(template_cache):
+    path = template_cache.get_or_download('key', write(b'\x89PNG', '.png'))
+
+    mapped = TemplateCache.map(path)
+
+    assert mapped[:4] == b'\x89PNG'
+    mapped.close()
+
+
+def test_get_graph_with_cache(cached_client, mocker):
+    get = mocker.patch('requests.Session.get', return_value=file_response(b'\x89PNG'))
+
+    for _ in range(2):
+        with cached_client.get_graph('algorithm', file_type='input', version='1.0.0') as file:
+            assert file.read() == b'\x89PNG'
+
+    assert get.call_count == 1
+    assert get.call_args[0][0].endswith('/algorithms/algorithm/graph?type=input&version=1.0.0')
+
+
+def test_get_template_path_of_latest_version(cached_client, mocker, response_factory):
+    algorithm = {'id': 'mass_estimation', 'name': 'Mass Estimation', 'versions': [{'version': '2.0.0'}]}
+    get = mocker.patch('requests.Session.get', side_effect=[
+        response_factory(200, algorithm, 'https://core.compredict.ai/api/v1/algorithms/mass_estimation'),
+        file_response(b'{}', 'application/json')])
+
+    path = cached_client.get_template_path('mass_estimation')
+
+    assert path.endswith('.json')
+    assert get.call_args[0][0].endswith('/algorithms/mass_estimation/template?type=input&version=2.0.0')
+    assert path == cached_client.template_cache.get(TemplateCache.key('template', 'mass_estimation', '2.0.0', 'input'))
+
+
+def test_get_template_path_without_cache(api_client):
+    with pytest.raises(ValueError):
+        api_client.get_template_path('algorithm')
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import time
+
+from compredict.client import api
+from compredict.utils.token_cache import TokenCache
+
+URL = "https://core.compredict.ai/api/v2"
+
+
+def generate_in_worker(cache_path, counter_path, queue):
+    def generate(cached):
+        with open(counter_path, 'a') as counter:
+            counter.write('login\n')
+        time.sleep(0.2)
+        return dict(access='worker-access', refresh='worker-refresh')
+
+    queue.put(TokenCache(cache_path).get_or_generate(URL, 'user', generate))
+
+
+def test_get_or_generate_reuses_valid_tokens(tmp_path, jwt_factory):
+    cache = TokenCache(str(tmp_path / 'tokens.json'))
+    tokens = dict(access=jwt_factory(expires_in=3600), refresh=jwt_factory(expires_in=7200))
+    calls = []
+
+    first = cache.get_or_generate(URL, 'user', lambda cached: calls.append(cached) or tokens)
+    second = cache.get_or_generate(URL, 'user', lambda cached: calls.append(cached) or tokens)
+
+    assert first == second == tokens
+    assert calls == [None]
+    assert cache.get(URL, 'other-user') is None
+    assert oct(os.stat(cache.path).st_mode & 0o777) == oct(0o600)
+
+
+def test_get_or_generate_replaces_expiring_and_rejected_tokens(tmp_path, jwt_factory):
+    cache = TokenCache(str(tmp_path / 'tokens.json'), margin=60)
+    expiring = dict(access=jwt_factory(expires_in=30), refresh='refresh')
+    valid = dict(access=jwt_factory(expires_in=3600), refresh='refresh')
+    cache.set(URL, 'user', expiring)
+
+    assert cache.get_or_generate(URL, 'user', lambda cached: valid) == valid
+    renewed = dict(access=jwt_factory(expires_in=3600, jti='renewed'), refresh='refresh')
+    assert cache.get_or_generate(URL, 'user', lambda cached: renewed, rejected=valid['access']) == renewed
+
+    cache.invalidate(URL, 'user')
+    assert cache.get(URL, 'user') is None
+
+
+def test_workers_log_in_once(tmp_path):
+    cache_path = str(tmp_path / 'tokens.json')
+    counter_path = str(tmp_path / 'logins')
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=generate_in_worker, args=(cache_path, counter_path, queue))
+               for _ in range(4)]
+
+    [worker.start() for worker in workers]
+    results = [queue.get(timeout=30) for _ in workers]
+    [worker.join() for worker in workers]
+
+    with open(counter_path) as counter:
+        assert counter.read().count('login') == 1
+    assert all(tokens == dict(access='worker-access', refresh='worker-refresh') for tokens in results)
+
+
+def test_client_uses_token_cache(tmp_path, mocker, jwt_factory, response_factory):
+    cache = TokenCache(str(tmp_path / 'tokens.json'))
+    generated = dict(access=jwt_factory(expires_in=3600), refresh=jwt_factory(expires_in=7200))
+    mocked_post = mocker.patch('requests.Session.post',
+                               return_value=response_factory(200, generated, URL + '/token/'))
+
+    first_client = api.new_instance(username='user', password='password', url=URL, token_cache=cache)
+    second_client = api.new_instance(username='user', password='password', url=URL, token_cache=cache)
+
+    assert mocked_post.call_count == 1
+    assert first_client.token == second_client.token == generated['access']
+    assert second_client.refresh_token == generated['refresh']
+    assert second_client.connection.headers['Authorization'] == 'Bearer ' + generated['access']
+
+
+def test_client_refreshes_with_cached_refresh_token(tmp_path, mocker, jwt_factory, response_factory):
+    cache = TokenCache(str(tmp_path / 'tokens.json'))
+    cache.set(URL, 'user', dict(access=jwt_factory(expires_in=-10), refresh=jwt_factory(expires_in=7200)))
+    refreshed = jwt_factory(expires_in=3600, jti='refreshed')
+    mocked_post = mocker.patch('requests.Session.post',
+                               return_value=response_factory(200, dict(access=refreshed), URL + '/token/refresh/'))
+
+    client = api.new_instance(username='user', password='password', url=URL, token_cache=cache)
+
+    assert mocked_post.call_args.args[0] == URL + '/token/refresh/'
+    assert client.token == refreshed
+    assert cache.get(URL, 'user')['access'] == refreshed
@@ -1,3 +1,14 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import jwt
+from requests import Session
+
+from compredict.utils import authentications
+from compredict.utils.authentications import generate_token, generate_token_from_refresh_token, verify_token, \
+    get_token_expiry, is_token_expiring, validate_token_locally, TokenValidator
+from compredict.utils.retry import RetryPolicy
 from compredict.utils.utils import extract_error_message
 
 
@@ -11,3 +22,109 @@ def test_extract_error_message_when_key_words_not_found():
     text = 'Some other text with Exception, but without' \
            'right key words'
     assert extract_error_message(text) == "Internal Server Error"
+
+
+def test_authentication_helpers_use_given_session(mocker, response_factory):
+    session = Session()
+    response = response_factory(200, {"access": "token"})
+    mocked_session_post = mocker.patch.object(session, 'post', return_value=response)
+    mocked_post = mocker.patch('requests.post')
+
+    generate_token("https://core.compredict.ai/api/v2", "user", "password", session=session)
+    generate_token_from_refresh_token("https://core.compredict.ai/api/v2", "refresh", session=session)
+    verify_token("https://core.compredict.ai/api/v2", "token", session=session)
+
+    assert mocked_session_post.call_count == 3
+    assert not mocked_post.called
+
+
+def test_retry_policy_full_jitter_backoff(mocker):
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+    mocked_uniform = mocker.patch('random.uniform', side_effect=lambda low, high: high)
+
+    backoffs = [policy.get_backoff(attempt) for attempt in range(1, 6)]
+
+    assert backoffs == [1, 2, 4, 5, 5]
+    assert all(call.args[0] == 0 for call in mocked_uniform.call_args_list)
+
+
+def test_retry_policy_methods_and_attempts():
+    policy = RetryPolicy(max_attempts=2)
+
+    assert policy.can_retry('get', 1)
+    assert not policy.can_retry('GET', 2)
+    assert not policy.can_retry('POST', 1)
+
+
+def test_parse_retry_after():
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+
+    assert RetryPolicy.parse_retry_after('120') == 120.0
+    assert 55 < RetryPolicy.parse_retry_after(in_a_minute) <= 60
+    assert RetryPolicy.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert RetryPolicy.parse_retry_after('soon') is None
+    assert RetryPolicy.parse_retry_after(None) is None
+
+
+def test_retry_after_capped_at_max_backoff(response_factory):
+    throttled = response_factory(429, {"error": "Too many requests"})
+    throttled.headers['Retry-After'] = '3600'
+
+    assert RetryPolicy(max_backoff=10).get_backoff(1, throttled) == 10
+    assert RetryPolicy(max_backoff=7200).get_backoff(1, throttled) == 3600
+
+
+def test_get_token_expiry(jwt_factory):
+    token = jwt_factory(exp=1700000000)
+
+    assert get_token_expiry(token) == 1700000000
+    assert get_token_expiry("notajwt") is None
+    assert get_token_expiry("a.b.c") is None
+
+
+def test_is_token_expiring(jwt_factory):
+    assert is_token_expiring(jwt_factory(expires_in=-1))
+    assert is_token_expiring(jwt_factory(expires_in=30), margin=60)
+    assert not is_token_expiring(jwt_factory(expires_in=300), margin=60)
+    assert not is_token_expiring("sometoken")
+
+
+def test_validate_token_locally(jwt_factory):
+    assert validate_token_locally(jwt_factory(expires_in=300)) is True
+    assert validate_token_locally(jwt_factory(expires_in=-1)) is False
+    assert validate_token_locally(jwt_factory(expires_in=-1), leeway=10) is True
+    assert validate_token_locally(jwt_factory(nbf=time.time() + 60)) is False
+    assert validate_token_locally(jwt_factory(exp=None)) is None
+    assert validate_token_locally("notajwt") is False
+
+
+def test_validate_token_locally_with_signature():
+    token = jwt.encode({"exp": int(time.time() + 300)}, "secret" * 8, algorithm="HS256")
+
+    assert validate_token_locally(token, "secret" * 8, algorithms=["HS256"]) is True
+    assert validate_token_locally(token, "othersecret" * 8, algorithms=["HS256"]) is False
+    assert validate_token_locally(token, "secret" * 8, algorithms=["RS256"]) is None
+
+
+def test_token_validator_caches_results(jwt_factory, mocker):
+    validator = TokenValidator(ttl=60)
+    token, unknown = jwt_factory(), jwt_factory(exp=None)
+    spy = mocker.spy(authentications, 'validate_token_locally')
+
+    assert validator.validate(token) is True
+    assert validator.validate(token) is True
+    assert validator.validate(unknown) is None
+    validator.remember(unknown, False)
+    assert validator.validate(unknown) is False
+    assert spy.call_count == 2
+
+
+def test_token_validator_does_not_cache_beyond_expiry(jwt_factory, mocker):
+    validator = TokenValidator(ttl=300)
+    token = jwt_factory(expires_in=10)
+    validator.validate(token)
+
+    mocker.patch('compredict.utils.authentications.time.time', return_value=time.time() + 20)
+
+    assert validator.get_cached(token) is None
+    assert validator.validate(token) is False
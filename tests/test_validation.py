@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from compredict.exceptions import ClientError, SchemaError
+from compredict.utils.submission import SubmissionPool
+from compredict.utils.validation import SchemaValidator
+
+TEMPLATE = [{"name": "speed", "type": "float", "mandatory": True, "nullable": False},
+            {"name": "gear", "type": "str", "mandatory": True},
+            {"name": "count", "type": "int", "mandatory": False},
+            {"name": "time", "type": "datetime", "mandatory": False}]
+PARAMETERS = [{"name": "window", "type": "int", "mandatory": True},
+              {"name": "mode", "type": "str", "mandatory": False}]
+
+
+@pytest.fixture
+def features():
+    return DataFrame({"speed": [0.5, 1.25, 3.0], "gear": ["n", "3", None], "count": [1.0, np.nan, 3.0],
+                      "time": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])})
+
+
+def test_valid_features(features):
+    validator = SchemaValidator(TEMPLATE, PARAMETERS)
+
+    assert validator.check_features(features) == []
+    assert validator.check_features(features.astype({"gear": "category"})) == []
+    assert validator.check_parameters({"window": 5, "mode": "fast"}) == []
+    validator.validate(features, {"window": 5})
+
+
+def test_invalid_features(features):
+    features = features.drop(columns=["gear"]).assign(speed=[0.5, None, None], count=["1", "2", "3"])
+
+    assert SchemaValidator(TEMPLATE).check_features(features) == [
+        "column 'speed': 2 null values, but it is not nullable", "missing column 'gear'",
+        "column 'count': expected integer, got object"]
+    assert SchemaValidator(TEMPLATE).check_features({"speed": [True], "gear": ["n"], "count": [1.5]}) == [
+        "column 'speed': expected float, got bool", "column 'count': expected integer, got float64"]
+
+
+def test_invalid_parameters():
+    validator = SchemaValidator(parameters_format=PARAMETERS)
+
+    assert validator.check_parameters({"mode": 3}) == ["missing parameter 'window'",
+                                                       "parameter 'mode': expected string, got int"]
+    assert validator.check_parameters({"window": True}) == ["parameter 'window': expected integer, got bool"]
+
+
+def test_validate_raises_client_error(features):
+    with pytest.raises(ClientError) as error:
+        SchemaValidator(TEMPLATE, PARAMETERS).validate(features[["speed"]], {"window": 5})
+
+    assert isinstance(error.value, SchemaError)
+    assert error.value.differences == ["missing column 'gear'"]
+    assert "missing column 'gear'" in str(error.value)
+
+
+def test_run_algorithm_validate_schema(api_client, mocker, response_factory, features):
+    version = {"version": "1.0.0", "features_format": TEMPLATE, "output_format": []}
+
+    def get(address, **kwargs):
+        return response_factory(200, PARAMETERS if '/template' in address else version, address)
+
+    get = mocker.patch('requests.Session.get', side_effect=get)
+    post = mocker.patch('requests.Session.post', return_value=response_factory(
+        200, {"predictions": [1, 2, 3]}, 'https://core.compredict.ai/api/v1/algorithms/validated/predict'))
+
+    with pytest.raises(SchemaError):
+        api_client.run_algorithm('validated', features, version='1.0.0', parameters={"window": "5"},
+                                 validate_schema=True)
+    result = api_client.run_algorithm('validated', features, version='1.0.0', parameters={"window": 5},
+                                      validate_schema=True)
+
+    assert post.call_count == 1
+    assert [call.args[0].split('/algorithms')[1] for call in get.call_args_list] == [
+        '/validated/versions/1.0.0', '/validated/template?type=parameters&version=1.0.0']
+    assert result.predictions == [1, 2, 3]
+    assert api_client.get_validator('validated', '1.0.0').parameters.keys() == {"window", "mode"}
+
+
+def test_submit_validate_schema(api_client, mocker, response_factory, features):
+    version = {"version": "2.0.0", "features_format": TEMPLATE, "output_format": []}
+    mocker.patch('requests.Session.get', side_effect=lambda address, **kwargs: response_factory(
+        200, PARAMETERS if '/template' in address else version, address))
+    post = mocker.patch('requests.Session.post', return_value=response_factory(
+        200, {"predictions": [1, 2, 3]}, 'https://core.compredict.ai/api/v1/algorithms/validated/predict'))
+    mocker.patch.object(api_client, '_submission_pool', SubmissionPool(api_client, serialization_workers=1))
+
+    with pytest.raises(SchemaError):
+        api_client.submit('validated', features[["speed"]], version='2.0.0', validate_schema=True)
+    with pytest.raises(SchemaError):
+        api_client.run_algorithm_chunked('validated', features, chunk_size=2, version='2.0.0',
+                                         parameters={"mode": "fast"}, validate_schema=True)
+    result = api_client.submit('validated', features, version='2.0.0', parameters={"window": 5},
+                               validate_schema=True).result(timeout=30)
+    api_client.submission_pool.shutdown()
+
+    assert post.call_count == 1
+    assert result.predictions == [1, 2, 3]
+
+
+def test_latest_version_resolved_once(api_client, mocker, response_factory, features):
+    algorithm = {"id": "validated", "versions": [{"version": "3.0.0", "features_format": TEMPLATE}]}
+    api_client.fail_on_error(True)
+
+    def get(address, **kwargs):
+        if '/template' in address:
+            return response_factory(404, {"error": True, "error_msg": "No parameters template"}, address)
+        return response_factory(200, algorithm, address)
+
+    get = mocker.patch('requests.Session.get', side_effect=get)
+    post = mocker.patch('requests.Session.post', return_value=response_factory(
+        200, {"predictions": [1, 2, 3]}, 'https://core.compredict.ai/api/v1/algorithms/validated/predict'))
+
+    try:
+        for _ in range(3):
+            api_client.run_algorithm('validated', features, parameters={"window": "5"}, validate_schema=True)
+        assert api_client.get_validator('validated').parameters == {}
+        api_client.invalidate_metadata('validated')
+        api_client.run_algorithm('validated', features, validate_schema=True)
+    finally:
+        api_client.fail_on_error(False)
+        api_client.invalidate_metadata()
+
+    assert post.call_count == 4
+    assert [call.args[0].split('/algorithms')[1] for call in get.call_args_list] == [
+        '/validated', '/validated/template?type=parameters&version=3.0.0', '/validated']